@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import List
 
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -51,6 +52,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "portfolio.middleware.RequestMetricsMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -85,6 +87,48 @@ DATABASES = {
     }
 }
 
+# Connection handling: "new" opens a connection per request, "persistent"
+# keeps one per thread for DB_CONN_MAX_AGE seconds (WSGI workers only;
+# Django does not reuse connections in async mode) and "pool" checks
+# connections out of a per-process pool of at most DB_POOL_MAX_SIZE.
+# Keep workers * DB_POOL_MAX_SIZE below the server's max_connections.
+DB_CONNECTION_MODE = env("DB_CONNECTION_MODE", default="new")
+if DB_CONNECTION_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=60)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_CONNECTION_MODE == "pool":
+    DATABASES["default"]["ENGINE"] = "portfolio.pooling"
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "max_size": env.int("DB_POOL_MAX_SIZE", default=10),
+            "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+            "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+            "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
+        },
+    }
+elif DB_CONNECTION_MODE != "new":
+    raise ImproperlyConfigured('DB_CONNECTION_MODE must be one of "new", "persistent" or "pool".')
+
+# Cache
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+PORTFOLIO_STATISTICS_CACHE = env("PORTFOLIO_STATISTICS_CACHE", default="default")
+PORTFOLIO_STATISTICS_CACHE_TIMEOUT = env.int("PORTFOLIO_STATISTICS_CACHE_TIMEOUT", default=300)
+
+# Holdings table range partitions (PostgreSQL): "month" or "year"
+HOLDING_PARTITION_INTERVAL = env("HOLDING_PARTITION_INTERVAL", default="month")
+
+# OpenAPI schema: read from files written by generate_openapi_schema when
+# this is set, otherwise generated on the first request of each process
+OPENAPI_SCHEMA_DIR = env("OPENAPI_SCHEMA_DIR", default="")
+SWAGGER_SETTINGS = {"SPEC_URL": ("schema-json", {"format": ".json"})}
+REDOC_SETTINGS = {"SPEC_URL": ("schema-json", {"format": ".json"})}
+
+# Per-request query/serializer timings (Server-Timing header and /metrics)
+PORTFOLIO_METRICS_ENABLED = env.bool("PORTFOLIO_METRICS_ENABLED", default=True)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
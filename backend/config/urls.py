@@ -4,41 +4,27 @@ URL configuration for Portfolio Valuation project.
 from django.contrib import admin
 from django.urls import path, include, re_path
 from typing import List
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Portfolio Valuation API",
-        default_version="v1",
-        description="API for managing investment portfolios, holdings, and valuation snapshots",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@portfolio.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from portfolio.views import MetricsView, SchemaUIView, SchemaView
 
 urlpatterns: List = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("portfolio.urls")),
-    # Swagger documentation
+    path("metrics", MetricsView.as_view(), name="metrics"),
+    # Swagger documentation, served from the pre-generated or once-generated schema
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
-        schema_view.without_ui(cache_timeout=0),
+        SchemaView.as_view(),
         name="schema-json",
     ),
     re_path(
         r"^swagger/$",
-        schema_view.with_ui("swagger", cache_timeout=0),
+        SchemaUIView.as_view(ui="swagger"),
         name="schema-swagger-ui",
     ),
     re_path(
         r"^redoc/$",
-        schema_view.with_ui("redoc", cache_timeout=0),
+        SchemaUIView.as_view(ui="redoc"),
         name="schema-redoc",
     ),
 ]
-
@@ -2,7 +2,15 @@
 Django admin configuration for Portfolio models.
 """
 from django.contrib import admin
-from portfolio.models import Portfolio, Holding, ValuationSnapshot
+from portfolio.models import (
+    Portfolio,
+    Holding,
+    ValuationSnapshot,
+    HoldingAggregate,
+    RecalculationJob,
+    Security,
+    SecurityPrice,
+)
 
 
 @admin.register(Portfolio)
@@ -28,3 +36,34 @@ class ValuationSnapshotAdmin(admin.ModelAdmin):
     search_fields = ["portfolio__name"]
     readonly_fields = ["created_at", "updated_at"]
 
+
+
+@admin.register(HoldingAggregate)
+class HoldingAggregateAdmin(admin.ModelAdmin):
+    list_display = ["portfolio", "valuation_date", "asset_type", "total_value", "holding_count", "updated_at"]
+    list_filter = ["asset_type", "valuation_date"]
+    search_fields = ["portfolio__name"]
+    readonly_fields = ["updated_at"]
+
+
+@admin.register(RecalculationJob)
+class RecalculationJobAdmin(admin.ModelAdmin):
+    list_display = ["id", "status", "date_from", "date_to", "processed", "total", "worker", "created_at"]
+    list_filter = ["status", "created_at"]
+    readonly_fields = ["created_at", "updated_at", "started_at", "finished_at", "heartbeat_at"]
+
+
+@admin.register(Security)
+class SecurityAdmin(admin.ModelAdmin):
+    list_display = ["asset_name", "asset_type", "created_at"]
+    list_filter = ["asset_type"]
+    search_fields = ["asset_name"]
+    readonly_fields = ["created_at", "updated_at"]
+
+
+@admin.register(SecurityPrice)
+class SecurityPriceAdmin(admin.ModelAdmin):
+    list_display = ["security", "price_date", "unit_price", "updated_at"]
+    list_filter = ["price_date"]
+    search_fields = ["security__asset_name"]
+    readonly_fields = ["created_at", "updated_at"]
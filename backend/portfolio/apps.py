@@ -5,3 +5,11 @@ class PortfolioConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "portfolio"
 
+    def ready(self) -> None:
+        import portfolio.signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+
+        from portfolio.metrics import install_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid="portfolio_query_recorder")
+
@@ -0,0 +1,3 @@
+"""
+Microbenchmarks for the valuation services and serializers.
+"""
@@ -0,0 +1,215 @@
+"""
+Benchmark cases and baseline comparison.
+
+Each case is timed over several runs without instrumentation, then run
+once more under ``CaptureQueriesContext`` and ``tracemalloc`` to count
+queries and record the peak Python memory, so the tracing overhead does
+not leak into the wall times.
+"""
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import django
+from django.db import connection
+from django.db.models import QuerySet
+from django.db.utils import load_backend
+from django.test.utils import CaptureQueriesContext
+
+from portfolio.cache import invalidate_statistics
+from portfolio.models import Holding, Portfolio
+from portfolio.pooling import close_pools
+from portfolio.renderers import FastJSONRenderer
+from portfolio.serializers.holding import HOLDING_VALUES, HoldingSerializer
+from portfolio.serializers.portfolio import PortfolioDetailQuerySerializer, PortfolioDetailSerializer
+from portfolio.services import PortfolioService, ValuationService, with_effective_price
+
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+CASE_NAMES = (
+    "valuation.calculate_portfolio_aum",
+    "portfolio.get_portfolio_statistics.cold",
+    "portfolio.get_portfolio_statistics.cached",
+    "serializer.holding_list",
+    "serializer.holding_list.values",
+    "serializer.portfolio_detail",
+    "db.connection.new",
+    "db.connection.pooled",
+)
+# The connection cases open psycopg2 connections, so they only run on PostgreSQL.
+POSTGRESQL_CASES = ("db.connection.new", "db.connection.pooled")
+# Requests simulated per run of the connection cases: connect, SELECT 1, close.
+CONNECTION_CYCLES = 20
+BENCHMARK_POOL_ALIAS = "benchmark_pool"
+POOL_ENGINE = "portfolio.pooling"
+
+
+def measure(
+    func: Callable[[], Any], repeat: int = DEFAULT_REPEAT, setup: Optional[Callable[[], Any]] = None
+) -> Dict[str, Any]:
+    """
+    Wall time (median and min over ``repeat`` runs), query count and peak memory of ``func``.
+
+    ``setup`` runs untimed before every run.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_seconds": round(statistics.median(timings), 6),
+        "wall_seconds_min": round(min(timings), 6),
+        "queries": len(queries),
+        "peak_memory_bytes": peak,
+    }
+
+
+def connection_cycles(engine: str, alias: str, options: Dict[str, Any]) -> Callable[[], None]:
+    """
+    A function running CONNECTION_CYCLES request-like connection cycles on a new connection of ``engine``.
+    """
+    settings_dict = {**connection.settings_dict, "ENGINE": engine, "OPTIONS": options, "CONN_MAX_AGE": 0}
+    wrapper = load_backend(engine).DatabaseWrapper(settings_dict, alias)
+
+    def run() -> None:
+        for _ in range(CONNECTION_CYCLES):
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            wrapper.close()
+
+    return run
+
+
+def cases(portfolio: Portfolio, valuation_date: date) -> Dict[str, Dict[str, Any]]:
+    """
+    The benchmark cases for one portfolio and valuation date, by name.
+
+    POSTGRESQL_CASES are left out on other databases.
+    """
+
+    def holdings() -> QuerySet:
+        # A fresh queryset per run, so no case is timed against a filled result cache.
+        return Holding.objects.filter(portfolio=portfolio).select_related("portfolio")
+
+    # The detail endpoint's default limits.
+    detail_params = PortfolioDetailQuerySerializer(data={})
+    detail_params.is_valid(raise_exception=True)
+    benchmark_cases = {
+        "valuation.calculate_portfolio_aum": {
+            "func": lambda: ValuationService.calculate_portfolio_aum(portfolio, valuation_date),
+        },
+        "portfolio.get_portfolio_statistics.cold": {
+            "func": lambda: PortfolioService.get_portfolio_statistics(portfolio),
+            "setup": lambda: invalidate_statistics([portfolio.pk]),
+        },
+        "portfolio.get_portfolio_statistics.cached": {
+            "func": lambda: PortfolioService.get_portfolio_statistics(portfolio),
+            "setup": lambda: PortfolioService.get_portfolio_statistics(portfolio),
+        },
+        "serializer.holding_list": {
+            "func": lambda: HoldingSerializer(with_effective_price(holdings()), many=True).data,
+        },
+        "serializer.holding_list.values": {
+            "func": lambda: FastJSONRenderer().render(HOLDING_VALUES.render(HOLDING_VALUES.queryset(holdings()))),
+        },
+        "serializer.portfolio_detail": {
+            "func": lambda: PortfolioDetailSerializer(portfolio, context=detail_params.validated_data).data,
+        },
+    }
+    if connection.vendor == "postgresql":
+        engine = connection.settings_dict["ENGINE"]
+        if engine == POOL_ENGINE:
+            # A pooled default database still benchmarks plain connections.
+            engine = "django.db.backends.postgresql"
+        benchmark_cases["db.connection.new"] = {
+            "func": connection_cycles(engine, "benchmark_new", {}),
+        }
+        benchmark_cases["db.connection.pooled"] = {
+            "func": connection_cycles(POOL_ENGINE, BENCHMARK_POOL_ALIAS, {"pool": {"max_size": 1}}),
+            "teardown": lambda: close_pools(alias=BENCHMARK_POOL_ALIAS),
+        }
+    return benchmark_cases
+
+
+def run_suite(
+    portfolio: Portfolio,
+    valuation_date: date,
+    repeat: int = DEFAULT_REPEAT,
+    only: Optional[List[str]] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the benchmark cases and return the results with the run environment.
+
+    A case's ``teardown`` runs once after it is measured. Requested cases
+    that cannot run on the database are listed in ``meta["skipped"]``.
+    """
+    results = {}
+    benchmark_cases = cases(portfolio, valuation_date)
+    skipped = [name for name in (only or CASE_NAMES) if name not in benchmark_cases]
+    for name, case in benchmark_cases.items():
+        if only and name not in only:
+            continue
+        try:
+            results[name] = measure(case["func"], repeat=repeat, setup=case.get("setup"))
+        finally:
+            if case.get("teardown"):
+                case["teardown"]()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+            "portfolio_holdings": Holding.objects.filter(portfolio=portfolio).count(),
+            "total_holdings": Holding.objects.count(),
+            "skipped": skipped,
+            **(meta or {}),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE
+) -> List[Dict[str, Any]]:
+    """
+    Regressions of ``current`` against ``baseline``.
+
+    A case regresses when its median wall time or peak memory grows by more
+    than ``tolerance`` (a fraction) or it issues more queries.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric, limit in (
+            ("wall_seconds", base["wall_seconds"] * (1 + tolerance)),
+            ("peak_memory_bytes", base["peak_memory_bytes"] * (1 + tolerance)),
+            ("queries", base["queries"]),
+        ):
+            if result[metric] > limit:
+                regressions.append(
+                    {"case": name, "metric": metric, "baseline": base[metric], "current": result[metric]}
+                )
+    return regressions
@@ -0,0 +1,92 @@
+"""
+Read-through cache for portfolio statistics.
+
+Entries are keyed by a per-portfolio version number. A write bumps the
+version (immediately and again when the transaction commits), so a
+reader that computed statistics before the write can only store them
+under a version nobody will ask for again.
+"""
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+STATISTICS_KEY = "portfolio:statistics:{portfolio_id}:v{version}"
+VERSION_KEY = "portfolio:statistics:{portfolio_id}:version"
+COUNTER_KEY = "portfolio:statistics:counter:{name}"
+COUNTERS = ("hits", "misses", "invalidations")
+
+
+def statistics_cache() -> BaseCache:
+    """
+        The cache backend configured for portfolio statistics.
+    """
+    return caches[settings.PORTFOLIO_STATISTICS_CACHE]
+
+
+def get_statistics_version(portfolio_id: int) -> int:
+    """
+        Current cache version of a portfolio's statistics.
+    """
+    return statistics_cache().get(VERSION_KEY.format(portfolio_id=portfolio_id), 0)
+
+
+def get_cached_statistics(portfolio_id: int, version: int) -> Optional[Dict[str, Any]]:
+    """
+        Cached statistics for a portfolio at a version, counting the hit or miss.
+    """
+    stats = statistics_cache().get(STATISTICS_KEY.format(portfolio_id=portfolio_id, version=version))
+    _increment("hits" if stats is not None else "misses")
+    return stats
+
+
+def set_cached_statistics(portfolio_id: int, version: int, stats: Dict[str, Any]) -> None:
+    """
+        Store statistics computed while the portfolio was at ``version``.
+    """
+    statistics_cache().set(
+        STATISTICS_KEY.format(portfolio_id=portfolio_id, version=version),
+        stats,
+        timeout=settings.PORTFOLIO_STATISTICS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_statistics(portfolio_ids: Iterable[Optional[int]]) -> None:
+    """
+        Invalidate the cached statistics of portfolios now and once the current transaction commits.
+    """
+    portfolio_ids = sorted({portfolio_id for portfolio_id in portfolio_ids if portfolio_id is not None})
+    if not portfolio_ids:
+        return
+    _bump_versions(portfolio_ids)
+    transaction.on_commit(lambda: _bump_versions(portfolio_ids))
+    for _ in portfolio_ids:
+        _increment("invalidations")
+
+
+def statistics_cache_counters() -> Dict[str, int]:
+    """
+        Hit, miss and invalidation counts recorded in the statistics cache.
+    """
+    values = statistics_cache().get_many([COUNTER_KEY.format(name=name) for name in COUNTERS])
+    return {name: values.get(COUNTER_KEY.format(name=name), 0) for name in COUNTERS}
+
+
+def _bump_versions(portfolio_ids: Iterable[int]) -> None:
+    for portfolio_id in portfolio_ids:
+        _incr(VERSION_KEY.format(portfolio_id=portfolio_id))
+
+
+def _increment(name: str) -> None:
+    _incr(COUNTER_KEY.format(name=name))
+
+
+def _incr(key: str) -> None:
+    cache = statistics_cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr.
+        cache.set(key, 1, timeout=None)
@@ -0,0 +1,38 @@
+"""
+Run independent ORM work concurrently from async views.
+
+Django's async ORM methods (``aget``, ``acount`` ...) all hop onto the one
+thread-sensitive executor thread, so queries issued from one request run
+one after another. ``run_concurrently`` gives each call its own worker
+thread, and with it its own database connection, so independent queries
+overlap on the database.
+"""
+import asyncio
+from typing import Any, Callable, List
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def _in_worker(call: Callable[[], Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        try:
+            return call()
+        finally:
+            # Worker threads are outside the request cycle, so release their
+            # connections by the same CONN_MAX_AGE rules a request would.
+            close_old_connections()
+
+    return run
+
+
+async def run_concurrently(*calls: Callable[[], Any]) -> List[Any]:
+    """
+    Run blocking callables in parallel worker threads and return their results in order.
+
+    Calls must not depend on each other and should not share a transaction:
+    each one runs on a separate connection.
+    """
+    return list(
+        await asyncio.gather(*(sync_to_async(_in_worker(call), thread_sensitive=False)() for call in calls))
+    )
@@ -0,0 +1,67 @@
+"""
+HTTP conditional requests for the read endpoints.
+
+A view returns the change counters of the tables behind its responses
+(``table_versions``) as its validator state. The ETag
+is a digest of those tables' change counters (see portfolio.versions),
+the request's path and parameters and the negotiated renderer, so any
+committed write to one of the tables changes it. Counters are per table,
+so a write anywhere in a table revalidates every response built from it;
+that is the price of validators that cost one primary-key lookup instead
+of a query over the response's rows.
+
+No Last-Modified is sent: one-second timestamps cannot tell apart two
+changes in the same second, and a validator that goes back to an earlier
+value would answer a stale copy with 304.
+"""
+import hashlib
+import json
+from functools import wraps
+from typing import Any, Callable, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+def etag(request: Request, state: Sequence[Any]) -> str:
+    """
+        ETag of a response rendered by the request's renderer from data in ``state``.
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    payload = json.dumps(
+        [request.path, sorted(request.query_params.lists()), getattr(renderer, "format", None), list(state)],
+        cls=DjangoJSONEncoder,
+        separators=(",", ":"),
+    )
+    return f'W/"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def conditional_get(method: Callable) -> Callable:
+    """
+    Decorator answering conditional GETs of a view method with 304 Not Modified.
+
+    The view's ``validator_state(request)`` returns the change counters of
+    the tables behind the response, or None to skip conditional handling
+    (for requests that end in a validation error). The wrapped method
+    only runs when the client's copy is stale.
+    """
+
+    @wraps(method)
+    def wrapper(view: Any, request: Request, *args: Any, **kwargs: Any) -> Response:
+        state = view.validator_state(request)
+        if state is None:
+            return method(view, request, *args, **kwargs)
+
+        tag = etag(request, state)
+        response = get_conditional_response(request, etag=tag)
+        if response is None:
+            response = method(view, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            # Stored copies must be revalidated, never served on heuristic freshness.
+            patch_cache_control(response, no_cache=True)
+            response.headers.setdefault("ETag", tag)
+        return response
+
+    return wrapper
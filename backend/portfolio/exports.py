@@ -0,0 +1,159 @@
+"""
+Streaming CSV / NDJSON exports of holdings and valuation snapshots.
+
+Rows are read with ``.iterator(chunk_size=...)`` (a server-side cursor on
+PostgreSQL) and encoded chunk by chunk, so memory stays flat no matter
+how many rows the export covers.
+"""
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Sequence
+
+from django.db.models import F, QuerySet
+from django.http import StreamingHttpResponse
+
+from portfolio.services import with_effective_price
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+HOLDING_EXPORT_FIELDS = [
+    "id",
+    "portfolio",
+    "portfolio_name",
+    "asset_name",
+    "asset_type",
+    "quantity",
+    "unit_price",
+    "valuation_date",
+    "total_value",
+    "created_at",
+    "updated_at",
+]
+
+VALUATION_EXPORT_FIELDS = [
+    "id",
+    "portfolio",
+    "portfolio_name",
+    "snapshot_date",
+    "status",
+    "total_aum",
+    "notes",
+    "created_at",
+    "updated_at",
+]
+
+TOTAL_VALUE_QUANTIZE = Decimal("0.01")
+
+
+class _Echo:
+    """
+        File-like object whose write returns the line for csv.writer.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_value(value: Any) -> Any:
+    """
+        Format a column value the way the JSON API does.
+    """
+    if isinstance(value, Decimal):
+        return "{:f}".format(value)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def holding_export_rows(holdings: QuerySet) -> Iterator[List[Any]]:
+    """
+        Holding rows in HOLDING_EXPORT_FIELDS order, valued at their effective_unit_price.
+    """
+    rows = (
+        with_effective_price(holdings)
+        .annotate(portfolio_name=F("portfolio__name"))
+        .values_list(
+            "id",
+            "portfolio_id",
+            "portfolio_name",
+            "asset_name",
+            "asset_type",
+            "quantity",
+            "unit_price",
+            "valuation_date",
+            "created_at",
+            "updated_at",
+            "effective_unit_price",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for row in rows:
+        total_value = (row[5] * row[10]).quantize(TOTAL_VALUE_QUANTIZE)
+        yield [*row[:8], total_value, *row[8:10]]
+
+
+def valuation_export_rows(snapshots: QuerySet) -> Iterator[List[Any]]:
+    """
+        Valuation snapshot rows in VALUATION_EXPORT_FIELDS order.
+    """
+    rows = (
+        snapshots.annotate(portfolio_name=F("portfolio__name"))
+        .values_list(
+            "id",
+            "portfolio_id",
+            "portfolio_name",
+            "snapshot_date",
+            "status",
+            "total_aum",
+            "notes",
+            "created_at",
+            "updated_at",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for row in rows:
+        yield list(row)
+
+
+def stream_export(rows: Iterable[Sequence[Any]], fields: List[str], export_format: str) -> Iterator[str]:
+    """
+        Encode rows as CSV (with a header line) or NDJSON, one chunk of lines at a time.
+    """
+    writer = csv.writer(_Echo())
+    if export_format == "csv":
+        yield writer.writerow(fields)
+
+    lines = []
+    for row in rows:
+        values = [export_value(value) for value in row]
+        if export_format == "csv":
+            lines.append(writer.writerow(["" if value is None else value for value in values]))
+        else:
+            lines.append(json.dumps(dict(zip(fields, values)), ensure_ascii=False) + "\n")
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def export_response(rows: Iterable[Sequence[Any]], fields: List[str], export_format: str, name: str) -> StreamingHttpResponse:
+    """
+        Streaming download response for an export.
+    """
+    response = StreamingHttpResponse(
+        stream_export(rows, fields, export_format),
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{name}.{export_format}"'
+    return response
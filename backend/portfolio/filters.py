@@ -0,0 +1,65 @@
+"""
+Query-parameter filters shared by the list and export endpoints.
+"""
+from typing import Any
+
+from django.db.models import Q
+
+from portfolio.search import SEARCH_FULLTEXT
+
+
+def portfolio_query(params: Any) -> Q:
+    """
+        Filter for portfolios by a search term over name, client name and client email.
+
+        In fulltext search mode the term is matched by search_portfolios instead.
+    """
+    query = Q(pk__isnull=False)
+
+    search = params.get("search")
+    if search and params.get("search_mode") != SEARCH_FULLTEXT:
+        query &= Q(
+            Q(name__icontains=search)
+            | Q(client_name__icontains=search)
+            | Q(client_email__icontains=search)
+        )
+
+    return query
+
+
+def holding_query(params: Any) -> Q:
+    """
+        Filter for holdings by portfolio, valuation date or valuation date range.
+    """
+    query = Q(pk__isnull=False)
+
+    if params.get("portfolio"):
+        query &= Q(portfolio_id=params.get("portfolio"))
+    if params.get("valuation_date"):
+        query &= Q(valuation_date=params.get("valuation_date"))
+    if params.get("date_from"):
+        query &= Q(valuation_date__gte=params.get("date_from"))
+    if params.get("date_to"):
+        query &= Q(valuation_date__lte=params.get("date_to"))
+
+    return query
+
+
+def valuation_query(params: Any) -> Q:
+    """
+        Filter for valuation snapshots by portfolio, status, snapshot date or date range.
+    """
+    query = Q(pk__isnull=False)
+
+    if params.get("portfolio"):
+        query &= Q(portfolio_id=params.get("portfolio"))
+    if params.get("status"):
+        query &= Q(status=params.get("status"))
+    if params.get("snapshot_date"):
+        query &= Q(snapshot_date=params.get("snapshot_date"))
+    if params.get("date_from"):
+        query &= Q(snapshot_date__gte=params.get("date_from"))
+    if params.get("date_to"):
+        query &= Q(snapshot_date__lte=params.get("date_to"))
+
+    return query
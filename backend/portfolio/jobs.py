@@ -0,0 +1,191 @@
+"""
+Database-backed queue for background snapshot recalculations.
+
+Workers claim a job with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it, then take it over with a conditional UPDATE on the
+values they read. That compare-and-swap is what makes the claim safe on
+SQLite, where row locks are not available and the lock clause is
+ignored. A running job holds a lease renewed by a heartbeat on every
+chunk; when a worker dies the lease expires and another worker resumes
+the job from its last committed chunk.
+"""
+import os
+import socket
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import DateTimeField, F, Q, QuerySet, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from portfolio.models import RecalculationJob, ValuationSnapshot
+from portfolio.services import ValuationService
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 10000
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+CLAIM_RETRIES = 5
+
+
+class LeaseLost(Exception):
+    """
+        Raised when a worker no longer holds the job it is processing.
+    """
+
+
+def default_worker_id() -> str:
+    """
+        Worker identity recorded on claimed jobs.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class RecalculationJobService:
+    """
+        Service for submitting, claiming and running recalculation jobs.
+    """
+
+    @staticmethod
+    def submit(
+        date_from: date,
+        date_to: date,
+        portfolio_ids: Optional[List[int]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> RecalculationJob:
+        """
+        Queue a recalculation of every snapshot in the date range, optionally limited to portfolios.
+        """
+        job = RecalculationJob(
+            date_from=date_from,
+            date_to=date_to,
+            portfolio_ids=sorted(set(portfolio_ids)) if portfolio_ids else None,
+            chunk_size=chunk_size,
+        )
+        job.total = RecalculationJobService.snapshots(job).count()
+        job.save()
+        return job
+
+    @staticmethod
+    def snapshots(job: RecalculationJob) -> QuerySet[ValuationSnapshot]:
+        """
+        Snapshots in the scope of a job, in processing order.
+        """
+        snapshots = ValuationSnapshot.objects.filter(
+            snapshot_date__gte=job.date_from,
+            snapshot_date__lte=job.date_to,
+        )
+        if job.portfolio_ids:
+            snapshots = snapshots.filter(portfolio_id__in=job.portfolio_ids)
+        return snapshots.order_by("pk")
+
+    @staticmethod
+    def claim(worker_id: str, lease_seconds: int = LEASE_SECONDS) -> Optional[RecalculationJob]:
+        """
+        Claim the oldest pending job, or a running job whose lease has expired.
+
+        Returns None when there is nothing to claim.
+        """
+        now = timezone.now()
+        expired = Q(status="RUNNING", heartbeat_at__lt=now - timedelta(seconds=lease_seconds))
+
+        RecalculationJob.objects.filter(expired, attempts__gte=MAX_ATTEMPTS).update(
+            status="FAILED",
+            error=f"Lease expired after {MAX_ATTEMPTS} attempts",
+            finished_at=now,
+        )
+
+        for _ in range(CLAIM_RETRIES):
+            with transaction.atomic():
+                candidate = (
+                    RecalculationJob.objects.select_for_update(skip_locked=True)
+                    .filter(Q(status="PENDING") | expired)
+                    .order_by("created_at", "pk")
+                    .values("pk", "status", "worker", "heartbeat_at")
+                    .first()
+                )
+                if candidate is None:
+                    return None
+                claimed = RecalculationJob.objects.filter(
+                    pk=candidate["pk"],
+                    status=candidate["status"],
+                    worker=candidate["worker"],
+                    heartbeat_at=candidate["heartbeat_at"],
+                ).update(
+                    status="RUNNING",
+                    worker=worker_id,
+                    heartbeat_at=now,
+                    attempts=F("attempts") + 1,
+                    started_at=Coalesce(F("started_at"), Value(now, output_field=DateTimeField())),
+                    updated_at=now,
+                )
+            if claimed:
+                return RecalculationJob.objects.get(pk=candidate["pk"])
+        return None
+
+    @staticmethod
+    def run_chunk(job: RecalculationJob, worker_id: str) -> bool:
+        """
+        Recalculate the next chunk of a claimed job and commit it with the job's progress.
+
+        Returns True while snapshots remain. Raises LeaseLost when another
+        worker has taken the job over; the chunk is then rolled back.
+        """
+        snapshots = RecalculationJobService.snapshots(job)
+        if job.last_processed_id is not None:
+            snapshots = snapshots.filter(pk__gt=job.last_processed_id)
+
+        with transaction.atomic():
+            chunk = list(snapshots[: job.chunk_size])
+            ValuationService.recalculate_snapshots_aum(chunk)
+
+            now = timezone.now()
+            done = len(chunk) < job.chunk_size
+            changes: Dict[str, Any] = {
+                "processed": job.processed + len(chunk),
+                "last_processed_id": chunk[-1].pk if chunk else job.last_processed_id,
+                "heartbeat_at": now,
+                "updated_at": now,
+            }
+            if done:
+                changes.update(status="COMPLETED", finished_at=now)
+            if not RecalculationJob.objects.filter(pk=job.pk, status="RUNNING", worker=worker_id).update(**changes):
+                raise LeaseLost(f"Job {job.pk} is no longer held by {worker_id}")
+
+        for name, value in changes.items():
+            setattr(job, name, value)
+        return not done
+
+    @staticmethod
+    def run(job: RecalculationJob, worker_id: str) -> RecalculationJob:
+        """
+        Run a claimed job chunk by chunk until it completes or fails.
+        """
+        try:
+            while RecalculationJobService.run_chunk(job, worker_id):
+                pass
+        except LeaseLost:
+            raise
+        except Exception as e:
+            RecalculationJob.objects.filter(pk=job.pk, worker=worker_id).update(
+                status="FAILED",
+                error=str(e),
+                finished_at=timezone.now(),
+            )
+            job.refresh_from_db()
+        return job
+
+    @staticmethod
+    def progress(job: RecalculationJob) -> Dict[str, Any]:
+        """
+        Progress figures for polling clients.
+        """
+        if job.status == "COMPLETED":
+            percent = 100.0
+        elif job.total:
+            # Snapshots created after submission can push processed past total.
+            percent = min(round(100 * job.processed / job.total, 2), 99.99)
+        else:
+            percent = 0.0
+        return {"processed": job.processed, "total": job.total, "percent": percent}
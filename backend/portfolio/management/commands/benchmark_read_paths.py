@@ -0,0 +1,109 @@
+"""
+Compare requests per second of the sync and async read endpoints.
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db.models import Count
+from django.urls import reverse
+
+from portfolio.models import Portfolio
+
+ENDPOINTS = [
+    "portfolio-list",
+    "portfolio-detail",
+    "portfolio-statistics",
+    "holding-list",
+    "valuation-list",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a running server with the same concurrency on each sync read endpoint "
+        "and its async/ variant and report requests per second. Serve the project "
+        "with an ASGI server (e.g. uvicorn config.asgi:application) so both paths "
+        "run under the same entry point."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="Scheme, host and port of the running server.",
+        )
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once.")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and path.")
+        parser.add_argument(
+            "--portfolio",
+            dest="portfolio_id",
+            type=int,
+            help="Portfolio id for the detail/statistics/holdings/valuations endpoints. "
+            "Defaults to the portfolio with the most holdings.",
+        )
+        parser.add_argument(
+            "--endpoint",
+            dest="endpoints",
+            action="append",
+            choices=ENDPOINTS,
+            help="Limit to an endpoint. Can be repeated.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be at least 1")
+
+        portfolio_id = options["portfolio_id"] or self._busiest_portfolio_id()
+        base_url = options["base_url"].rstrip("/")
+
+        self.stdout.write(
+            f"{'endpoint':<22} {'path':<6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}"
+        )
+        for name in options["endpoints"] or ENDPOINTS:
+            params = {} if name == "portfolio-list" else {"id": portfolio_id, "portfolio": portfolio_id}
+            results = {}
+            for path, url_name in (("sync", name), ("async", f"async-{name}")):
+                url = f"{base_url}{reverse(url_name)}?{urlencode(params)}"
+                results[path] = run_load(url, options["concurrency"], options["requests"])
+                rps, p50, p95, errors = results[path]
+                self.stdout.write(f"{name:<22} {path:<6} {rps:>9.1f} {p50:>8.1f} {p95:>8.1f} {errors:>7}")
+            if results["sync"][0]:
+                self.stdout.write(f"{'':<22} {'ratio':<6} {results['async'][0] / results['sync'][0]:>9.2f}")
+
+    def _busiest_portfolio_id(self) -> int:
+        portfolio = Portfolio.objects.annotate(n=Count("holdings")).order_by("-n").first()
+        if portfolio is None:
+            raise CommandError("No portfolios found; pass --portfolio or load data first")
+        return portfolio.pk
+
+
+def run_load(url: str, concurrency: int, requests: int) -> Tuple[float, float, float, int]:
+    """
+        Issue ``requests`` GETs with ``concurrency`` in flight; return req/s, p50 and p95 latency in ms and errors.
+    """
+
+    def fetch(_: int) -> Tuple[float, bool]:
+        started = time.perf_counter()
+        try:
+            with urlopen(url, timeout=60) as response:
+                response.read()
+                ok = response.status == 200
+        except (HTTPError, URLError, OSError):
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples: List[Tuple[float, bool]] = list(executor.map(fetch, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return requests / elapsed, statistics.median(latencies), p95, errors
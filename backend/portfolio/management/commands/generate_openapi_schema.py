@@ -0,0 +1,33 @@
+"""
+Pre-generate the OpenAPI schema files served by the documentation endpoints.
+"""
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from portfolio.openapi import SCHEMA_FORMATS, write_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema into OPENAPI_SCHEMA_DIR (or --output-dir) for the API to serve."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--output-dir",
+            help="Directory of the schema files. Defaults to OPENAPI_SCHEMA_DIR.",
+        )
+        parser.add_argument(
+            "--format",
+            dest="formats",
+            action="append",
+            choices=list(SCHEMA_FORMATS),
+            help="Limit to a format. Can be repeated.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for schema_format in options["formats"] or SCHEMA_FORMATS:
+            try:
+                path = write_schema(schema_format, options["output_dir"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path} ({path.stat().st_size} bytes)."))
@@ -0,0 +1,91 @@
+"""
+Create upcoming holdings partitions and retire old ones.
+"""
+from datetime import date
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from portfolio.partitions import (
+    DEFAULT_AHEAD,
+    add_periods,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    partition_interval,
+    period_start,
+    retire_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-create the holdings partitions of the coming periods and, with --retain, "
+        "detach (or drop) the partitions of periods older than the retention window. "
+        "Run it from a scheduler, e.g. daily."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=DEFAULT_AHEAD,
+            help="Periods past the current one to create partitions for.",
+        )
+        parser.add_argument(
+            "--retain",
+            type=int,
+            help="Periods before the current one to keep; older partitions are detached.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop retired partitions instead of leaving them as detached tables.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the partitions without changing anything.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to manage.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["ahead"] < 0 or (options["retain"] is not None and options["retain"] < 0):
+            raise CommandError("--ahead and --retain must not be negative")
+        if options["drop"] and options["retain"] is None:
+            raise CommandError("--drop requires --retain")
+
+        connection = connections[options["database"]]
+        if not is_partitioned(connection):
+            raise CommandError("The holdings table is not partitioned (PostgreSQL only; run migrate first).")
+
+        interval = partition_interval()
+        current = period_start(date.today(), interval)
+        last = add_periods(current, interval, options["ahead"])
+        before = add_periods(current, interval, -options["retain"]) if options["retain"] is not None else None
+
+        if options["dry_run"]:
+            for partition in list_partitions(connection):
+                if partition.start is None:
+                    note = "default"
+                elif before is not None and partition.end <= before:
+                    note = "would retire"
+                else:
+                    note = f"{partition.start} to {partition.end}"
+                self.stdout.write(f"{partition.name}: {note}")
+            return
+
+        created = ensure_partitions(connection, current, last, interval)
+        for partition in created:
+            self.stdout.write(f"Created {partition.name} ({partition.start} to {partition.end})")
+
+        retired = []
+        if before is not None:
+            retired = retire_partitions(connection, before, drop=options["drop"])
+            for partition in retired:
+                self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {partition.name}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {len(created)} partitions, retired {len(retired)}.")
+        )
@@ -0,0 +1,63 @@
+"""
+Verify or rebuild the maintained holding aggregates.
+"""
+from datetime import date
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from portfolio.services import HoldingAggregateService
+
+
+class Command(BaseCommand):
+    help = "Check the holding aggregates against a full recompute and optionally rebuild them."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Report differences without rewriting the aggregates.",
+        )
+        parser.add_argument(
+            "--portfolio",
+            dest="portfolio_ids",
+            type=int,
+            action="append",
+            help="Limit to a portfolio id. Can be repeated.",
+        )
+        parser.add_argument(
+            "--date",
+            dest="valuation_dates",
+            action="append",
+            help="Limit to a valuation date (YYYY-MM-DD). Can be repeated.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        valuation_dates = None
+        if options["valuation_dates"]:
+            try:
+                valuation_dates = [date.fromisoformat(value) for value in options["valuation_dates"]]
+            except ValueError as e:
+                raise CommandError(f"Invalid date: {e}")
+        portfolio_ids = options["portfolio_ids"]
+
+        mismatches = HoldingAggregateService.verify(portfolio_ids, valuation_dates)
+        for mismatch in mismatches[:50]:
+            self.stdout.write(
+                f"portfolio {mismatch['portfolio_id']} {mismatch['valuation_date']} {mismatch['asset_type']}: "
+                f"stored {mismatch['stored_value']} ({mismatch['stored_count']} holdings), "
+                f"expected {mismatch['expected_value']} ({mismatch['expected_count']} holdings)"
+            )
+        if len(mismatches) > 50:
+            self.stdout.write(f"... and {len(mismatches) - 50} more")
+
+        if options["verify_only"]:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} aggregate rows differ from the holdings.")
+            self.stdout.write(self.style.SUCCESS("Holding aggregates match the holdings."))
+            return
+
+        rebuilt = HoldingAggregateService.rebuild(portfolio_ids, valuation_dates)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} aggregate rows ({len(mismatches)} were out of date).")
+        )
@@ -0,0 +1,153 @@
+"""
+Run the service and serializer microbenchmarks on synthetic data.
+"""
+import json
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.core.serializers.json import DjangoJSONEncoder
+
+from portfolio.benchmarks.data import SCALES, build_dataset, clear_dataset, dataset_portfolios
+from portfolio.benchmarks.suite import CASE_NAMES, DEFAULT_REPEAT, DEFAULT_TOLERANCE, compare, run_suite
+from portfolio.models import Portfolio
+
+BENCHMARK_DIR = Path(settings.BASE_DIR) / "benchmarks"
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic dataset, time the valuation services and serializers on it, "
+        "write the results as JSON and compare them with a stored baseline."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--scale", choices=list(SCALES), default="1k", help="Dataset size in holdings.")
+        parser.add_argument("--portfolios", type=int, help="Override the number of portfolios.")
+        parser.add_argument("--holdings", type=int, help="Override the holdings per portfolio and date.")
+        parser.add_argument("--dates", type=int, help="Override the number of valuation dates.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data.")
+        parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per case.")
+        parser.add_argument(
+            "--case",
+            dest="cases",
+            action="append",
+            choices=CASE_NAMES,
+            help="Limit to a case. Can be repeated.",
+        )
+        parser.add_argument("--output", help="Results file. Defaults to benchmarks/results-<scale>.json.")
+        parser.add_argument("--baseline", help="Baseline file. Defaults to benchmarks/baseline-<scale>.json.")
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Write the results to the baseline file instead of comparing with it.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=DEFAULT_TOLERANCE,
+            help="Allowed growth of wall time and memory against the baseline, as a fraction.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a case regressed.",
+        )
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Keep the synthetic dataset after the run.",
+        )
+        parser.add_argument(
+            "--reuse-data",
+            action="store_true",
+            help="Benchmark a dataset kept by an earlier run instead of building a new one.",
+        )
+        parser.add_argument(
+            "--clear-kept-data",
+            action="store_true",
+            help="Delete a dataset kept by an earlier run before building a new one.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        scale = options["scale"]
+        portfolios, holdings, dates = SCALES[scale]
+        portfolios = options["portfolios"] or portfolios
+        holdings = options["holdings"] or holdings
+        dates = options["dates"] or dates
+        output = Path(options["output"] or BENCHMARK_DIR / f"results-{scale}.json")
+        baseline_path = Path(options["baseline"] or BENCHMARK_DIR / f"baseline-{scale}.json")
+
+        kept = dataset_portfolios().order_by("pk").first()
+        created_ids = None
+        if options["reuse_data"]:
+            if kept is None:
+                raise CommandError("No kept dataset to reuse; run once with --keep-data")
+            self.stdout.write("Reusing the kept synthetic dataset.")
+            portfolio = kept
+            valuation_date = portfolio.holdings.order_by("-valuation_date").values_list("valuation_date", flat=True)[0]
+        else:
+            if kept is not None:
+                if not options["clear_kept_data"]:
+                    raise CommandError(
+                        "A dataset kept by an earlier run exists; pass --reuse-data or --clear-kept-data"
+                    )
+                self.stdout.write(f"Deleted {clear_dataset()} kept synthetic portfolios.")
+            self.stdout.write(f"Building {portfolios} portfolios x {holdings} holdings x {dates} dates...")
+            dataset = build_dataset(portfolios, holdings, dates, seed=options["seed"])
+            created_ids = dataset["portfolio_ids"]
+            portfolio = Portfolio.objects.get(pk=created_ids[0])
+            valuation_date = dataset["valuation_dates"][-1]
+
+        try:
+            results = run_suite(
+                portfolio,
+                valuation_date,
+                repeat=options["repeat"],
+                only=options["cases"],
+                meta={
+                    "scale": scale,
+                    "portfolios": portfolios,
+                    "holdings_per_portfolio_date": holdings,
+                    "dates": dates,
+                    "seed": options["seed"],
+                },
+            )
+        finally:
+            # Only the portfolios this run built are deleted; a reused dataset stays.
+            if created_ids is not None and not options["keep_data"]:
+                clear_dataset(created_ids)
+
+        for name in results["meta"]["skipped"]:
+            self.stdout.write(f"{name:<45} skipped: needs PostgreSQL, not {results['meta']['database']}")
+        for name, result in results["results"].items():
+            self.stdout.write(
+                f"{name:<45} {result['wall_seconds'] * 1000:>10.2f} ms "
+                f"{result['queries']:>5} queries {result['peak_memory_bytes'] / 1024:>10.1f} KiB"
+            )
+
+        target = baseline_path if options["save_baseline"] else output
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(results, indent=2, sort_keys=True, cls=DjangoJSONEncoder) + "\n")
+        self.stdout.write(f"Results written to {target}")
+        if options["save_baseline"]:
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline to store one.")
+            return
+
+        regressions = compare(results, json.loads(baseline_path.read_text()), options["tolerance"])
+        for regression in regressions:
+            self.stderr.write(
+                f"Regression in {regression['case']}: {regression['metric']} "
+                f"{regression['baseline']} -> {regression['current']}"
+            )
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
+        elif options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regression(s) against {baseline_path}")
@@ -0,0 +1,64 @@
+"""
+Process queued recalculation jobs.
+"""
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import close_old_connections
+
+from portfolio.jobs import LEASE_SECONDS, LeaseLost, RecalculationJobService, default_worker_id
+
+
+class Command(BaseCommand):
+    help = "Claim and run recalculation jobs until stopped, or until the queue is empty with --once."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when no job is left to claim instead of polling.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+        parser.add_argument(
+            "--lease-seconds",
+            type=int,
+            default=LEASE_SECONDS,
+            help="Seconds without a heartbeat after which a running job may be reclaimed.",
+        )
+        parser.add_argument(
+            "--worker-id",
+            default=default_worker_id(),
+            help="Identity recorded on claimed jobs. Defaults to host:pid.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["lease_seconds"] < 1:
+            raise CommandError("--lease-seconds must be at least 1")
+
+        worker_id = options["worker_id"]
+        while True:
+            close_old_connections()
+            job = RecalculationJobService.claim(worker_id, lease_seconds=options["lease_seconds"])
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Job {job.pk}: claimed, resuming at {job.processed}/{job.total}")
+            try:
+                job = RecalculationJobService.run(job, worker_id)
+            except LeaseLost as e:
+                self.stderr.write(str(e))
+                continue
+
+            if job.status == "COMPLETED":
+                self.stdout.write(self.style.SUCCESS(f"Job {job.pk}: completed, {job.processed} snapshots"))
+            else:
+                self.stderr.write(f"Job {job.pk}: {job.status.lower()}: {job.error}")
@@ -0,0 +1,62 @@
+"""
+Create valuation snapshots for every portfolio on a date.
+"""
+from datetime import date
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from portfolio.services import SNAPSHOT_BULK_BATCH_SIZE, ValuationService
+
+
+class Command(BaseCommand):
+    help = "Create or refresh valuation snapshots for all portfolios on a date."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--date",
+            dest="snapshot_date",
+            help="Snapshot date (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument(
+            "--portfolio",
+            dest="portfolio_ids",
+            type=int,
+            action="append",
+            help="Limit to a portfolio id. Can be repeated.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SNAPSHOT_BULK_BATCH_SIZE,
+            help="Number of snapshots upserted per INSERT.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        snapshot_date_str = options["snapshot_date"]
+        try:
+            snapshot_date = date.fromisoformat(snapshot_date_str) if snapshot_date_str else date.today()
+        except ValueError:
+            raise CommandError(f"Invalid date: {snapshot_date_str}")
+
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        result = ValuationService.create_snapshots_bulk(
+            snapshot_date,
+            portfolio_ids=options["portfolio_ids"],
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Snapshots for {result['snapshot_date']}: "
+                f"{result['portfolios']} portfolios, "
+                f"{result['created']} created, {result['updated']} updated, "
+                f"{result['portfolios_without_holdings']} without holdings"
+            )
+        )
+        self.stdout.write(
+            f"Timings: aggregate {result['aggregate_seconds']}s, "
+            f"upsert {result['upsert_seconds']}s, total {result['total_seconds']}s"
+        )
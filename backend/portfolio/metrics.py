@@ -0,0 +1,177 @@
+"""
+Per-request instrumentation and per-route histograms.
+
+The figures of the current request live in a context variable, so they
+follow a request across ``sync_to_async`` worker threads. Every database
+connection gets an execute wrapper when it is created; outside a request
+the wrapper costs one context variable lookup. Histograms are kept per
+process and exposed in the Prometheus text format.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class RequestMetrics:
+    """
+        Query count, SQL time and serializer time of one request.
+    """
+
+    __slots__ = ("queries", "sql_seconds", "serializer_seconds", "serializer_depth", "lock")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        # Concurrent queries of one request run on several threads.
+        self.lock = threading.Lock()
+
+    def add_query(self, seconds: float) -> None:
+        with self.lock:
+            self.queries += 1
+            self.sql_seconds += seconds
+
+
+current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("portfolio_request_metrics", default=None)
+
+
+def record_query(execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """
+        Database execute wrapper adding the query and its duration to the current request.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(time.perf_counter() - started)
+
+
+def install_query_recorder(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """
+        connection_created receiver installing record_query on the new connection.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serializer_timer() -> Iterator[None]:
+    """
+    Add the time spent in the block to the current request's serializer time.
+
+    Only the outermost block is timed, and SQL run inside it (lazy related
+    querysets) is left to the SQL figure.
+    """
+    metrics = current_metrics.get()
+    if metrics is None or metrics.serializer_depth:
+        yield
+        return
+
+    metrics.serializer_depth += 1
+    sql_before = metrics.sql_seconds
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        elapsed = time.perf_counter() - started - (metrics.sql_seconds - sql_before)
+        metrics.serializer_seconds += max(elapsed, 0.0)
+
+
+class TimedSerializerMixin:
+    """
+        Serializer mixin adding the time spent in ``to_representation`` to the current request.
+    """
+
+    def to_representation(self, instance: Any) -> Any:
+        if current_metrics.get() is None:
+            return super().to_representation(instance)
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class Histogram:
+    """
+        Cumulative-bucket histogram in the Prometheus sense.
+    """
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+HISTOGRAMS = {
+    "portfolio_request_duration_seconds": ("Request duration in seconds.", DURATION_BUCKETS),
+    "portfolio_request_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+    "portfolio_request_db_seconds": ("Time spent in SQL per request in seconds.", DURATION_BUCKETS),
+    "portfolio_request_serializer_seconds": ("Time spent in serializers per request in seconds.", DURATION_BUCKETS),
+    "portfolio_response_size_bytes": ("Response body size in bytes.", SIZE_BUCKETS),
+}
+
+
+class MetricsRegistry:
+    """
+        Per-route histograms of the request figures.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.series: Dict[Tuple[str, str, str], Histogram] = {}
+
+    def observe(self, name: str, route: str, method: str, value: float) -> None:
+        key = (name, route, method)
+        with self.lock:
+            histogram = self.series.get(key)
+            if histogram is None:
+                histogram = self.series[key] = Histogram(HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.series.clear()
+
+    def render(self, routes: Sequence[str] = ()) -> str:
+        """
+        Prometheus text exposition; ``routes`` without traffic are listed with empty histograms.
+        """
+        with self.lock:
+            series = {key: (list(h.counts), h.total, h.count) for key, h in self.series.items()}
+
+        lines: List[str] = []
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            keys = sorted({key for key in series if key[0] == name} | {(name, route, "GET") for route in routes})
+            for _, route, method in keys:
+                counts, total, count = series.get((name, route, method), ([0] * (len(buckets) + 1), 0.0, 0))
+                labels = f'route="{route}",method="{method}"'
+                cumulative = 0
+                for bound, bucket_count in zip([*buckets, "+Inf"], counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {total}")
+                lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
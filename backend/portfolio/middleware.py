@@ -0,0 +1,100 @@
+"""
+Request metrics middleware.
+"""
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from portfolio.metrics import RequestMetrics, current_metrics, registry
+
+
+def portfolio_routes() -> List[str]:
+    """
+        URL names of every route in portfolio/urls.py.
+    """
+    from portfolio.urls import urlpatterns
+
+    return [pattern.name for pattern in urlpatterns if pattern.name]
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, SQL time, serializer time and response size of API requests.
+
+    The figures are sent back in a Server-Timing header and added to the
+    per-route histograms served by the metrics endpoint. Requests outside
+    portfolio/urls.py are passed through untouched.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.enabled = getattr(settings, "PORTFOLIO_METRICS_ENABLED", True)
+        self.routes = set(portfolio_routes())
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        metrics, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self._finish(request, response, metrics, started)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not self.enabled:
+            return await self.get_response(request)
+        metrics, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self._finish(request, response, metrics, started)
+
+    def _start(self) -> Tuple[RequestMetrics, Any, float]:
+        metrics = RequestMetrics()
+        return metrics, current_metrics.set(metrics), time.perf_counter()
+
+    def _finish(
+        self, request: HttpRequest, response: HttpResponse, metrics: RequestMetrics, started: float
+    ) -> HttpResponse:
+        route = self._route(request)
+        if route is None:
+            return response
+
+        duration = time.perf_counter() - started
+        size: Optional[int] = None if response.streaming else len(response.content)
+
+        timings = [
+            f'db;dur={metrics.sql_seconds * 1000:.2f};desc="{metrics.queries} queries"',
+            f"ser;dur={metrics.serializer_seconds * 1000:.2f}",
+            f"total;dur={duration * 1000:.2f}",
+        ]
+        if size is not None:
+            timings.append(f'size;desc="{size} bytes"')
+        response["Server-Timing"] = ", ".join(timings)
+
+        method = request.method or ""
+        registry.observe("portfolio_request_duration_seconds", route, method, duration)
+        registry.observe("portfolio_request_db_queries", route, method, metrics.queries)
+        registry.observe("portfolio_request_db_seconds", route, method, metrics.sql_seconds)
+        registry.observe("portfolio_request_serializer_seconds", route, method, metrics.serializer_seconds)
+        if size is not None:
+            registry.observe("portfolio_response_size_bytes", route, method, size)
+        return response
+
+    def _route(self, request: HttpRequest) -> Optional[str]:
+        match = getattr(request, "resolver_match", None)
+        if match is None or match.url_name not in self.routes:
+            return None
+        return match.url_name
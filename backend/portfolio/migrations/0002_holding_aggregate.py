@@ -0,0 +1,87 @@
+# Generated by Django 5.0.1 on 2026-10-18 06:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+
+
+def build_holding_aggregates(apps, schema_editor):
+    Holding = apps.get_model("portfolio", "Holding")
+    HoldingAggregate = apps.get_model("portfolio", "HoldingAggregate")
+    rows = (
+        Holding.objects.order_by()
+        .values("portfolio_id", "valuation_date", "asset_type")
+        .annotate(
+            total_value=Sum(
+                ExpressionWrapper(
+                    F("quantity") * F("unit_price"),
+                    output_field=DecimalField(max_digits=40, decimal_places=12),
+                )
+            ),
+            holding_count=Count("pk"),
+        )
+    )
+    HoldingAggregate.objects.bulk_create(
+        (HoldingAggregate(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HoldingAggregate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("valuation_date", models.DateField()),
+                (
+                    "asset_type",
+                    models.CharField(
+                        choices=[
+                            ("STOCK", "Stock"),
+                            ("BOND", "Bond"),
+                            ("CASH", "Cash"),
+                            ("ETF", "ETF"),
+                            ("MUTUAL_FUND", "Mutual Fund"),
+                            ("OTHER", "Other"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("total_value", models.DecimalField(decimal_places=12, max_digits=40)),
+                ("holding_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "portfolio",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holding_aggregates",
+                        to="portfolio.portfolio",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Holding Aggregates",
+                "ordering": ["-valuation_date", "asset_type"],
+                "indexes": [
+                    models.Index(
+                        fields=["valuation_date"], name="portfolio_h_valuati_d6b72e_idx"
+                    )
+                ],
+                "unique_together": {("portfolio", "valuation_date", "asset_type")},
+            },
+        ),
+        migrations.RunPython(build_holding_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import F, Value
+from django.db.models.functions import Replace, Upper
+
+# Frozen copies of portfolio.search as of this migration; search_vector()
+# there must keep producing this expression for the index to be used.
+SEARCH_CONFIG = "simple"
+SEARCH_FIELDS = ("name", "client_name", "client_email")
+FTS_TABLE = "portfolio_portfolio_fts"
+SEARCH_VECTOR_INDEX = "portfolio_search_vector_idx"
+
+
+def search_vector():
+    return SearchVector(
+        *SEARCH_FIELDS,
+        Replace(F("client_email"), Value("@"), Value(" ")),
+        config=SEARCH_CONFIG,
+    )
+
+
+def trigram_indexes():
+    return [
+        GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=f"portfolio_{field}_trgm_idx")
+        for field in SEARCH_FIELDS
+    ]
+
+
+def has_trigram_extension(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_search_indexes(apps, schema_editor):
+    Portfolio = apps.get_model("portfolio", "Portfolio")
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.add_index(Portfolio, GinIndex(search_vector(), name=SEARCH_VECTOR_INDEX))
+        # Trigram indexes serve the default icontains search; pg_trgm ships
+        # with contrib and may be missing on minimal installs.
+        if has_trigram_extension(schema_editor):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for index in trigram_indexes():
+                schema_editor.add_index(Portfolio, index)
+    elif vendor == "sqlite":
+        table = Portfolio._meta.db_table
+        columns = ", ".join(SEARCH_FIELDS)
+        new_values = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+        old_values = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+        delete_old = (
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+        )
+        insert_new = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});"
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"{columns}, content='{table}', content_rowid='id', tokenize='unicode61')"
+        )
+        schema_editor.execute(f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN {insert_new} END")
+        schema_editor.execute(f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN {delete_old} END")
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END"
+        )
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_indexes(apps, schema_editor):
+    Portfolio = apps.get_model("portfolio", "Portfolio")
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for index in trigram_indexes():
+            schema_editor.execute(f"DROP INDEX IF EXISTS {index.name}")
+        schema_editor.remove_index(Portfolio, GinIndex(search_vector(), name=SEARCH_VECTOR_INDEX))
+    elif vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0002_holding_aggregate"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.1 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0003_portfolio_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecalculationJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("RUNNING", "Running"),
+                            ("COMPLETED", "Completed"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "portfolio_ids",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Portfolio ids to recalculate; empty for all portfolios.",
+                        null=True,
+                    ),
+                ),
+                ("date_from", models.DateField()),
+                ("date_to", models.DateField()),
+                ("chunk_size", models.IntegerField(default=500)),
+                ("total", models.IntegerField(default=0)),
+                ("processed", models.IntegerField(default=0)),
+                ("last_processed_id", models.BigIntegerField(blank=True, null=True)),
+                ("attempts", models.IntegerField(default=0)),
+                ("worker", models.CharField(blank=True, default="", max_length=255)),
+                ("heartbeat_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Recalculation Jobs",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="portfolio_r_status_2c298c_idx",
+                    )
+                ],
+            },
+        ),
+    ]
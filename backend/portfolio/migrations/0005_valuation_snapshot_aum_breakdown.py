@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0004_recalculation_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="valuationsnapshot",
+            name="aum_breakdown",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,122 @@
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations
+
+# Frozen copy of the DDL in portfolio.partitions as of this migration, so
+# later changes to that module cannot change what replaying it does.
+HOLDING_TABLE = "portfolio_holding"
+DEFAULT_PARTITION = f"{HOLDING_TABLE}_default"
+DEFAULT_AHEAD = 3
+
+
+def period_start(day, interval):
+    return date(day.year, 1, 1) if interval == "year" else date(day.year, day.month, 1)
+
+
+def add_periods(start, interval, count):
+    if interval == "year":
+        return date(start.year + count, 1, 1)
+    months = start.year * 12 + start.month - 1 + count
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(start, interval):
+    return f"{HOLDING_TABLE}_p{start:%Y}" if interval == "year" else f"{HOLDING_TABLE}_p{start:%Y_%m}"
+
+
+def move_definitions(cursor, legacy, primary_key):
+    # Index and foreign key definitions of the old table, recreated under
+    # their original names once it is dropped; the new identity sequence
+    # continues after the copied ids and takes over the old sequence's name.
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+        "(SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p')",
+        [legacy, legacy],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [legacy],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+    sequence_name = cursor.fetchone()[0]
+
+    cursor.execute(f"DROP TABLE {legacy} CASCADE")
+    cursor.execute(f"ALTER TABLE {HOLDING_TABLE} ADD CONSTRAINT {HOLDING_TABLE}_pkey PRIMARY KEY {primary_key}")
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {HOLDING_TABLE} ADD CONSTRAINT {name} {definition}")
+    for definition in indexes:
+        cursor.execute(re.sub(rf" ON (ONLY )?((\S+)\.)?{legacy} ", rf" ON \2{HOLDING_TABLE} ", definition, count=1))
+
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [HOLDING_TABLE])
+    sequence = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT setval(%s, COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {HOLDING_TABLE}", [sequence]
+    )
+    if sequence_name and sequence != sequence_name:
+        cursor.execute(f"ALTER SEQUENCE {sequence} RENAME TO {sequence_name.split('.')[-1]}")
+
+
+def partition_holdings(apps, schema_editor):
+    # Declarative partitioning is PostgreSQL only; other backends keep the plain table.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    interval = getattr(settings, "HOLDING_PARTITION_INTERVAL", "month")
+    if interval not in ("month", "year"):
+        raise ValueError('HOLDING_PARTITION_INTERVAL must be one of ["month", "year"].')
+
+    # Every row is copied while the migration holds an ACCESS EXCLUSIVE lock
+    # on the holdings table, so on a large table run it in a maintenance window.
+    legacy = f"{HOLDING_TABLE}_unpartitioned"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {HOLDING_TABLE} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {HOLDING_TABLE} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE (valuation_date)"
+        )
+        cursor.execute(f"SELECT MIN(valuation_date) FROM {legacy}")
+        first = cursor.fetchone()[0] or date.today()
+
+        # One partition per period holding data through DEFAULT_AHEAD periods past the current one.
+        start = period_start(min(first, date.today()), interval)
+        last = add_periods(period_start(date.today(), interval), interval, DEFAULT_AHEAD)
+        while start <= last:
+            end = add_periods(start, interval, 1)
+            cursor.execute(
+                f"CREATE TABLE {partition_name(start, interval)} PARTITION OF {HOLDING_TABLE} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+            start = end
+
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {HOLDING_TABLE} DEFAULT")
+        cursor.execute(f"INSERT INTO {HOLDING_TABLE} SELECT * FROM {legacy}")
+        move_definitions(cursor, legacy, primary_key="(id, valuation_date)")
+
+
+def unpartition_holdings(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    legacy = f"{HOLDING_TABLE}_partitioned"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {HOLDING_TABLE} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {HOLDING_TABLE} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+        )
+        cursor.execute(f"INSERT INTO {HOLDING_TABLE} SELECT * FROM {legacy}")
+        move_definitions(cursor, legacy, primary_key="(id)")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0005_valuation_snapshot_aum_breakdown"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_holdings, unpartition_holdings),
+    ]
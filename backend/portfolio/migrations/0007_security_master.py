@@ -0,0 +1,108 @@
+# Generated by Django 5.0.1 on 2026-10-18 07:22
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def build_security_master(apps, schema_editor):
+    Holding = apps.get_model("portfolio", "Holding")
+    Security = apps.get_model("portfolio", "Security")
+    rows = Holding.objects.order_by().values("asset_name", "asset_type").distinct()
+    Security.objects.bulk_create(
+        (Security(**row) for row in rows.iterator()),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0006_partition_holdings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Security",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("asset_name", models.CharField(max_length=255)),
+                (
+                    "asset_type",
+                    models.CharField(
+                        choices=[
+                            ("STOCK", "Stock"),
+                            ("BOND", "Bond"),
+                            ("CASH", "Cash"),
+                            ("ETF", "ETF"),
+                            ("MUTUAL_FUND", "Mutual Fund"),
+                            ("OTHER", "Other"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Securities",
+                "ordering": ["asset_name", "asset_type"],
+                "unique_together": {("asset_name", "asset_type")},
+            },
+        ),
+        migrations.CreateModel(
+            name="SecurityPrice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("price_date", models.DateField()),
+                (
+                    "unit_price",
+                    models.DecimalField(
+                        decimal_places=4,
+                        max_digits=20,
+                        validators=[
+                            django.core.validators.MinValueValidator(Decimal("0"))
+                        ],
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "security",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="prices",
+                        to="portfolio.security",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Security Prices",
+                "ordering": ["-price_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["price_date"], name="portfolio_s_price_d_af4786_idx"
+                    )
+                ],
+                "unique_together": {("security", "price_date")},
+            },
+        ),
+        migrations.RunPython(build_security_master, migrations.RunPython.noop),
+    ]
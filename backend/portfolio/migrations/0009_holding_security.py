@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def link_securities(apps, schema_editor):
+    Holding = apps.get_model("portfolio", "Holding")
+    Security = apps.get_model("portfolio", "Security")
+    rows = Holding.objects.order_by().values("asset_name", "asset_type").distinct()
+    Security.objects.bulk_create(
+        (Security(**row) for row in rows.iterator()),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    Holding.objects.update(
+        security=Subquery(
+            Security.objects.filter(
+                asset_name=OuterRef("asset_name"), asset_type=OuterRef("asset_type")
+            ).values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0008_table_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="holding",
+            name="security",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="holdings",
+                to="portfolio.security",
+            ),
+        ),
+        migrations.RunPython(link_securities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from 0009: PostgreSQL cannot alter the column while the
+    # deferred foreign key checks of its data migration are pending.
+    dependencies = [
+        ("portfolio", "0009_holding_security"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="holding",
+            name="security",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="holdings",
+                to="portfolio.security",
+            ),
+        ),
+    ]
@@ -4,10 +4,19 @@ Portfolio Valuation Models
 from portfolio.models.portfolio import Portfolio
 from portfolio.models.holding import Holding
 from portfolio.models.valuation import ValuationSnapshot
+from portfolio.models.aggregate import HoldingAggregate
+from portfolio.models.job import RecalculationJob
+from portfolio.models.security import Security, SecurityPrice
+from portfolio.models.version import TableVersion
 
 __all__ = [
     "Portfolio",
     "Holding",
     "ValuationSnapshot",
+    "HoldingAggregate",
+    "RecalculationJob",
+    "Security",
+    "SecurityPrice",
+    "TableVersion",
 ]
 
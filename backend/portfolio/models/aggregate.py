@@ -0,0 +1,35 @@
+"""
+Holding Aggregate Model
+"""
+from django.db import models
+
+from portfolio.models.portfolio import Portfolio
+from portfolio.models.holding import Holding
+
+
+class HoldingAggregate(models.Model):
+    """
+    model for the running value of a portfolio's holdings of one asset type on a date.
+
+    Rows are maintained by the Holding save/delete signals; the AUM for a
+    (portfolio, valuation_date) is the sum of at most one row per asset type.
+    """
+    portfolio = models.ForeignKey(
+        Portfolio, on_delete=models.CASCADE, related_name="holding_aggregates"
+    )
+    valuation_date = models.DateField()
+    asset_type = models.CharField(max_length=50, choices=Holding.ASSET_TYPE_CHOICES)
+    total_value = models.DecimalField(max_digits=40, decimal_places=12)
+    holding_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-valuation_date", "asset_type"]
+        verbose_name_plural = "Holding Aggregates"
+        unique_together = [["portfolio", "valuation_date", "asset_type"]]
+        indexes = [
+            models.Index(fields=["valuation_date"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.portfolio_id} - {self.valuation_date} {self.asset_type}: {self.total_value}"
@@ -2,8 +2,10 @@
 Holding Model
 """
 from decimal import Decimal
-from django.db import models
+from typing import Any
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
+from django.utils.functional import cached_property
 
 from portfolio.models.portfolio import Portfolio
 
@@ -26,6 +28,9 @@ class Holding(models.Model):
     )
     asset_name = models.CharField(max_length=255)
     asset_type = models.CharField(max_length=50, choices=ASSET_TYPE_CHOICES)
+    security = models.ForeignKey(
+        "portfolio.Security", on_delete=models.PROTECT, related_name="holdings", editable=False
+    )
     quantity = models.DecimalField(
         max_digits=20, decimal_places=8, validators=[MinValueValidator(Decimal("0"))]
     )
@@ -49,10 +54,48 @@ class Holding(models.Model):
     def __str__(self) -> str:
         return f"{self.asset_name} ({self.quantity} @ {self.unit_price})"
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+            Save in a transaction so the aggregate signal handlers commit with the row.
+
+            The security is looked up, or added to the security master, by
+            (asset_name, asset_type) whenever it does not match them.
+        """
+        # portfolio.models.security imports this module for ASSET_TYPE_CHOICES.
+        from portfolio.models.security import Security
+
+        with transaction.atomic(using=kwargs.get("using")):
+            security = self.security if Holding.security.is_cached(self) else None
+            if security is None or (security.asset_name, security.asset_type) != (self.asset_name, self.asset_type):
+                securities = Security.objects.db_manager(kwargs.get("using"))
+                self.security, _ = securities.get_or_create(asset_name=self.asset_name, asset_type=self.asset_type)
+                if kwargs.get("update_fields") is not None:
+                    kwargs["update_fields"] = {*kwargs["update_fields"], "security"}
+            self.__dict__.pop("effective_unit_price", None)
+            super().save(*args, **kwargs)
+
+    @cached_property
+    def effective_unit_price(self) -> Decimal:
+        """
+            Price the holding is valued at: the stored price of its security on
+            the valuation date, else its own unit_price.
+
+            Querysets annotated by ``portfolio.services.with_effective_price``
+            set it without a query.
+        """
+        from portfolio.models.security import SecurityPrice
+
+        price = (
+            SecurityPrice.objects.filter(security_id=self.security_id, price_date=self.valuation_date)
+            .values_list("unit_price", flat=True)
+            .first()
+        )
+        return self.unit_price if price is None else price
+
     @property
     def total_value(self) -> Decimal:
         """
             Calculate the total value of this holding.
         """
-        return self.quantity * self.unit_price
+        return self.quantity * self.effective_unit_price
 
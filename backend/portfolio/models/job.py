@@ -0,0 +1,51 @@
+"""
+Recalculation Job Model
+"""
+from django.db import models
+
+
+class RecalculationJob(models.Model):
+    """
+    model for a background recalculation of snapshot AUMs over a date range.
+
+    Snapshots in scope are processed in id order, one committed chunk at a
+    time; ``last_processed_id`` is the resume point after a crash.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    portfolio_ids = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Portfolio ids to recalculate; empty for all portfolios.",
+    )
+    date_from = models.DateField()
+    date_to = models.DateField()
+    chunk_size = models.IntegerField(default=500)
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    last_processed_id = models.BigIntegerField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    worker = models.CharField(max_length=255, blank=True, default="")
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name_plural = "Recalculation Jobs"
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Recalculation {self.pk} {self.date_from}..{self.date_to} ({self.status})"
@@ -0,0 +1,60 @@
+"""
+Security Master Models
+"""
+from decimal import Decimal
+from django.db import models
+from django.core.validators import MinValueValidator
+
+from portfolio.models.holding import Holding
+
+
+class Security(models.Model):
+    """
+    model for an asset in the security master.
+
+    Holdings refer to their security by foreign key, matched on their
+    (asset_name, asset_type).
+    """
+    asset_name = models.CharField(max_length=255)
+    asset_type = models.CharField(max_length=50, choices=Holding.ASSET_TYPE_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["asset_name", "asset_type"]
+        verbose_name_plural = "Securities"
+        unique_together = [["asset_name", "asset_type"]]
+
+    def __str__(self) -> str:
+        return f"{self.asset_name} ({self.asset_type})"
+
+
+class SecurityPrice(models.Model):
+    """
+    model for the price of a security on a date.
+
+    A stored price overrides the unit_price of every holding of the
+    security valued on that date.
+    """
+    security = models.ForeignKey(
+        Security, on_delete=models.CASCADE, related_name="prices"
+    )
+    price_date = models.DateField()
+    unit_price = models.DecimalField(
+        max_digits=20,
+        decimal_places=4,
+        validators=[MinValueValidator(Decimal("0"))],
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-price_date"]
+        verbose_name_plural = "Security Prices"
+        unique_together = [["security", "price_date"]]
+        indexes = [
+            models.Index(fields=["price_date"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.security_id} - {self.price_date}: {self.unit_price}"
@@ -1,3 +1,4 @@
+from typing import Any, Sequence
 from django.db import models
 
 from portfolio.models.portfolio import Portfolio
@@ -13,6 +14,12 @@ class ValuationSnapshot(models.Model):
         ("CONFIRMED", "Confirmed"),
         ("ARCHIVED", "Archived"),
     ]
+    # Status -> statuses a snapshot may move to from it.
+    STATUS_TRANSITIONS = {
+        "DRAFT": ("CONFIRMED",),
+        "CONFIRMED": ("ARCHIVED",),
+        "ARCHIVED": (),
+    }
 
     portfolio = models.ForeignKey(
         Portfolio,
@@ -29,6 +36,8 @@ class ValuationSnapshot(models.Model):
         null=True,
         blank=True,
     )
+    # Asset type -> AUM in that type as a decimal string, computed with total_aum.
+    aum_breakdown = models.JSONField(null=True, blank=True)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -45,3 +54,12 @@ class ValuationSnapshot(models.Model):
     def __str__(self) -> str:
         return f"{self.portfolio.name} - {self.snapshot_date} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db: str, field_names: Sequence[str], values: Sequence[Any]) -> "ValuationSnapshot":
+        """
+            Remember the loaded portfolio so a move can invalidate both portfolios.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_portfolio_id = instance.__dict__.get("portfolio_id")
+        return instance
+
@@ -0,0 +1,21 @@
+"""
+Table Version Model
+"""
+from django.db import models
+
+
+class TableVersion(models.Model):
+    """
+    model for the change counter of a table, bumped after every committed write to it.
+
+    The read endpoints build their ETags from the counters of the tables
+    behind each response (see portfolio.versions).
+    """
+    table_name = models.CharField(max_length=63, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Table Versions"
+
+    def __str__(self) -> str:
+        return f"{self.table_name}: {self.version}"
@@ -0,0 +1,106 @@
+"""
+OpenAPI schema of the API, generated once instead of on every request.
+
+Generating the schema introspects every view and serializer, so it is
+done at most once per process: the first request for a format reads the
+file written by ``generate_openapi_schema`` into ``OPENAPI_SCHEMA_DIR``,
+or generates the schema when no such file exists, and later requests are
+served from memory. drf_yasg's generator is only imported when a schema
+is actually generated.
+"""
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+SCHEMA_TITLE = "Portfolio Valuation API"
+SCHEMA_VERSION = "v1"
+SCHEMA_DESCRIPTION = "API for managing investment portfolios, holdings, and valuation snapshots"
+SCHEMA_FORMATS = {
+    ".json": "application/json; charset=utf-8",
+    ".yaml": "application/yaml; charset=utf-8",
+}
+SCHEMA_FILE = "swagger{format}"
+
+_schemas: Dict[str, bytes] = {}
+_schemas_lock = threading.Lock()
+
+
+def schema_info() -> Any:
+    """
+        The drf_yasg ``Info`` object of the schema.
+    """
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title=SCHEMA_TITLE,
+        default_version=SCHEMA_VERSION,
+        description=SCHEMA_DESCRIPTION,
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@portfolio.local"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def generate_schema(schema_format: str) -> bytes:
+    """
+        Generate the public schema of every endpoint, encoded as ``.json`` or ``.yaml``.
+    """
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    codec_class = OpenAPICodecYaml if schema_format == ".yaml" else OpenAPICodecJson
+    swagger = OpenAPISchemaGenerator(schema_info()).get_schema(request=None, public=True)
+    return codec_class(validators=[]).encode(swagger)
+
+
+def schema_path(schema_format: str, directory: Optional[str] = None) -> Optional[Path]:
+    """
+        Path of the pre-generated schema file of a format, or None when no schema directory is configured.
+    """
+    directory = directory or settings.OPENAPI_SCHEMA_DIR
+    if not directory:
+        return None
+    return Path(directory) / SCHEMA_FILE.format(format=schema_format)
+
+
+def get_schema(schema_format: str) -> bytes:
+    """
+        The encoded schema of a format, from memory, the pre-generated file or a one-off generation.
+    """
+    schema = _schemas.get(schema_format)
+    if schema is None:
+        with _schemas_lock:
+            schema = _schemas.get(schema_format)
+            if schema is None:
+                path = schema_path(schema_format)
+                if path is not None and path.is_file():
+                    schema = path.read_bytes()
+                else:
+                    schema = generate_schema(schema_format)
+                _schemas[schema_format] = schema
+    return schema
+
+
+def write_schema(schema_format: str, directory: Optional[str] = None) -> Path:
+    """
+        Generate the schema of a format into a directory, ``OPENAPI_SCHEMA_DIR`` by default.
+    """
+    path = schema_path(schema_format, directory)
+    if path is None:
+        raise ValueError("No schema directory given and OPENAPI_SCHEMA_DIR is not set.")
+    schema = generate_schema(schema_format)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(schema)
+    with _schemas_lock:
+        _schemas.pop(schema_format, None)
+    return path
+
+
+def clear_schema_cache() -> None:
+    """
+        Forget the schemas held in memory so the next request loads or generates them again.
+    """
+    with _schemas_lock:
+        _schemas.clear()
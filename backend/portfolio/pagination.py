@@ -0,0 +1,208 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are addressed by the ordering values of a boundary row instead of
+an OFFSET, so every page is an index range scan no matter how deep the
+client has paged. Counting is optional because COUNT(*) over a large
+filtered set costs as much as the OFFSET it replaces.
+"""
+import base64
+import json
+import operator
+from functools import reduce
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+from portfolio.concurrency import run_concurrently
+
+CURSOR_PARAM = "cursor"
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+class InvalidCursor(ValueError):
+    """
+        Raised when a cursor cannot be decoded for the requested ordering.
+    """
+
+
+def is_cursor_request(params: Any) -> bool:
+    """
+        Whether a list request opted into cursor pagination.
+    """
+    return params.get("pagination") == "cursor" or CURSOR_PARAM in params
+
+
+class KeysetPage:
+    """
+        One page of rows plus the cursors pointing at its neighbours.
+    """
+
+    def __init__(self, rows: List[Any], next_cursor: Optional[str], prev_cursor: Optional[str]) -> None:
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset on a unique ordering.
+
+    ``ordering`` uses Django's ``"-field"`` notation and must end with a
+    unique tiebreaker (normally ``id`` or ``-id``).
+    """
+
+    def __init__(self, queryset: QuerySet, ordering: Sequence[str], page_size: int) -> None:
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        self.queryset = queryset
+        self.ordering = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+        self.page_size = page_size
+        self.fields = [queryset.model._meta.get_field(name) for name, _ in self.ordering]
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """
+            Fetch the page after (or before) the cursor, or the first page.
+        """
+        if not cursor:
+            rows = list(self.queryset.order_by(*self._order_by(reverse=False))[: self.page_size + 1])
+            has_more = len(rows) > self.page_size
+            rows = rows[: self.page_size]
+            return KeysetPage(rows, self._cursor(rows[-1], NEXT) if has_more else None, None)
+
+        direction, values = self._decode(cursor)
+        reverse = direction == PREVIOUS
+        rows = list(
+            self.queryset.filter(self._seek(values, reverse)).order_by(*self._order_by(reverse))[
+                : self.page_size + 1
+            ]
+        )
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            next_cursor = self._cursor(rows[-1], NEXT) if rows else None
+            prev_cursor = self._cursor(rows[0], PREVIOUS) if has_more else None
+        else:
+            next_cursor = self._cursor(rows[-1], NEXT) if has_more else None
+            prev_cursor = self._cursor(rows[0], PREVIOUS) if rows else None
+        return KeysetPage(rows, next_cursor, prev_cursor)
+
+    def count(self, mode: str) -> Optional[int]:
+        """
+            Total rows for the filtered queryset, estimated from the planner or skipped.
+        """
+        if mode == COUNT_NONE:
+            return None
+        if mode == COUNT_ESTIMATE:
+            estimate = estimate_count(self.queryset)
+            if estimate is not None:
+                return estimate
+        return self.queryset.count()
+
+    def _order_by(self, reverse: bool) -> List[str]:
+        return [f"{'-' if descending != reverse else ''}{name}" for name, descending in self.ordering]
+
+    def _seek(self, values: List[Any], reverse: bool) -> Q:
+        """
+        Rows strictly after ``values`` in the (possibly reversed) ordering:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        terms = []
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != reverse else "gt"
+            term = Q(**{f"{name}__{lookup}": values[index]})
+            for (previous_name, _), previous_value in zip(self.ordering[:index], values[:index]):
+                term &= Q(**{previous_name: previous_value})
+            terms.append(term)
+        return reduce(operator.or_, terms)
+
+    def _cursor(self, row: Any, direction: str) -> str:
+        if isinstance(row, dict):
+            # A .values() row: expose the ordering columns as attributes for value_to_string.
+            row = SimpleNamespace(**{field.attname: row[field.name] for field in self.fields})
+        values = [field.value_to_string(row) for field in self.fields]
+        payload = json.dumps({"d": direction, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode(self, cursor: str) -> Tuple[str, List[Any]]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            direction = payload["d"]
+            raw_values = payload["v"]
+            if direction not in (NEXT, PREVIOUS) or len(raw_values) != len(self.fields):
+                raise InvalidCursor("Invalid cursor")
+            values = [field.to_python(value) for field, value in zip(self.fields, raw_values)]
+        except InvalidCursor:
+            raise
+        except Exception:
+            raise InvalidCursor("Invalid cursor")
+        if any(value is None for value in values):
+            raise InvalidCursor("Invalid cursor")
+        return direction, values
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Row estimate from the PostgreSQL planner; None where no estimate is available.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def keyset_page_data(paginator: KeysetPaginator, params: Any) -> Dict[str, Any]:
+    """
+    Page rows and cursor metadata for a list response.
+
+    Raises ValueError (InvalidCursor for a bad cursor) on invalid parameters.
+    """
+    count_mode = _count_mode(params)
+    page = paginator.page(params.get(CURSOR_PARAM))
+    return _page_data(page, paginator.count(count_mode), count_mode)
+
+
+async def akeyset_page_data(paginator: KeysetPaginator, params: Any) -> Dict[str, Any]:
+    """
+    Async keyset_page_data; the page and the count are fetched concurrently.
+    """
+    count_mode = _count_mode(params)
+    page, total = await run_concurrently(
+        lambda: paginator.page(params.get(CURSOR_PARAM)),
+        lambda: paginator.count(count_mode),
+    )
+    return _page_data(page, total, count_mode)
+
+
+def _count_mode(params: Any) -> str:
+    count_mode = params.get("count", COUNT_NONE)
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"count must be one of {list(COUNT_MODES)}")
+    return count_mode
+
+
+def _page_data(page: KeysetPage, total: Optional[int], count_mode: str) -> Dict[str, Any]:
+    return {
+        "rows": page.rows,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+        "total": total,
+        "total_mode": count_mode,
+    }
@@ -0,0 +1,281 @@
+"""
+PostgreSQL range partitioning of the holdings table by valuation_date.
+
+The table is partitioned by month or year (``HOLDING_PARTITION_INTERVAL``).
+A DEFAULT partition catches rows outside every range, so an insert never
+fails for lack of a partition; creating a range moves the rows it covers
+out of the default partition. Queries filtering on valuation_date are
+pruned to the matching partitions by the planner.
+
+The primary key becomes (id, valuation_date), as PostgreSQL requires the
+partition key in every unique index; ids still come from one sequence.
+"""
+import re
+from datetime import date
+from typing import Any, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from portfolio.cache import invalidate_statistics
+from portfolio.models import Holding, HoldingAggregate
+from portfolio.versions import touch
+
+HOLDING_TABLE = "portfolio_holding"
+DEFAULT_PARTITION = f"{HOLDING_TABLE}_default"
+INTERVALS = ("month", "year")
+DEFAULT_AHEAD = 3
+
+BOUND_RE = re.compile(r"FOR VALUES FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+class Partition(NamedTuple):
+    """
+        One partition of the holdings table; start and end are None for the default partition.
+    """
+    name: str
+    start: Optional[date]
+    end: Optional[date]
+
+
+def partition_interval() -> str:
+    """
+        The configured partition interval.
+    """
+    interval = getattr(settings, "HOLDING_PARTITION_INTERVAL", "month")
+    if interval not in INTERVALS:
+        raise ValueError(f"HOLDING_PARTITION_INTERVAL must be one of {list(INTERVALS)}.")
+    return interval
+
+
+def period_start(day: date, interval: str) -> date:
+    """
+        First day of the month or year containing ``day``.
+    """
+    return date(day.year, 1, 1) if interval == "year" else date(day.year, day.month, 1)
+
+
+def next_period(start: date, interval: str) -> date:
+    """
+        First day of the period after the one starting at ``start``.
+    """
+    if interval == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def add_periods(start: date, interval: str, count: int) -> date:
+    """
+        First day of the period ``count`` periods after (or, when negative, before) the one starting at ``start``.
+    """
+    if interval == "year":
+        return date(start.year + count, 1, 1)
+    months = start.year * 12 + start.month - 1 + count
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    """
+        Name of the partition of the period starting at ``start``.
+    """
+    return f"{HOLDING_TABLE}_p{start:%Y}" if interval == "year" else f"{HOLDING_TABLE}_p{start:%Y_%m}"
+
+
+def is_partitioned(connection: BaseDatabaseWrapper) -> bool:
+    """
+        Whether the holdings table is a partitioned table.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [HOLDING_TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(connection: BaseDatabaseWrapper) -> List[Partition]:
+    """
+        Partitions of the holdings table, ranges in date order and the default partition last.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s)",
+            [HOLDING_TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_RE.match(bound)
+        if match:
+            partitions.append(Partition(name, date.fromisoformat(match[1]), date.fromisoformat(match[2])))
+        else:
+            partitions.append(Partition(name, None, None))
+    return sorted(partitions, key=lambda partition: (partition.start is None, partition.start or date.min))
+
+
+def create_partition(connection: BaseDatabaseWrapper, start: date, interval: str) -> Optional[Partition]:
+    """
+    Create the partition of the period starting at ``start``.
+
+    Rows of the period already in the default partition are moved into it.
+    Returns None, creating nothing, when the period overlaps an existing
+    partition (for example one created with another interval).
+    """
+    end = next_period(start, interval)
+    partitions = list_partitions(connection)
+    for partition in partitions:
+        if partition.start is not None and partition.start < end and start < partition.end:
+            return None
+
+    quote = connection.ops.quote_name
+    partition = Partition(partition_name(start, interval), start, end)
+    has_default = any(existing.start is None for existing in partitions)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        moved = False
+        if has_default:
+            cursor.execute(
+                f"SELECT 1 FROM {quote(DEFAULT_PARTITION)} WHERE valuation_date >= %s AND valuation_date < %s LIMIT 1",
+                [start, end],
+            )
+            moved = cursor.fetchone() is not None
+        if moved:
+            cursor.execute(f"ALTER TABLE {quote(HOLDING_TABLE)} DETACH PARTITION {quote(DEFAULT_PARTITION)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(partition.name)} PARTITION OF {quote(HOLDING_TABLE)} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+        if moved:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} "
+                f"WHERE valuation_date >= %s AND valuation_date < %s RETURNING *) "
+                f"INSERT INTO {quote(partition.name)} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(f"ALTER TABLE {quote(HOLDING_TABLE)} ATTACH PARTITION {quote(DEFAULT_PARTITION)} DEFAULT")
+    return partition
+
+
+def ensure_partitions(
+    connection: BaseDatabaseWrapper, first: date, last: date, interval: str
+) -> List[Partition]:
+    """
+        Create the missing partitions of every period from ``first`` through ``last``.
+    """
+    created = []
+    start = period_start(first, interval)
+    while start <= last:
+        partition = create_partition(connection, start, interval)
+        if partition is not None:
+            created.append(partition)
+        start = next_period(start, interval)
+    return created
+
+
+def retire_partitions(connection: BaseDatabaseWrapper, before: date, drop: bool = False) -> List[Partition]:
+    """
+    Detach, or drop, every range partition ending on or before ``before``.
+
+    Detached partitions stay behind as plain tables. Their holdings leave
+    the holdings table without signals firing, so the holding aggregates
+    of the retired dates are deleted and the statistics cache invalidated.
+    """
+    quote = connection.ops.quote_name
+    retired = []
+    for partition in list_partitions(connection):
+        if partition.end is None or partition.end > before:
+            continue
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {quote(HOLDING_TABLE)} DETACH PARTITION {quote(partition.name)}")
+                if drop:
+                    # Deferred foreign key checks of rows written earlier in the transaction block a DROP.
+                    connection.check_constraints()
+                    cursor.execute(f"DROP TABLE {quote(partition.name)}")
+            aggregates = HoldingAggregate.objects.using(connection.alias).filter(
+                valuation_date__gte=partition.start, valuation_date__lt=partition.end
+            )
+            invalidate_statistics(aggregates.values_list("portfolio_id", flat=True).distinct())
+            aggregates.delete()
+            touch(Holding, using=connection.alias)
+        retired.append(partition)
+    return retired
+
+
+def partition_table(connection: BaseDatabaseWrapper, interval: str, ahead: int = DEFAULT_AHEAD) -> None:
+    """
+    Convert the plain holdings table into a partitioned table, keeping rows, ids, indexes and foreign keys.
+
+    Partitions are created for every period holding data and ``ahead``
+    periods past the current one. Rows are copied, so on a large table this
+    runs in a maintenance window.
+    """
+    legacy = f"{HOLDING_TABLE}_unpartitioned"
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {HOLDING_TABLE} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {HOLDING_TABLE} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE (valuation_date)"
+        )
+        cursor.execute(f"SELECT MIN(valuation_date) FROM {legacy}")
+        first = cursor.fetchone()[0] or date.today()
+
+    last = add_periods(period_start(date.today(), interval), interval, ahead)
+    ensure_partitions(connection, min(first, date.today()), last, interval)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {HOLDING_TABLE} DEFAULT")
+        cursor.execute(f"INSERT INTO {HOLDING_TABLE} SELECT * FROM {legacy}")
+        _move_definitions(cursor, legacy, primary_key="(id, valuation_date)")
+
+
+def unpartition_table(connection: BaseDatabaseWrapper) -> None:
+    """
+        Convert the partitioned holdings table back into a plain table, dropping every partition.
+    """
+    legacy = f"{HOLDING_TABLE}_partitioned"
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {HOLDING_TABLE} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {HOLDING_TABLE} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+        )
+        cursor.execute(f"INSERT INTO {HOLDING_TABLE} SELECT * FROM {legacy}")
+        _move_definitions(cursor, legacy, primary_key="(id)")
+
+
+def _move_definitions(cursor: Any, legacy: str, primary_key: str) -> None:
+    # Index and foreign key definitions of the old table, recreated under
+    # their original names once it is dropped; the new identity sequence
+    # continues after the copied ids and takes over the old sequence's name.
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+        "(SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p')",
+        [legacy, legacy],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [legacy],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+    sequence_name = cursor.fetchone()[0]
+
+    cursor.execute(f"DROP TABLE {legacy} CASCADE")
+    cursor.execute(f"ALTER TABLE {HOLDING_TABLE} ADD CONSTRAINT {HOLDING_TABLE}_pkey PRIMARY KEY {primary_key}")
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {HOLDING_TABLE} ADD CONSTRAINT {name} {definition}")
+    for definition in indexes:
+        cursor.execute(re.sub(rf" ON (ONLY )?((\S+)\.)?{legacy} ", rf" ON \2{HOLDING_TABLE} ", definition, count=1))
+
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [HOLDING_TABLE])
+    sequence = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT setval(%s, COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {HOLDING_TABLE}", [sequence]
+    )
+    if sequence_name and sequence != sequence_name:
+        cursor.execute(f"ALTER SEQUENCE {sequence} RENAME TO {sequence_name.split('.')[-1]}")
@@ -0,0 +1,303 @@
+"""
+Process-wide PostgreSQL connection pools for the ``portfolio.pooling`` backend.
+
+Django keeps one connection per thread and closes it at the end of each
+request (CONN_MAX_AGE = 0). With this backend, closing hands the
+connection back to a pool shared by every thread of the worker, and the
+next request checks one out instead of paying for a new connection.
+
+A checked-out connection that sat idle longer than ``check_after``
+seconds is pinged first. Connections that fail the ping, are older than
+``max_lifetime`` or were idle longer than ``max_idle`` are replaced.
+When ``max_size`` connections are in use a checkout waits up to
+``timeout`` seconds. Pool sizes, waiters and checkout latency are exported
+on the metrics endpoint.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+
+from portfolio.metrics import Histogram
+
+POOL_DEFAULTS = {
+    "max_size": 10,
+    "timeout": 10.0,
+    "check_after": 5.0,
+    "max_idle": 300.0,
+    "max_lifetime": 3600.0,
+}
+CHECKOUT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """
+        No pooled connection became free within the checkout timeout.
+    """
+
+
+class ConnectionPool:
+    """
+        Bounded, thread-safe pool of psycopg2 connections to one database.
+    """
+
+    def __init__(self, alias: str, database: str, **options: Any) -> None:
+        unknown = set(options) - set(POOL_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown pool options: {sorted(unknown)}.")
+        self.alias = alias
+        self.database = database
+        self.options = {**POOL_DEFAULTS, **options}
+        if self.options["max_size"] < 1:
+            raise ValueError("Pool max_size must be at least 1.")
+
+        self.condition = threading.Condition()
+        # (connection, created_at, returned_at); the most recently returned is reused first.
+        self.idle: Deque[Tuple[Any, float, float]] = deque()
+        self.created_at: Dict[int, float] = {}
+        self.size = 0
+        self.waiting = 0
+        self.counters = {"checkouts": 0, "timeouts": 0, "created": 0, "closed": 0, "failed_checks": 0}
+        self.checkout_seconds = Histogram(CHECKOUT_BUCKETS)
+
+    def getconn(self, connect: Callable[[], Any]) -> Any:
+        """
+        Check out a healthy connection, creating one with ``connect`` while the pool is below max_size.
+
+        Raises PoolTimeout when none frees up within the timeout.
+        """
+        started = time.monotonic()
+        deadline = started + self.options["timeout"]
+        while True:
+            connection, created_at, returned_at = self._reserve(deadline)
+            if connection is None:
+                try:
+                    connection = connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                with self.condition:
+                    self.counters["created"] += 1
+                self.created_at[id(connection)] = time.monotonic()
+                break
+            if time.monotonic() - returned_at < self.options["check_after"] or self._ping(connection):
+                break
+            with self.condition:
+                self.counters["failed_checks"] += 1
+            self._discard(connection)
+
+        with self.condition:
+            self.counters["checkouts"] += 1
+            self.checkout_seconds.observe(time.monotonic() - started)
+        return connection
+
+    def putconn(self, connection: Any) -> None:
+        """
+            Return a connection, rolling back an open transaction; broken or expired connections are closed.
+        """
+        status = extensions.TRANSACTION_STATUS_UNKNOWN if connection.closed else connection.info.transaction_status
+        if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+            try:
+                connection.rollback()
+                status = connection.info.transaction_status
+            except psycopg2.Error:
+                status = extensions.TRANSACTION_STATUS_UNKNOWN
+
+        now = time.monotonic()
+        created_at = self.created_at.get(id(connection), now)
+        if status != extensions.TRANSACTION_STATUS_IDLE or now - created_at > self.options["max_lifetime"]:
+            self._discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, created_at, now))
+            self.condition.notify()
+
+    def close(self) -> None:
+        """
+            Close the idle connections; connections in use are closed when they are returned.
+        """
+        with self.condition:
+            idle, self.idle = list(self.idle), deque()
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+            Current sizes and lifetime counters of the pool.
+        """
+        with self.condition:
+            return {
+                "alias": self.alias,
+                "database": self.database,
+                "max_size": self.options["max_size"],
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                "waiting": self.waiting,
+                **self.counters,
+                "checkout_seconds": (
+                    list(self.checkout_seconds.counts),
+                    self.checkout_seconds.total,
+                    self.checkout_seconds.count,
+                ),
+            }
+
+    def _reserve(self, deadline: float) -> Tuple[Optional[Any], float, float]:
+        # An idle connection, or (None, ...) after taking a slot for a new one.
+        with self.condition:
+            self.waiting += 1
+            try:
+                while True:
+                    self._expire_idle()
+                    if self.idle:
+                        return self.idle.pop()
+                    if self.size < self.options["max_size"]:
+                        self.size += 1
+                        return None, 0.0, 0.0
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No connection to {self.database!r} became free within {self.options['timeout']}s "
+                            f"(max_size {self.options['max_size']})."
+                        )
+                    self.condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+
+    def _expire_idle(self) -> None:
+        # Called with the condition held; the oldest returned connections are at the left.
+        now = time.monotonic()
+        while self.idle and (
+            now - self.idle[0][2] > self.options["max_idle"] or now - self.idle[0][1] > self.options["max_lifetime"]
+        ):
+            connection, _, _ = self.idle.popleft()
+            self.size -= 1
+            self.counters["closed"] += 1
+            self.created_at.pop(id(connection), None)
+            _close_quietly(connection)
+
+    def _release_slot(self) -> None:
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def _discard(self, connection: Any) -> None:
+        self.created_at.pop(id(connection), None)
+        _close_quietly(connection)
+        with self.condition:
+            self.size -= 1
+            self.counters["closed"] += 1
+            self.condition.notify()
+
+    @staticmethod
+    def _ping(connection: Any) -> bool:
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+
+def _close_quietly(connection: Any) -> None:
+    try:
+        connection.close()
+    except psycopg2.Error:
+        pass
+
+
+_pools: Dict[Tuple[str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, conn_params: Dict[str, Any], options: Dict[str, Any]) -> ConnectionPool:
+    """
+        The pool of a database alias and connection parameters, created on first use.
+    """
+    key = (alias, repr(sorted(conn_params.items())))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(alias, conn_params.get("dbname", ""), **options)
+    return pool
+
+
+def close_pools(alias: Optional[str] = None, database: Optional[str] = None) -> None:
+    """
+        Close and forget the pools of an alias and/or database, or all pools.
+    """
+    with _pools_lock:
+        keys = [
+            key
+            for key, pool in _pools.items()
+            if (alias is None or pool.alias == alias) and (database is None or pool.database == database)
+        ]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    """
+        Stats of every pool of this process.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+POOL_GAUGES = {
+    "portfolio_db_pool_max_size": ("max_size", "Maximum connections of the pool."),
+    "portfolio_db_pool_size": ("size", "Open connections of the pool."),
+    "portfolio_db_pool_in_use": ("in_use", "Connections checked out of the pool."),
+    "portfolio_db_pool_idle": ("idle", "Idle connections in the pool."),
+    "portfolio_db_pool_waiting": ("waiting", "Threads waiting for a pooled connection."),
+}
+POOL_COUNTERS = {
+    "portfolio_db_pool_checkouts_total": ("checkouts", "Connections checked out."),
+    "portfolio_db_pool_timeouts_total": ("timeouts", "Checkouts that timed out."),
+    "portfolio_db_pool_connections_created_total": ("created", "Connections opened."),
+    "portfolio_db_pool_connections_closed_total": ("closed", "Connections closed."),
+    "portfolio_db_pool_failed_checks_total": ("failed_checks", "Connections that failed the checkout health check."),
+}
+
+
+def render_pool_metrics() -> str:
+    """
+        Prometheus text exposition of the pool stats; empty when no pool is in use.
+    """
+    stats = pool_stats()
+    if not stats:
+        return ""
+
+    lines: List[str] = []
+    for kind, metrics in (("gauge", POOL_GAUGES), ("counter", POOL_COUNTERS)):
+        for name, (field, help_text) in metrics.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for pool in stats:
+                lines.append(f'{name}{{alias="{pool["alias"]}",database="{pool["database"]}"}} {pool[field]}')
+
+    name = "portfolio_db_pool_checkout_seconds"
+    lines.append(f"# HELP {name} Time to check out a connection, including opening a new one, in seconds.")
+    lines.append(f"# TYPE {name} histogram")
+    for pool in stats:
+        counts, total, count = pool["checkout_seconds"]
+        labels = f'alias="{pool["alias"]}",database="{pool["database"]}"'
+        cumulative = 0
+        for bound, bucket_count in zip([*CHECKOUT_BUCKETS, "+Inf"], counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {total}")
+        lines.append(f"{name}_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
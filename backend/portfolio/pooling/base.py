@@ -0,0 +1,40 @@
+"""
+PostgreSQL backend handing connections to a process-wide pool instead of closing them.
+
+Configure with ``"ENGINE": "portfolio.pooling"`` and pool options in
+``OPTIONS["pool"]`` (see ``POOL_DEFAULTS``); ``CONN_MAX_AGE`` stays 0 so
+every request returns its connection.
+"""
+from typing import Any, Dict
+
+from django.db.backends.postgresql import base, creation
+
+from portfolio.pooling import ConnectionPool, close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name: str, verbosity: int) -> None:
+        # Idle pooled connections would keep the test database in use.
+        close_pools(database=test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return get_pool(self.alias, self.get_connection_params(), self.settings_dict["OPTIONS"].get("pool") or {})
+
+    def get_connection_params(self) -> Dict[str, Any]:
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params: Dict[str, Any]) -> Any:
+        return self.pool.getconn(lambda: base.DatabaseWrapper.get_new_connection(self, conn_params))
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
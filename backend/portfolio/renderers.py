@@ -0,0 +1,57 @@
+"""
+JSON renderer backed by orjson.
+
+orjson is optional. Without it, or for any payload orjson cannot encode
+exactly like DRF's JSONRenderer (dates, Decimals and other types handled
+by DRF's encoder, non-string keys, indented output), rendering falls back
+to DRF's own encoder, so the bytes on the wire never depend on whether
+orjson is installed.
+"""
+from typing import Any, Mapping, Optional
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Hand every type DRF's encoder formats differently back to it.
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson is not None else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when available.
+
+    Meant for payloads whose values serializers have already turned into
+    strings, numbers and nulls: orjson writes floats with a shorter
+    exponent (``1e16`` instead of ``1e+16``).
+    """
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping as JSONRenderer, keeping the output a strict JavaScript subset.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
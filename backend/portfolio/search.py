@@ -0,0 +1,86 @@
+"""
+Indexed, ranked portfolio search.
+
+PostgreSQL matches a ``simple`` text-search vector over name, client name
+and client email; the vector expression is the one indexed by migration
+0003, so the match is a GIN index scan. SQLite matches against the FTS5
+table that migration maintains with triggers. Both backends rank results
+and treat every search word as a prefix.
+"""
+from typing import List
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, FloatField, QuerySet, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Replace
+
+SEARCH_CONTAINS = "contains"
+SEARCH_FULLTEXT = "fulltext"
+SEARCH_MODES = (SEARCH_CONTAINS, SEARCH_FULLTEXT)
+
+SEARCH_CONFIG = "simple"
+SEARCH_FIELDS = ("name", "client_name", "client_email")
+FTS_TABLE = "portfolio_portfolio_fts"
+
+
+def search_vector() -> SearchVector:
+    """
+    Text-search vector over the searchable portfolio fields, as indexed.
+
+    The parser keeps an email address as one lexeme, so the email is added
+    a second time with "@" replaced by a space to make its domain searchable.
+    """
+    return SearchVector(
+        *SEARCH_FIELDS,
+        Replace(F("client_email"), Value("@"), Value(" ")),
+        config=SEARCH_CONFIG,
+    )
+
+
+def search_words(term: str) -> List[str]:
+    """
+        Words of a search term, split on whitespace.
+    """
+    return [word for word in term.split() if word]
+
+
+def search_portfolios(queryset: QuerySet, term: str) -> QuerySet:
+    """
+    Portfolios matching every word of ``term`` as a prefix.
+
+    The queryset is annotated with ``search_rank``; higher ranks are better
+    matches. A term without any words matches nothing.
+    """
+    words = search_words(term)
+    if not words:
+        return queryset.none()
+    if connections[queryset.db].vendor == "sqlite":
+        return _search_fts5(queryset, words)
+    return _search_postgresql(queryset, words)
+
+
+def _search_postgresql(queryset: QuerySet, words: List[str]) -> QuerySet:
+    # Each word is a quoted lexeme with a prefix marker: 'word':* & 'other':*
+    raw_query = " & ".join("'{}':*".format(word.replace("\\", "\\\\").replace("'", "''")) for word in words)
+    query = SearchQuery(raw_query, config=SEARCH_CONFIG, search_type="raw")
+    return queryset.annotate(search=search_vector()).filter(search=query).annotate(
+        search_rank=SearchRank(F("search"), query)
+    )
+
+
+def _search_fts5(queryset: QuerySet, words: List[str]) -> QuerySet:
+    # FTS5 strings are double quoted; a trailing * makes each one a prefix query.
+    match = " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+    table = queryset.model._meta.db_table
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    ).annotate(
+        # bm25() is lower for better matches.
+        search_rank=RawSQL(
+            f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id",
+            [match],
+            output_field=FloatField(),
+        )
+    )
@@ -4,18 +4,35 @@ Portfolio Valuation Serializers
 from portfolio.serializers.portfolio import (
     PortfolioSerializer,
     PortfolioDetailSerializer,
+    PortfolioDetailQuerySerializer,
+    PortfolioStatisticsBatchQuerySerializer,
 )
-from portfolio.serializers.holding import HoldingSerializer
+from portfolio.serializers.holding import HoldingSerializer, HoldingBulkRowSerializer, HoldingRollForwardSerializer
 from portfolio.serializers.valuation import (
     ValuationSnapshotSerializer,
     ValuationSnapshotCreateSerializer,
+    ValuationHistoryQuerySerializer,
+    ValuationAllocationQuerySerializer,
+    ValuationBulkStatusSerializer,
 )
+from portfolio.serializers.security import SecurityPriceRowSerializer
+from portfolio.serializers.job import RecalculationJobSerializer, RecalculationJobCreateSerializer
 
 __all__ = [
     "PortfolioSerializer",
     "PortfolioDetailSerializer",
+    "PortfolioDetailQuerySerializer",
+    "PortfolioStatisticsBatchQuerySerializer",
     "HoldingSerializer",
+    "HoldingBulkRowSerializer",
+    "HoldingRollForwardSerializer",
     "ValuationSnapshotSerializer",
     "ValuationSnapshotCreateSerializer",
+    "ValuationHistoryQuerySerializer",
+    "ValuationAllocationQuerySerializer",
+    "ValuationBulkStatusSerializer",
+    "SecurityPriceRowSerializer",
+    "RecalculationJobSerializer",
+    "RecalculationJobCreateSerializer",
 ]
 
@@ -1,10 +1,14 @@
 from decimal import Decimal
+from typing import Any, Dict
 from rest_framework import serializers
 
+from portfolio.metrics import TimedSerializerMixin
 from portfolio.models.holding import Holding
+from portfolio.serializers.values import ValuesSerializer
+from portfolio.services import effective_price_annotations
 
 
-class HoldingSerializer(serializers.ModelSerializer):
+class HoldingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
         Serializer for Holding model.
     """
@@ -44,3 +48,63 @@ class HoldingSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Unit price must be greater than zero.")
         return value
 
+
+# Read-only list rendering; total_value is Holding.total_value computed on the row.
+HOLDING_VALUES = ValuesSerializer(
+    HoldingSerializer,
+    computed={"total_value": lambda row: row["quantity"] * row["effective_unit_price"]},
+    annotations=effective_price_annotations,
+)
+
+
+class HoldingBulkRowSerializer(HoldingSerializer):
+    """
+        Serializer for one row of a bulk holdings upload.
+
+        The portfolio is taken as a plain id so a batch of rows can be
+        checked against the database with a single lookup.
+    """
+    portfolio = serializers.IntegerField(min_value=1)
+
+    class Meta(HoldingSerializer.Meta):
+        fields = [
+            "portfolio",
+            "asset_name",
+            "asset_type",
+            "quantity",
+            "unit_price",
+            "valuation_date",
+        ]
+        read_only_fields = []
+
+
+class HoldingRollForwardSerializer(serializers.Serializer):
+    """
+        Serializer for copying holdings from one valuation date to another.
+    """
+    from_date = serializers.DateField()
+    to_date = serializers.DateField()
+    portfolio_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False
+    )
+    prices = serializers.DictField(
+        child=serializers.DecimalField(max_digits=20, decimal_places=4), required=False, default=dict
+    )
+    create_snapshots = serializers.BooleanField(required=False, default=False)
+
+    def validate_prices(self, value: Dict[str, Decimal]) -> Dict[str, Decimal]:
+        """
+            Validate that every new unit price is positive.
+        """
+        invalid = sorted(name for name, price in value.items() if price <= 0)
+        if invalid:
+            raise serializers.ValidationError(f"Unit price must be greater than zero for: {invalid}.")
+        return value
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Validate the holdings are copied to a different date.
+        """
+        if attrs["from_date"] == attrs["to_date"]:
+            raise serializers.ValidationError("to_date must differ from from_date.")
+        return attrs
@@ -0,0 +1,81 @@
+from typing import Any, Dict, List
+from rest_framework import serializers
+
+from portfolio.jobs import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, RecalculationJobService
+from portfolio.metrics import TimedSerializerMixin
+from portfolio.models import Portfolio, RecalculationJob
+
+
+class RecalculationJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+        Recalculation job serializers.
+    """
+    progress = serializers.SerializerMethodField()
+
+    def get_progress(self, obj: RecalculationJob) -> Dict[str, Any]:
+        """
+            Get processed and total snapshot counts with a percentage.
+        """
+        return RecalculationJobService.progress(obj)
+
+    class Meta:
+        model = RecalculationJob
+        fields = [
+            "id",
+            "status",
+            "portfolio_ids",
+            "date_from",
+            "date_to",
+            "chunk_size",
+            "progress",
+            "attempts",
+            "worker",
+            "error",
+            "started_at",
+            "finished_at",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class RecalculationJobCreateSerializer(serializers.Serializer):
+    """
+        Serializer for submitting a recalculation job.
+    """
+    portfolio_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=True
+    )
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    chunk_size = serializers.IntegerField(
+        required=False, min_value=1, max_value=MAX_CHUNK_SIZE, default=DEFAULT_CHUNK_SIZE
+    )
+
+    def validate_portfolio_ids(self, value: List[int]) -> List[int]:
+        """
+            Validate every portfolio exists.
+        """
+        missing = set(value) - set(Portfolio.objects.filter(pk__in=value).values_list("pk", flat=True))
+        if missing:
+            raise serializers.ValidationError(f"Unknown portfolio ids: {sorted(missing)}.")
+        return value
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Validate the date range is ordered.
+        """
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return attrs
+
+    def create(self, validated_data: Dict[str, Any]) -> RecalculationJob:
+        """
+            Queue the recalculation job.
+        """
+        return RecalculationJobService.submit(
+            date_from=validated_data["date_from"],
+            date_to=validated_data["date_to"],
+            portfolio_ids=validated_data.get("portfolio_ids"),
+            chunk_size=validated_data["chunk_size"],
+        )
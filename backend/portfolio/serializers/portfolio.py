@@ -1,11 +1,48 @@
+from typing import Any, Dict, List
+from django.db.models import QuerySet
 from rest_framework import serializers
 
+from portfolio.metrics import TimedSerializerMixin
 from portfolio.models.portfolio import Portfolio
+from portfolio.search import SEARCH_CONTAINS, SEARCH_MODES
 from portfolio.serializers.holding import HoldingSerializer
 from portfolio.serializers.valuation import ValuationSnapshotSerializer
+from portfolio.serializers.values import ValuesSerializer
+from portfolio.services import with_effective_price
 
+DETAIL_RELATED_FIELDS = ("holdings", "valuation_snapshots")
+DEFAULT_DETAIL_LIMIT = 100
+MAX_DETAIL_LIMIT = 1000
+MAX_STATISTICS_BATCH = 500
 
-class PortfolioSerializer(serializers.ModelSerializer):
+
+def detail_holdings(portfolio: Portfolio, params: Dict[str, Any]) -> QuerySet:
+    """
+        Holdings shown in the portfolio detail, bounded by the date filters and limit.
+    """
+    holdings = with_effective_price(portfolio.holdings.select_related("portfolio"))
+    if params.get("holdings_date"):
+        holdings = holdings.filter(valuation_date=params["holdings_date"])
+    if params.get("holdings_date_from"):
+        holdings = holdings.filter(valuation_date__gte=params["holdings_date_from"])
+    if params.get("holdings_date_to"):
+        holdings = holdings.filter(valuation_date__lte=params["holdings_date_to"])
+    if params.get("holdings_limit") is not None:
+        holdings = holdings[: params["holdings_limit"]]
+    return holdings
+
+
+def detail_snapshots(portfolio: Portfolio, params: Dict[str, Any]) -> QuerySet:
+    """
+        Valuation snapshots shown in the portfolio detail, bounded by the limit.
+    """
+    snapshots = portfolio.valuation_snapshots.select_related("portfolio")
+    if params.get("snapshots_limit") is not None:
+        snapshots = snapshots[: params["snapshots_limit"]]
+    return snapshots
+
+
+class PortfolioSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
         Portfolio serialiazers.
     """
@@ -24,24 +61,45 @@ class PortfolioSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class PortfolioDetailSerializer(serializers.ModelSerializer):
+PORTFOLIO_VALUES = ValuesSerializer(PortfolioSerializer)
+
+
+class PortfolioDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
         Detailed serializer for Portfolio with related data.
     """
     holdings = serializers.SerializerMethodField()
     valuation_snapshots = serializers.SerializerMethodField()
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        include = self.context.get("include")
+        if include is not None:
+            for field_name in DETAIL_RELATED_FIELDS:
+                if field_name not in include:
+                    self.fields.pop(field_name)
+
     def get_holdings(self, obj):
         """
-            Get holdings for the portfolio.
+            Get holdings for the portfolio, bounded by the date filters and limit in context.
+
+            Rows already fetched by the caller can be passed in context as "holdings_rows".
         """
-        return HoldingSerializer(obj.holdings.all(), many=True).data
+        holdings = self.context.get("holdings_rows")
+        if holdings is None:
+            holdings = detail_holdings(obj, self.context)
+        return HoldingSerializer(holdings, many=True).data
 
     def get_valuation_snapshots(self, obj):
         """
-            Get valuation snapshots for the portfolio.
+            Get valuation snapshots for the portfolio, bounded by the limit in context.
+
+            Rows already fetched by the caller can be passed in context as "snapshots_rows".
         """
-        return ValuationSnapshotSerializer(obj.valuation_snapshots.all(), many=True).data
+        snapshots = self.context.get("snapshots_rows")
+        if snapshots is None:
+            snapshots = detail_snapshots(obj, self.context)
+        return ValuationSnapshotSerializer(snapshots, many=True).data
 
     class Meta:
         model = Portfolio
@@ -58,3 +116,62 @@ class PortfolioDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+
+class PortfolioDetailQuerySerializer(serializers.Serializer):
+    """
+        Query parameters bounding the related rows of the portfolio detail.
+    """
+    holdings_date = serializers.DateField(required=False)
+    holdings_date_from = serializers.DateField(required=False)
+    holdings_date_to = serializers.DateField(required=False)
+    holdings_limit = serializers.IntegerField(
+        required=False, min_value=0, max_value=MAX_DETAIL_LIMIT, default=DEFAULT_DETAIL_LIMIT
+    )
+    snapshots_limit = serializers.IntegerField(
+        required=False, min_value=0, max_value=MAX_DETAIL_LIMIT, default=DEFAULT_DETAIL_LIMIT
+    )
+    include = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_include(self, value: str) -> List[str]:
+        """
+            Validate include is a comma separated list of related fields.
+        """
+        include = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in include if name not in DETAIL_RELATED_FIELDS]
+        if unknown:
+            raise serializers.ValidationError(f"Include must be a subset of {list(DETAIL_RELATED_FIELDS)}.")
+        return include
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Validate the holdings date range is ordered.
+        """
+        date_from, date_to = attrs.get("holdings_date_from"), attrs.get("holdings_date_to")
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError("holdings_date_from must not be after holdings_date_to.")
+        return attrs
+
+
+class PortfolioStatisticsBatchQuerySerializer(serializers.Serializer):
+    """
+        Query parameters selecting the portfolios of a batch statistics request.
+    """
+    ids = serializers.CharField(required=False)
+    search = serializers.CharField(required=False, allow_blank=True)
+    search_mode = serializers.ChoiceField(choices=SEARCH_MODES, default=SEARCH_CONTAINS)
+    page = serializers.IntegerField(required=False, min_value=1, default=1)
+    rows = serializers.IntegerField(required=False, min_value=1, max_value=MAX_STATISTICS_BATCH, default=25)
+
+    def validate_ids(self, value: str) -> List[int]:
+        """
+            Validate ids is a comma separated list of portfolio ids.
+        """
+        try:
+            ids = [int(item) for item in value.split(",") if item.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Ids must be a comma separated list of integers.")
+        if not ids:
+            raise serializers.ValidationError("Ids must not be empty.")
+        if len(ids) > MAX_STATISTICS_BATCH:
+            raise serializers.ValidationError(f"At most {MAX_STATISTICS_BATCH} ids are allowed.")
+        return list(dict.fromkeys(ids))
@@ -0,0 +1,22 @@
+from decimal import Decimal
+from rest_framework import serializers
+
+from portfolio.models.holding import Holding
+
+
+class SecurityPriceRowSerializer(serializers.Serializer):
+    """
+        Serializer for one row of a security price upload.
+    """
+    asset_name = serializers.CharField(max_length=255)
+    asset_type = serializers.ChoiceField(choices=Holding.ASSET_TYPE_CHOICES)
+    price_date = serializers.DateField()
+    unit_price = serializers.DecimalField(max_digits=20, decimal_places=4)
+
+    def validate_unit_price(self, value: Decimal) -> Decimal:
+        """
+            Validate that unit_price is positive.
+        """
+        if value <= 0:
+            raise serializers.ValidationError("Unit price must be greater than zero.")
+        return value
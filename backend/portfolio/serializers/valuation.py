@@ -1,11 +1,16 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from rest_framework import serializers
 
+from portfolio.metrics import TimedSerializerMixin
 from portfolio.models.valuation import ValuationSnapshot
-from portfolio.services import ValuationService
+from portfolio.serializers.values import ValuesSerializer
+from portfolio.services import ValuationService, SERIES_INTERVALS, SERIES_METHODS
 
+MAX_ALLOCATION_BATCH = 500
+MAX_STATUS_BATCH = 10000
 
-class ValuationSnapshotSerializer(serializers.ModelSerializer):
+
+class ValuationSnapshotSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Valuation Snapshot serializers.
     """
@@ -34,9 +39,17 @@ class ValuationSnapshotSerializer(serializers.ModelSerializer):
         valid_statuses = [choice[0] for choice in ValuationSnapshot.STATUS_CHOICES]
         if value not in valid_statuses:
             raise serializers.ValidationError(f"Status must be one of {valid_statuses}.")
+        if self.instance is not None:
+            try:
+                ValuationService.check_status_transition(self.instance.status, value)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
         return value
 
 
+VALUATION_SNAPSHOT_VALUES = ValuesSerializer(ValuationSnapshotSerializer)
+
+
 class ValuationSnapshotCreateSerializer(serializers.ModelSerializer):
     """
     calculates AUM when creating a snapshot.
@@ -78,3 +91,98 @@ class ValuationSnapshotCreateSerializer(serializers.ModelSerializer):
 
         return snapshot
 
+
+
+class ValuationHistoryQuerySerializer(serializers.Serializer):
+    """
+        Query parameters for the valuation history time series.
+    """
+    portfolio = serializers.IntegerField()
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    interval = serializers.ChoiceField(choices=SERIES_INTERVALS, default="day")
+    method = serializers.ChoiceField(choices=SERIES_METHODS, default="last")
+    status = serializers.ChoiceField(choices=ValuationSnapshot.STATUS_CHOICES, required=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Validate the date range is ordered.
+        """
+        if attrs.get("date_from") and attrs.get("date_to") and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return attrs
+
+
+class ValuationAllocationQuerySerializer(serializers.Serializer):
+    """
+        Query parameters selecting the snapshots of an allocation request.
+    """
+    ids = serializers.CharField(required=False)
+    portfolio = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    rows = serializers.IntegerField(required=False, min_value=1, max_value=MAX_ALLOCATION_BATCH, default=100)
+
+    def validate_ids(self, value: str) -> List[int]:
+        """
+            Validate ids is a comma separated list of snapshot ids.
+        """
+        try:
+            ids = [int(item) for item in value.split(",") if item.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Ids must be a comma separated list of integers.")
+        if not ids:
+            raise serializers.ValidationError("Ids must not be empty.")
+        if len(ids) > MAX_ALLOCATION_BATCH:
+            raise serializers.ValidationError(f"At most {MAX_ALLOCATION_BATCH} ids are allowed.")
+        return list(dict.fromkeys(ids))
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Validate snapshots are selected by ids or by portfolio, and the date range is ordered.
+        """
+        if ("ids" in attrs) == ("portfolio" in attrs):
+            raise serializers.ValidationError("Provide either ids or portfolio.")
+        if attrs.get("date_from") and attrs.get("date_to") and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return attrs
+
+
+class ValuationStatusFilterSerializer(serializers.Serializer):
+    """
+        Snapshot filter of a bulk status update, with the fields of the valuation list filters.
+    """
+    portfolio = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=ValuationSnapshot.STATUS_CHOICES, required=False)
+    snapshot_date = serializers.DateField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Validate the filter is not empty and the date range is ordered.
+        """
+        if not attrs:
+            raise serializers.ValidationError("Provide at least one filter field.")
+        if attrs.get("date_from") and attrs.get("date_to") and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return attrs
+
+
+class ValuationBulkStatusSerializer(serializers.Serializer):
+    """
+        Serializer for moving many snapshots, selected by ids or by a filter, to a new status.
+    """
+    status = serializers.ChoiceField(choices=ValuationSnapshot.STATUS_CHOICES)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=MAX_STATUS_BATCH
+    )
+    filter = ValuationStatusFilterSerializer(required=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Validate snapshots are selected by ids or by a filter.
+        """
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide either ids or filter.")
+        return attrs
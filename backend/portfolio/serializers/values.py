@@ -0,0 +1,94 @@
+"""
+Read-only list rendering from ``.values()`` rows.
+
+A ValuesSerializer reads the columns a ModelSerializer would output with
+one ``.values()`` query, joining related attributes in the database, and
+formats every column with the serializer's own field
+``to_representation``. The rows come out identical to the serializer's
+output without building model instances or running the per-row field
+machinery.
+"""
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, FilteredRelation, QuerySet
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from portfolio.metrics import serializer_timer
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class ValuesSerializer:
+    """
+    Render rows of a queryset with the read fields of ``serializer_class``.
+
+    Fields sourced from a related object are read through a join.
+    ``computed`` maps the name of a field whose source is a model property
+    to a function building the same value from the row, so it is derived
+    with the property's own arithmetic instead of the database's.
+    ``annotations`` builds extra annotations selected for those functions;
+    ``FilteredRelation`` entries only add their join.
+    """
+
+    def __init__(
+        self,
+        serializer_class: Type[serializers.ModelSerializer],
+        computed: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None,
+        annotations: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> None:
+        computed = computed or {}
+        self.computed_annotations = annotations
+        self.annotations: Dict[str, Any] = {}
+        self.keys: List[str] = []
+        self.columns: List[Tuple[str, Callable[[Dict[str, Any]], Any], Callable[[Any], Any]]] = []
+
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if name in computed:
+                self.columns.append((name, computed[name], field.to_representation))
+                continue
+            if isinstance(field, PrimaryKeyRelatedField):
+                # .values() returns the raw foreign key, which is what the field outputs.
+                key, convert = field.source, _identity
+            elif isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)):
+                raise ImproperlyConfigured(f"Field {name!r} cannot be read from .values() rows.")
+            elif "." in field.source:
+                self.annotations[name] = F(field.source.replace(".", "__"))
+                key, convert = name, field.to_representation
+            else:
+                key, convert = field.source, field.to_representation
+            self.keys.append(key)
+            self.columns.append((name, itemgetter(key), convert))
+
+    def queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+            The ``.values()`` queryset holding every column of the output.
+        """
+        annotations = dict(self.annotations)
+        keys = list(self.keys)
+        if self.computed_annotations is not None:
+            extra = self.computed_annotations()
+            annotations.update(extra)
+            keys += [name for name, annotation in extra.items() if not isinstance(annotation, FilteredRelation)]
+        return queryset.annotate(**annotations).values(*keys)
+
+    def render(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+            Output dicts for rows of ``queryset(...)``, as the serializer would render them.
+        """
+        columns = self.columns
+        with serializer_timer():
+            output = []
+            for row in rows:
+                item = {}
+                for name, read, convert in columns:
+                    value = read(row)
+                    item[name] = None if value is None else convert(value)
+                output.append(item)
+            return output
@@ -1,10 +1,161 @@
-from decimal import Decimal
+import time
+from decimal import Decimal, ROUND_HALF_UP, localcontext
 from datetime import date
-from typing import Optional, List, Dict, Any
-from django.db.models import QuerySet, Sum, Q
-from django.db import transaction
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from asgiref.sync import sync_to_async
+from django.db.models import (
+    QuerySet,
+    Sum,
+    Q,
+    F,
+    DecimalField,
+    DateField,
+    ExpressionWrapper,
+    Count,
+    Avg,
+    Window,
+    OuterRef,
+    Subquery,
+    IntegerField,
+    FilteredRelation,
+    Case,
+    When,
+    Value,
+)
+from django.db.models.functions import Trunc, RowNumber, Coalesce
+from django.db import connection, transaction, IntegrityError
+from django.utils import timezone
 
-from portfolio.models import Portfolio, Holding, ValuationSnapshot
+from portfolio.models import Portfolio, Holding, ValuationSnapshot, HoldingAggregate, Security, SecurityPrice
+from portfolio.cache import (
+    get_cached_statistics,
+    get_statistics_version,
+    invalidate_statistics,
+    set_cached_statistics,
+)
+from portfolio.concurrency import run_concurrently
+from portfolio.versions import touch
+
+AUM_QUANTIZE = Decimal("0.01")
+WEIGHT_QUANTIZE = Decimal("0.0001")
+QUANTITY_STEP = Decimal("0.00000001")
+PRICE_STEP = Decimal("0.0001")
+SNAPSHOT_BULK_BATCH_SIZE = 1000
+SERIES_INTERVALS = ("day", "week", "month", "quarter")
+SERIES_METHODS = ("last", "average")
+ASSET_TYPES = [asset_type for asset_type, _ in Holding.ASSET_TYPE_CHOICES]
+
+
+def effective_price_annotations() -> Dict[str, Any]:
+    """
+    Annotations giving holdings their effective_unit_price, the price they are valued at.
+
+    The SecurityPrice of the holding's security on its valuation date is
+    LEFT JOINed once and overrides the unit_price stored on the holding.
+    """
+    return {
+        "security_price": FilteredRelation(
+            "security__prices", condition=Q(security__prices__price_date=F("valuation_date"))
+        ),
+        "effective_unit_price": Coalesce(F("security_price__unit_price"), F("unit_price")),
+    }
+
+
+def with_effective_price(holdings: QuerySet) -> QuerySet:
+    """
+    Holdings annotated with their effective_unit_price.
+    """
+    return holdings.annotate(**effective_price_annotations())
+
+
+def holding_value_sum() -> Sum:
+    """
+    SQL expression for SUM(quantity * price) over holdings annotated by with_effective_price.
+
+    The product keeps the full 8 + 4 decimal places so the rounding to
+    cents happens once, in Python, exactly like the per-row calculation.
+    """
+    return Sum(
+        ExpressionWrapper(
+            F("quantity") * F("effective_unit_price"),
+            output_field=DecimalField(max_digits=40, decimal_places=12),
+        )
+    )
+
+
+def security_prices(keys: Iterable[Tuple[int, date]]) -> Dict[Tuple[int, date], Decimal]:
+    """
+    Stored security prices of (security_id, price_date) keys, in one query.
+
+    Keys without a stored price are left out.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    rows = SecurityPrice.objects.filter(
+        security_id__in={key[0] for key in keys},
+        price_date__in={key[1] for key in keys},
+    ).values_list("security_id", "price_date", "unit_price")
+    return {tuple(row[:2]): row[2] for row in rows if tuple(row[:2]) in keys}
+
+
+def security_ids(names: Iterable[Tuple[str, str]]) -> Tuple[Dict[Tuple[str, str], int], int]:
+    """
+    Security master ids of (asset_name, asset_type) pairs, adding the missing securities.
+
+    Returns the ids and the number of securities added.
+    """
+    names = set(names)
+
+    def lookup(missing: set) -> Dict[Tuple[str, str], int]:
+        rows = Security.objects.filter(asset_name__in={name for name, _ in missing}).values_list(
+            "pk", "asset_name", "asset_type"
+        )
+        return {(name, asset_type): pk for pk, name, asset_type in rows if (name, asset_type) in missing}
+
+    ids = lookup(names) if names else {}
+    missing = names - set(ids)
+    if missing:
+        Security.objects.bulk_create(
+            [Security(asset_name=name, asset_type=asset_type) for name, asset_type in missing],
+            batch_size=SNAPSHOT_BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        ids.update(lookup(missing))
+    return ids, len(missing)
+
+
+def quantize_aum(value: Optional[Decimal]) -> Decimal:
+    """
+    Round an exact holdings sum to cents; an empty sum is zero AUM.
+    """
+    if value is None:
+        return Decimal("0.00")
+    return value.quantize(AUM_QUANTIZE)
+
+
+def aum_with_breakdown(values_by_type: Dict[str, Decimal]) -> Tuple[Decimal, Dict[str, str]]:
+    """
+    Total AUM and per-asset-type breakdown from exact per-type holding values.
+
+    The total is rounded once from the exact sum, like get_aum, so the
+    rounded parts can differ from it by a few cents. Every asset type is
+    listed; types without holdings are "0.00".
+    """
+    with localcontext(prec=60):
+        total = sum(values_by_type.values(), Decimal("0"))
+    return quantize_aum(total), {
+        asset_type: str(quantize_aum(values_by_type.get(asset_type))) for asset_type in ASSET_TYPES
+    }
+
+
+def holding_value(quantity: Any, unit_price: Any) -> Decimal:
+    """
+    Exact value of a holding as stored, with quantity and price rounded to their column scale.
+    """
+    quantity = Decimal(str(quantity)).quantize(QUANTITY_STEP, rounding=ROUND_HALF_UP)
+    unit_price = Decimal(str(unit_price)).quantize(PRICE_STEP, rounding=ROUND_HALF_UP)
+    return quantity * unit_price
 
 
 class ValuationService:
@@ -21,13 +172,33 @@ class ValuationService:
             portfolio=portfolio,
             valuation_date=valuation_date,
         )
+        result = with_effective_price(holdings).aggregate(total_aum=holding_value_sum())
 
-        total_aum = Decimal("0.00")
+        return quantize_aum(result["total_aum"])
 
-        for holding in holdings:
-            total_aum += holding.total_value
+    @staticmethod
+    def calculate_portfolio_aum_by_dates(
+        portfolio: Portfolio, valuation_dates: Iterable[date]
+    ) -> Dict[date, Decimal]:
+        """
+        Calculate AUM for a portfolio on several dates in a single grouped query.
+        Dates without holdings are reported as zero AUM.
+        """
+        valuation_dates = list(valuation_dates)
+        results = {valuation_date: Decimal("0.00") for valuation_date in valuation_dates}
+        if not valuation_dates:
+            return results
 
-        return total_aum.quantize(Decimal("0.01"))
+        rows = (
+            with_effective_price(Holding.objects.filter(portfolio=portfolio, valuation_date__in=valuation_dates))
+            .order_by()
+            .values("valuation_date")
+            .annotate(total_aum=holding_value_sum())
+        )
+        for row in rows:
+            results[row["valuation_date"]] = quantize_aum(row["total_aum"])
+
+        return results
 
     @staticmethod
     def create_valuation_snapshot(
@@ -40,9 +211,9 @@ class ValuationService:
         """
         Create a valuation snapshot for a portfolio on a specific date.
         """
-        total_aum = None
+        total_aum, aum_breakdown = None, None
         if recalculate:
-            total_aum = ValuationService.calculate_portfolio_aum(portfolio, snapshot_date)
+            total_aum, aum_breakdown = HoldingAggregateService.get_aum_breakdown(portfolio, snapshot_date)
 
         snapshot, created = ValuationSnapshot.objects.update_or_create(
             portfolio=portfolio,
@@ -50,28 +221,136 @@ class ValuationService:
             defaults={
                 "status": status,
                 "total_aum": total_aum,
+                "aum_breakdown": aum_breakdown,
                 "notes": notes,
             },
         )
 
         return snapshot
 
+    @staticmethod
+    def create_snapshots_bulk(
+        snapshot_date: date,
+        portfolio_ids: Optional[Iterable[int]] = None,
+        batch_size: int = SNAPSHOT_BULK_BATCH_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Create or refresh valuation snapshots for many portfolios on one date.
+
+        AUM and its asset type breakdown for every portfolio are read from
+        the holding aggregates in one query and the
+        snapshots are upserted in batches on (portfolio, snapshot_date).
+        New snapshots start as DRAFT; existing snapshots keep their status
+        and notes and only get a fresh total_aum and aum_breakdown.
+        """
+        started = time.perf_counter()
+
+        portfolios = Portfolio.objects.order_by("pk")
+        aggregates = HoldingAggregate.objects.filter(valuation_date=snapshot_date)
+        if portfolio_ids is not None:
+            portfolio_ids = list(portfolio_ids)
+            portfolios = portfolios.filter(pk__in=portfolio_ids)
+            aggregates = aggregates.filter(portfolio_id__in=portfolio_ids)
+        target_ids = list(portfolios.values_list("pk", flat=True))
+
+        values_by_portfolio: Dict[int, Dict[str, Decimal]] = {}
+        for portfolio_id, asset_type, total_value in aggregates.order_by().values_list(
+            "portfolio_id", "asset_type", "total_value"
+        ):
+            values_by_portfolio.setdefault(portfolio_id, {})[asset_type] = total_value
+        empty = aum_with_breakdown({})
+        aum_by_portfolio = {
+            portfolio_id: aum_with_breakdown(values) for portfolio_id, values in values_by_portfolio.items()
+        }
+        existing = set(
+            ValuationSnapshot.objects.filter(
+                portfolio_id__in=target_ids, snapshot_date=snapshot_date
+            ).values_list("portfolio_id", flat=True)
+        )
+        aggregated = time.perf_counter()
+
+        with transaction.atomic():
+            for offset in range(0, len(target_ids), batch_size):
+                ValuationSnapshot.objects.bulk_create(
+                    [
+                        ValuationSnapshot(
+                            portfolio_id=portfolio_id,
+                            snapshot_date=snapshot_date,
+                            status="DRAFT",
+                            total_aum=aum_by_portfolio.get(portfolio_id, empty)[0],
+                            aum_breakdown=aum_by_portfolio.get(portfolio_id, empty)[1],
+                        )
+                        for portfolio_id in target_ids[offset:offset + batch_size]
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["portfolio", "snapshot_date"],
+                    update_fields=["total_aum", "aum_breakdown", "updated_at"],
+                )
+            invalidate_statistics(target_ids)
+            touch(ValuationSnapshot)
+        finished = time.perf_counter()
+
+        return {
+            "snapshot_date": snapshot_date,
+            "portfolios": len(target_ids),
+            "created": len(target_ids) - len(existing),
+            "updated": len(existing),
+            "portfolios_without_holdings": len(set(target_ids) - set(aum_by_portfolio)),
+            "aggregate_seconds": round(aggregated - started, 4),
+            "upsert_seconds": round(finished - aggregated, 4),
+            "total_seconds": round(finished - started, 4),
+        }
+
     @staticmethod
     def recalculate_snapshot_aum(snapshot: ValuationSnapshot) -> ValuationSnapshot:
         """
-        Recalculate and update the AUM for an existing snapshot.
+        Recalculate and update the AUM and its breakdown for an existing snapshot.
         """
-        total_aum = ValuationService.calculate_portfolio_aum(snapshot.portfolio, snapshot.snapshot_date)
-        snapshot.total_aum = total_aum
-        snapshot.save(update_fields=["total_aum", "updated_at"])
+        snapshot.total_aum, snapshot.aum_breakdown = HoldingAggregateService.get_aum_breakdown(
+            snapshot.portfolio, snapshot.snapshot_date
+        )
+        snapshot.save(update_fields=["total_aum", "aum_breakdown", "updated_at"])
         return snapshot
 
+    @staticmethod
+    def recalculate_snapshots_aum(snapshots: List[ValuationSnapshot]) -> List[ValuationSnapshot]:
+        """
+        Recalculate and update the AUM and its breakdown for many snapshots.
+
+        The AUMs are read from the holding aggregates in one query
+        and written back with one bulk update, so the snapshot signals do
+        not run and the statistics cache is invalidated here.
+        """
+        if not snapshots:
+            return snapshots
+
+        portfolio_ids = {snapshot.portfolio_id for snapshot in snapshots}
+        values_by_key: Dict[Tuple[int, date], Dict[str, Decimal]] = {}
+        for portfolio_id, valuation_date, asset_type, total_value in HoldingAggregate.objects.filter(
+            portfolio_id__in=portfolio_ids,
+            valuation_date__in={snapshot.snapshot_date for snapshot in snapshots},
+        ).order_by().values_list("portfolio_id", "valuation_date", "asset_type", "total_value"):
+            values_by_key.setdefault((portfolio_id, valuation_date), {})[asset_type] = total_value
+
+        now = timezone.now()
+        for snapshot in snapshots:
+            snapshot.total_aum, snapshot.aum_breakdown = aum_with_breakdown(
+                values_by_key.get((snapshot.portfolio_id, snapshot.snapshot_date), {})
+            )
+            snapshot.updated_at = now
+        with transaction.atomic(savepoint=False):
+            ValuationSnapshot.objects.bulk_update(snapshots, ["total_aum", "aum_breakdown", "updated_at"])
+            invalidate_statistics(portfolio_ids)
+            touch(ValuationSnapshot)
+        return snapshots
+
     @staticmethod
     def get_portfolio_holdings_by_date(portfolio: Portfolio, valuation_date: date) -> QuerySet[Holding]:
         """
         Get all holdings for a portfolio on a specific date.
         """
-        return Holding.objects.filter(portfolio=portfolio, valuation_date=valuation_date).select_related("portfolio")
+        holdings = Holding.objects.filter(portfolio=portfolio, valuation_date=valuation_date).select_related("portfolio")
+        return with_effective_price(holdings)
 
     @staticmethod
     def get_portfolio_valuation_history(portfolio: Portfolio) -> QuerySet[ValuationSnapshot]:
@@ -82,15 +361,533 @@ class ValuationService:
             "-snapshot_date"
         )
 
+    @staticmethod
+    def get_portfolio_valuation_series(
+        portfolio: Portfolio,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        interval: str = "day",
+        method: str = "last",
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        AUM time series for a portfolio, downsampled in the database.
+
+        Snapshots are bucketed by day, week, month or quarter. Each bucket
+        reports either the last snapshot in it or the average AUM, keyed
+        by the first day of the bucket.
+        """
+        if interval not in SERIES_INTERVALS:
+            raise ValueError(f"Interval must be one of {list(SERIES_INTERVALS)}.")
+        if method not in SERIES_METHODS:
+            raise ValueError(f"Method must be one of {list(SERIES_METHODS)}.")
+
+        snapshots = ValuationSnapshot.objects.filter(portfolio=portfolio, total_aum__isnull=False)
+        if date_from:
+            snapshots = snapshots.filter(snapshot_date__gte=date_from)
+        if date_to:
+            snapshots = snapshots.filter(snapshot_date__lte=date_to)
+        if status:
+            snapshots = snapshots.filter(status=status)
+
+        bucket = Trunc("snapshot_date", interval, output_field=DateField())
+        if method == "average":
+            rows = (
+                snapshots.annotate(bucket=bucket)
+                .order_by()
+                .values("bucket")
+                .annotate(total_aum=Avg("total_aum"))
+                .order_by("bucket")
+            )
+        else:
+            rows = (
+                snapshots.annotate(
+                    bucket=bucket,
+                    position=Window(RowNumber(), partition_by=[bucket], order_by=F("snapshot_date").desc()),
+                )
+                .filter(position=1)
+                .values("bucket", "total_aum")
+                .order_by("bucket")
+            )
+
+        return [{"date": row["bucket"], "total_aum": quantize_aum(row["total_aum"])} for row in rows]
+
+    @staticmethod
+    def get_snapshot_allocations(snapshots: QuerySet[ValuationSnapshot]) -> List[Dict[str, Any]]:
+        """
+        Asset type allocation of snapshots from their stored breakdowns.
+
+        Reads only the snapshot rows. Weights are each type's share of the
+        snapshot's total_aum (None for a zero AUM); snapshots stored before
+        breakdowns were recorded report no allocation until they are
+        recalculated.
+        """
+        allocations = []
+        for row in snapshots.values("pk", "portfolio_id", "snapshot_date", "status", "total_aum", "aum_breakdown"):
+            allocation = None
+            if row["aum_breakdown"] is not None:
+                total_aum = row["total_aum"] or Decimal("0")
+                allocation = []
+                for asset_type in ASSET_TYPES:
+                    value = Decimal(row["aum_breakdown"].get(asset_type, "0.00"))
+                    weight = None
+                    if total_aum:
+                        weight = (value / total_aum).quantize(WEIGHT_QUANTIZE, rounding=ROUND_HALF_UP)
+                    allocation.append(
+                        {
+                            "asset_type": asset_type,
+                            "value": "{:f}".format(value),
+                            "weight": "{:f}".format(weight) if weight is not None else None,
+                        }
+                    )
+            allocations.append(
+                {
+                    "snapshot": row["pk"],
+                    "portfolio": row["portfolio_id"],
+                    "snapshot_date": row["snapshot_date"].isoformat(),
+                    "status": row["status"],
+                    "total_aum": "{:f}".format(row["total_aum"]) if row["total_aum"] is not None else None,
+                    "allocation": allocation,
+                }
+            )
+        return allocations
+
     @staticmethod
     def update_snapshot_status(snapshot: ValuationSnapshot, new_status: str) -> ValuationSnapshot:
         """
         Update the status of a valuation snapshot.
+
+        Raises ValueError for an unknown status or a move the status
+        transitions do not allow; setting the current status is a no-op.
         """
+        ValuationService.check_status_transition(snapshot.status, new_status)
+        if snapshot.status == new_status:
+            return snapshot
         snapshot.status = new_status
         snapshot.save(update_fields=["status", "updated_at"])
         return snapshot
 
+    @staticmethod
+    def bulk_update_status(snapshots: QuerySet[ValuationSnapshot], new_status: str) -> Dict[str, Any]:
+        """
+        Move every snapshot of a queryset to a new status with a single UPDATE.
+
+        Only snapshots whose status may move to ``new_status`` are updated;
+        the legality check is part of the UPDATE's WHERE clause. Snapshots
+        already in ``new_status`` are counted as unchanged and the rest as
+        rejected. Status is not part of the cached statistics, so the cache
+        is left alone.
+        """
+        sources = ValuationService.status_sources(new_status)
+        snapshots = snapshots.order_by()
+        with transaction.atomic():
+            # Counted first: a filter on status may stop matching the updated rows.
+            counts = snapshots.aggregate(
+                matched=Count("pk"),
+                unchanged=Count("pk", filter=Q(status=new_status)),
+            )
+            updated = snapshots.filter(status__in=sources).update(status=new_status, updated_at=timezone.now())
+            touch(ValuationSnapshot)
+
+        return {
+            "status": new_status,
+            "matched": counts["matched"],
+            "updated": updated,
+            "unchanged": counts["unchanged"],
+            "rejected": max(counts["matched"] - counts["unchanged"] - updated, 0),
+        }
+
+    @staticmethod
+    def check_status_transition(current_status: str, new_status: str) -> None:
+        """
+        Raise ValueError unless a snapshot may move from ``current_status`` to ``new_status``.
+
+        Keeping the current status is always allowed.
+        """
+        ValuationService.status_sources(new_status)
+        if current_status != new_status and new_status not in ValuationSnapshot.STATUS_TRANSITIONS.get(
+            current_status, ()
+        ):
+            raise ValueError(f"Cannot change status from {current_status} to {new_status}.")
+
+    @staticmethod
+    def status_sources(new_status: str) -> List[str]:
+        """
+        Statuses a snapshot may move to ``new_status`` from; ValueError for an unknown status.
+        """
+        if new_status not in ValuationSnapshot.STATUS_TRANSITIONS:
+            raise ValueError(f"Status must be one of {list(ValuationSnapshot.STATUS_TRANSITIONS)}.")
+        return [
+            status for status, targets in ValuationSnapshot.STATUS_TRANSITIONS.items() if new_status in targets
+        ]
+
+
+class HoldingAggregateService:
+    """
+    Maintenance of the per-(portfolio, valuation_date, asset_type) holding aggregates.
+    """
+
+    @staticmethod
+    def apply_delta(
+        portfolio_id: int,
+        valuation_date: date,
+        asset_type: str,
+        value: Decimal,
+        count: int,
+    ) -> None:
+        """
+        Add a value and holding count delta to one aggregate row.
+
+        Removals never create rows: if the row is already gone (for example
+        because the portfolio is being deleted) there is nothing to subtract.
+        """
+        key = {"portfolio_id": portfolio_id, "valuation_date": valuation_date, "asset_type": asset_type}
+        aggregates = HoldingAggregate.objects.filter(**key)
+        changes = {
+            "total_value": F("total_value") + value,
+            "holding_count": F("holding_count") + count,
+            "updated_at": timezone.now(),
+        }
+
+        with transaction.atomic(savepoint=False):
+            if not aggregates.update(**changes) and count > 0:
+                try:
+                    with transaction.atomic():
+                        HoldingAggregate.objects.create(**key, total_value=value, holding_count=count)
+                except IntegrityError:
+                    aggregates.update(**changes)
+            if count < 0:
+                aggregates.filter(holding_count__lte=0).delete()
+
+    @staticmethod
+    def add_holdings(holdings: Iterable[Holding]) -> None:
+        """
+        Add newly inserted holdings to their aggregates, one delta per key.
+
+        Used by bulk paths where Holding signals do not fire.
+        """
+        holdings = list(holdings)
+        prices = security_prices((holding.security_id, holding.valuation_date) for holding in holdings)
+        deltas: Dict[Tuple[int, date, str], List[Any]] = {}
+        for holding in holdings:
+            key = (holding.portfolio_id, holding.valuation_date, holding.asset_type)
+            unit_price = prices.get((holding.security_id, holding.valuation_date), holding.unit_price)
+            delta = deltas.setdefault(key, [Decimal("0"), 0])
+            delta[0] += holding_value(holding.quantity, unit_price)
+            delta[1] += 1
+
+        with transaction.atomic(savepoint=False):
+            for key, (value, count) in deltas.items():
+                HoldingAggregateService.apply_delta(*key, value, count)
+
+    @staticmethod
+    def get_aum(portfolio: Portfolio, valuation_date: date) -> Decimal:
+        """
+        AUM for a portfolio on a date, read from its aggregate rows.
+        """
+        result = HoldingAggregate.objects.filter(
+            portfolio=portfolio,
+            valuation_date=valuation_date,
+        ).aggregate(total_aum=Sum("total_value"))
+
+        return quantize_aum(result["total_aum"])
+
+    @staticmethod
+    def get_aum_breakdown(portfolio: Portfolio, valuation_date: date) -> Tuple[Decimal, Dict[str, str]]:
+        """
+        AUM for a portfolio on a date and its per-asset-type breakdown, from its aggregate rows.
+        """
+        rows = HoldingAggregate.objects.filter(
+            portfolio=portfolio,
+            valuation_date=valuation_date,
+        ).values_list("asset_type", "total_value")
+
+        return aum_with_breakdown(dict(rows))
+
+    @staticmethod
+    def rebuild(
+        portfolio_ids: Optional[Iterable[int]] = None,
+        valuation_dates: Optional[Iterable[date]] = None,
+    ) -> int:
+        """
+        Recompute the aggregate rows in scope from the holdings table.
+        """
+        portfolio_ids = list(portfolio_ids) if portfolio_ids is not None else None
+        valuation_dates = list(valuation_dates) if valuation_dates is not None else None
+        aggregates = HoldingAggregateService._scoped(HoldingAggregate.objects.all(), portfolio_ids, valuation_dates)
+        expected = HoldingAggregateService._recompute(portfolio_ids, valuation_dates)
+
+        with transaction.atomic():
+            aggregates.delete()
+            HoldingAggregate.objects.bulk_create(
+                [
+                    HoldingAggregate(
+                        portfolio_id=portfolio_id,
+                        valuation_date=valuation_date,
+                        asset_type=asset_type,
+                        total_value=total_value,
+                        holding_count=holding_count,
+                    )
+                    for (portfolio_id, valuation_date, asset_type), (total_value, holding_count) in expected.items()
+                ],
+                batch_size=SNAPSHOT_BULK_BATCH_SIZE,
+            )
+
+        return len(expected)
+
+    @staticmethod
+    def verify(
+        portfolio_ids: Optional[Iterable[int]] = None,
+        valuation_dates: Optional[Iterable[date]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare the aggregate rows in scope with a full recompute and list the differences.
+        """
+        portfolio_ids = list(portfolio_ids) if portfolio_ids is not None else None
+        valuation_dates = list(valuation_dates) if valuation_dates is not None else None
+        aggregates = HoldingAggregateService._scoped(HoldingAggregate.objects.all(), portfolio_ids, valuation_dates)
+        stored = {
+            (row.portfolio_id, row.valuation_date, row.asset_type): (row.total_value, row.holding_count)
+            for row in aggregates
+        }
+        expected = HoldingAggregateService._recompute(portfolio_ids, valuation_dates)
+
+        mismatches = []
+        for key in sorted(set(stored) | set(expected), key=lambda k: (k[0], k[1], k[2])):
+            stored_value, stored_count = stored.get(key, (Decimal("0"), 0))
+            expected_value, expected_count = expected.get(key, (Decimal("0"), 0))
+            if stored_value != expected_value or stored_count != expected_count:
+                mismatches.append(
+                    {
+                        "portfolio_id": key[0],
+                        "valuation_date": key[1],
+                        "asset_type": key[2],
+                        "stored_value": stored_value,
+                        "expected_value": expected_value,
+                        "stored_count": stored_count,
+                        "expected_count": expected_count,
+                    }
+                )
+        return mismatches
+
+    @staticmethod
+    def _scoped(
+        queryset: QuerySet,
+        portfolio_ids: Optional[Iterable[int]],
+        valuation_dates: Optional[Iterable[date]],
+    ) -> QuerySet:
+        if portfolio_ids is not None:
+            queryset = queryset.filter(portfolio_id__in=portfolio_ids)
+        if valuation_dates is not None:
+            queryset = queryset.filter(valuation_date__in=valuation_dates)
+        return queryset
+
+    @staticmethod
+    def _recompute(
+        portfolio_ids: Optional[Iterable[int]],
+        valuation_dates: Optional[Iterable[date]],
+    ) -> Dict[Tuple[int, date, str], Tuple[Decimal, int]]:
+        holdings = HoldingAggregateService._scoped(Holding.objects.all(), portfolio_ids, valuation_dates)
+        rows = (
+            with_effective_price(holdings)
+            .order_by()
+            .values("portfolio_id", "valuation_date", "asset_type")
+            .annotate(total_value=holding_value_sum(), holding_count=Count("pk"))
+        )
+        return {
+            (row["portfolio_id"], row["valuation_date"], row["asset_type"]): (row["total_value"], row["holding_count"])
+            for row in rows
+        }
+
+
+class HoldingService:
+    """
+    Service class for holding write operations.
+    """
+
+    @staticmethod
+    def bulk_insert(holdings: List[Holding], batch_size: int = SNAPSHOT_BULK_BATCH_SIZE) -> List[Holding]:
+        """
+        Insert validated holdings with bulk_create and update their aggregates in one transaction.
+
+        Each holding is linked to its security, which is added to the
+        security master when missing.
+        """
+        with transaction.atomic():
+            ids, _ = security_ids((holding.asset_name, holding.asset_type) for holding in holdings)
+            for holding in holdings:
+                holding.security_id = ids[(holding.asset_name, holding.asset_type)]
+            created = Holding.objects.bulk_create(holdings, batch_size=batch_size)
+            HoldingAggregateService.add_holdings(created)
+            invalidate_statistics(holding.portfolio_id for holding in created)
+            touch(Holding)
+        return created
+
+    @staticmethod
+    def roll_forward(
+        from_date: date,
+        to_date: date,
+        portfolio_ids: Optional[Iterable[int]] = None,
+        prices: Optional[Dict[str, Decimal]] = None,
+        create_snapshots: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Copy the holdings of ``from_date`` to ``to_date`` with one INSERT ... SELECT.
+
+        ``prices`` maps asset names to their new unit price; other holdings
+        keep their price. Portfolios that already hold positions on
+        ``to_date`` are skipped so a repeated roll-forward adds nothing.
+        The copied holdings' aggregates, and optionally the ``to_date``
+        snapshots, are written in the same transaction.
+        """
+        holdings = Holding.objects.filter(valuation_date=from_date).order_by()
+        if portfolio_ids is not None:
+            holdings = holdings.filter(portfolio_id__in=list(portfolio_ids))
+        now = timezone.now()
+
+        with transaction.atomic():
+            source_ids = set(holdings.values_list("portfolio_id", flat=True).distinct())
+            skipped = set(
+                Holding.objects.filter(valuation_date=to_date, portfolio_id__in=source_ids)
+                .order_by()
+                .values_list("portfolio_id", flat=True)
+                .distinct()
+            )
+            rolled = sorted(source_ids - skipped)
+
+            unit_price = F("unit_price")
+            if prices:
+                unit_price = Case(
+                    *(When(asset_name=name, then=Value(price)) for name, price in prices.items()),
+                    default=F("unit_price"),
+                    output_field=DecimalField(max_digits=20, decimal_places=4),
+                )
+            # Positional expressions keep the SELECT columns in this order.
+            columns = {
+                "portfolio": F("portfolio_id"),
+                "asset_name": F("asset_name"),
+                "asset_type": F("asset_type"),
+                "security": F("security_id"),
+                "quantity": F("quantity"),
+                "unit_price": unit_price,
+                "valuation_date": Value(to_date, output_field=DateField()),
+                "created_at": Value(now),
+                "updated_at": Value(now),
+            }
+            inserted = 0
+            if rolled:
+                select, params = (
+                    holdings.filter(portfolio_id__in=rolled).values_list(*columns.values()).query.sql_with_params()
+                )
+                quote = connection.ops.quote_name
+                names = ", ".join(quote(Holding._meta.get_field(name).column) for name in columns)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"INSERT INTO {quote(Holding._meta.db_table)} ({names}) {select}", params)
+                    inserted = cursor.rowcount
+
+            HoldingAggregateService.rebuild(rolled, [to_date])
+            invalidate_statistics(rolled)
+            touch(Holding)
+            snapshots = ValuationService.create_snapshots_bulk(to_date, rolled) if create_snapshots else None
+
+        return {
+            "from_date": from_date,
+            "to_date": to_date,
+            "portfolios": len(rolled),
+            "holdings": inserted,
+            "skipped_portfolios": sorted(skipped),
+            "snapshots": snapshots,
+        }
+
+
+class RevaluationService:
+    """
+    Service class for security prices and the revaluation they trigger.
+    """
+
+    @staticmethod
+    def upload_prices(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Store security prices and revalue the portfolios holding them.
+
+        Each row has asset_name, asset_type, price_date and unit_price;
+        missing securities are added to the security master and an existing
+        price of the same security and date is replaced (the last row wins).
+        """
+        rows = list(rows)
+
+        with transaction.atomic():
+            ids, securities_created = security_ids((row["asset_name"], row["asset_type"]) for row in rows)
+            prices = {
+                (ids[(row["asset_name"], row["asset_type"])], row["price_date"]): row["unit_price"] for row in rows
+            }
+            SecurityPrice.objects.bulk_create(
+                [
+                    SecurityPrice(security_id=security_id, price_date=price_date, unit_price=unit_price)
+                    for (security_id, price_date), unit_price in prices.items()
+                ],
+                batch_size=SNAPSHOT_BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["security", "price_date"],
+                update_fields=["unit_price", "updated_at"],
+            )
+            touch(SecurityPrice)
+            result = RevaluationService.revalue(prices)
+
+        return {
+            "prices": len(prices),
+            "securities_created": securities_created,
+            **result,
+        }
+
+    @staticmethod
+    def revalue(keys: Iterable[Tuple[int, date]]) -> Dict[str, Any]:
+        """
+        Revalue every (portfolio, date) holding one of the (security_id, price_date) keys.
+
+        Only the aggregates of those portfolio dates are recomputed and only
+        their snapshots get a new total_aum and breakdown; holdings are not
+        rewritten.
+        """
+        keys = set(keys)
+        affected: Dict[date, set] = {}
+        if keys:
+            rows = (
+                Holding.objects.filter(
+                    security_id__in={key[0] for key in keys},
+                    valuation_date__in={key[1] for key in keys},
+                )
+                .order_by()
+                .values_list("portfolio_id", "security_id", "valuation_date")
+                .distinct()
+            )
+            for portfolio_id, security_id, valuation_date in rows:
+                if (security_id, valuation_date) in keys:
+                    affected.setdefault(valuation_date, set()).add(portfolio_id)
+
+        portfolio_ids = set().union(*affected.values())
+        snapshots: List[ValuationSnapshot] = []
+        with transaction.atomic():
+            aggregates = sum(
+                HoldingAggregateService.rebuild(ids, [valuation_date]) for valuation_date, ids in affected.items()
+            )
+            if affected:
+                snapshots = [
+                    snapshot
+                    for snapshot in ValuationSnapshot.objects.filter(
+                        portfolio_id__in=portfolio_ids, snapshot_date__in=list(affected)
+                    )
+                    if snapshot.portfolio_id in affected[snapshot.snapshot_date]
+                ]
+            ValuationService.recalculate_snapshots_aum(snapshots)
+
+        return {
+            "portfolios": len(portfolio_ids),
+            "dates": sorted(affected),
+            "aggregates": aggregates,
+            "snapshots": len(snapshots),
+        }
+
 
 class PortfolioService:
     """
@@ -100,12 +897,48 @@ class PortfolioService:
     @staticmethod
     def get_portfolio_statistics(portfolio: Portfolio) -> Dict[str, Any]:
         """
-        Get statistics for a portfolio.
+        Get statistics for a portfolio, read through the statistics cache.
+        """
+        version = get_statistics_version(portfolio.pk)
+        stats = get_cached_statistics(portfolio.pk, version)
+        if stats is None:
+            stats = PortfolioService.compute_portfolio_statistics(portfolio)
+            set_cached_statistics(portfolio.pk, version, stats)
+        return stats
+
+    @staticmethod
+    async def aget_portfolio_statistics(portfolio: Portfolio) -> Dict[str, Any]:
+        """
+        Async get_portfolio_statistics; on a cache miss the three queries run concurrently.
+        """
+        # The cache helpers are synchronous and the cache backend may be the database.
+        version = await sync_to_async(get_statistics_version)(portfolio.pk)
+        stats = await sync_to_async(get_cached_statistics)(portfolio.pk, version)
+        if stats is None:
+            total_holdings, total_snapshots, latest_snapshot = await run_concurrently(
+                portfolio.holdings.count,
+                portfolio.valuation_snapshots.count,
+                portfolio.valuation_snapshots.order_by("-snapshot_date").first,
+            )
+            stats = PortfolioService._statistics(total_holdings, total_snapshots, latest_snapshot)
+            await sync_to_async(set_cached_statistics)(portfolio.pk, version, stats)
+        return stats
+
+    @staticmethod
+    def compute_portfolio_statistics(portfolio: Portfolio) -> Dict[str, Any]:
+        """
+        Compute statistics for a portfolio from the database.
         """
         total_holdings = portfolio.holdings.count()
         total_snapshots = portfolio.valuation_snapshots.count()
         latest_snapshot = portfolio.valuation_snapshots.order_by("-snapshot_date").first()
 
+        return PortfolioService._statistics(total_holdings, total_snapshots, latest_snapshot)
+
+    @staticmethod
+    def _statistics(
+        total_holdings: int, total_snapshots: int, latest_snapshot: Optional[ValuationSnapshot]
+    ) -> Dict[str, Any]:
         return {
             "total_holdings": total_holdings,
             "total_snapshots": total_snapshots,
@@ -113,3 +946,49 @@ class PortfolioService:
             "latest_aum": latest_snapshot.total_aum if latest_snapshot else None,
         }
 
+    @staticmethod
+    def get_portfolio_statistics_bulk(portfolios: QuerySet[Portfolio]) -> List[Dict[str, Any]]:
+        """
+        Statistics for many portfolios from a single annotated query.
+
+        Each entry carries the same fields as get_portfolio_statistics plus
+        the portfolio id, in the order of the given queryset.
+        """
+        latest_snapshot = ValuationSnapshot.objects.filter(portfolio=OuterRef("pk")).order_by("-snapshot_date")
+        rows = portfolios.annotate(
+            total_holdings=Coalesce(
+                Subquery(
+                    Holding.objects.filter(portfolio=OuterRef("pk"))
+                    .order_by()
+                    .values("portfolio")
+                    .annotate(count=Count("pk"))
+                    .values("count"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+            total_snapshots=Coalesce(
+                Subquery(
+                    ValuationSnapshot.objects.filter(portfolio=OuterRef("pk"))
+                    .order_by()
+                    .values("portfolio")
+                    .annotate(count=Count("pk"))
+                    .values("count"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+            latest_snapshot_date=Subquery(latest_snapshot.values("snapshot_date")[:1]),
+            latest_aum=Subquery(latest_snapshot.values("total_aum")[:1]),
+        ).values("pk", "total_holdings", "total_snapshots", "latest_snapshot_date", "latest_aum")
+
+        return [
+            {
+                "portfolio": row["pk"],
+                "total_holdings": row["total_holdings"],
+                "total_snapshots": row["total_snapshots"],
+                "latest_snapshot_date": row["latest_snapshot_date"],
+                "latest_aum": row["latest_aum"],
+            }
+            for row in rows
+        ]
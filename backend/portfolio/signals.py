@@ -0,0 +1,158 @@
+"""
+Signal handlers keeping derived data (holding aggregates, cached
+statistics, table change counters) in step with Holding and
+ValuationSnapshot writes.
+"""
+from typing import Any
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from portfolio.cache import invalidate_statistics
+from portfolio.models import Portfolio, Holding, ValuationSnapshot, SecurityPrice
+from portfolio.services import HoldingAggregateService, RevaluationService, holding_value, security_prices
+from portfolio.versions import VERSIONED_MODELS, touch
+
+AGGREGATE_KEY_FIELDS = ("portfolio_id", "valuation_date", "security_id", "asset_type", "quantity", "unit_price")
+
+
+def price_key(values: Any) -> tuple:
+    """
+        Security price key of a holding, or of its stored values.
+    """
+    if isinstance(values, dict):
+        return values["security_id"], values["valuation_date"]
+    return values.security_id, values.valuation_date
+
+
+@receiver(pre_save, sender=Holding)
+def remember_previous_holding(sender: Any, instance: Holding, **kwargs: Any) -> None:
+    """
+        Load the stored row of an updated holding so its old aggregate can be decremented.
+    """
+    instance._aggregate_previous = None
+    if instance.pk is not None:
+        instance._aggregate_previous = (
+            Holding.objects.select_for_update()
+            .filter(pk=instance.pk)
+            .values(*AGGREGATE_KEY_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Holding)
+def update_aggregate_on_save(sender: Any, instance: Holding, **kwargs: Any) -> None:
+    """
+        Move the holding's value into its (portfolio, date, asset_type) aggregate.
+    """
+    previous = getattr(instance, "_aggregate_previous", None)
+    prices = security_prices([price_key(instance)] + ([price_key(previous)] if previous else []))
+    key = (instance.portfolio_id, instance.valuation_date, instance.asset_type)
+    value = holding_value(instance.quantity, prices.get(price_key(instance), instance.unit_price))
+    invalidate_statistics([instance.portfolio_id, previous["portfolio_id"] if previous else None])
+
+    if previous is None:
+        HoldingAggregateService.apply_delta(*key, value, 1)
+        return
+
+    previous_key = (previous["portfolio_id"], previous["valuation_date"], previous["asset_type"])
+    previous_value = holding_value(previous["quantity"], prices.get(price_key(previous), previous["unit_price"]))
+    if previous_key == key:
+        if value != previous_value:
+            HoldingAggregateService.apply_delta(*key, value - previous_value, 0)
+    else:
+        HoldingAggregateService.apply_delta(*previous_key, -previous_value, -1)
+        HoldingAggregateService.apply_delta(*key, value, 1)
+
+
+@receiver(post_delete, sender=Holding)
+def update_aggregate_on_delete(sender: Any, instance: Holding, origin: Any = None, **kwargs: Any) -> None:
+    """
+        Remove a deleted holding from its aggregate.
+    """
+    if isinstance(origin, Portfolio):
+        # The portfolio's aggregates are removed by the same cascade.
+        return
+    invalidate_statistics([instance.portfolio_id])
+    unit_price = security_prices([price_key(instance)]).get(price_key(instance), instance.unit_price)
+    HoldingAggregateService.apply_delta(
+        instance.portfolio_id,
+        instance.valuation_date,
+        instance.asset_type,
+        -holding_value(instance.quantity, unit_price),
+        -1,
+    )
+
+
+@receiver(post_save, sender=ValuationSnapshot)
+def invalidate_statistics_on_snapshot_save(sender: Any, instance: ValuationSnapshot, **kwargs: Any) -> None:
+    """
+        Invalidate cached statistics of the snapshot's portfolio, and of its old portfolio after a move.
+    """
+    invalidate_statistics([instance.portfolio_id, getattr(instance, "_loaded_portfolio_id", None)])
+    instance._loaded_portfolio_id = instance.portfolio_id
+
+
+@receiver(post_delete, sender=ValuationSnapshot)
+def invalidate_statistics_on_snapshot_delete(
+    sender: Any, instance: ValuationSnapshot, origin: Any = None, **kwargs: Any
+) -> None:
+    """
+        Invalidate cached statistics of a deleted snapshot's portfolio.
+    """
+    if not isinstance(origin, Portfolio):
+        invalidate_statistics([instance.portfolio_id])
+
+
+@receiver(pre_save, sender=SecurityPrice)
+def remember_previous_price_key(sender: Any, instance: SecurityPrice, **kwargs: Any) -> None:
+    """
+        Remember the key an updated price was stored under, so a moved price revalues both dates.
+    """
+    instance._revalue_previous = None
+    if instance.pk is not None:
+        instance._revalue_previous = (
+            SecurityPrice.objects.filter(pk=instance.pk).values_list("security_id", "price_date").first()
+        )
+
+
+@receiver(post_save, sender=SecurityPrice)
+def revalue_on_price_save(sender: Any, instance: SecurityPrice, **kwargs: Any) -> None:
+    """
+        Revalue the portfolios holding the security on the price date.
+    """
+    keys = [(instance.security_id, instance.price_date)]
+    previous = getattr(instance, "_revalue_previous", None)
+    RevaluationService.revalue(keys + ([previous] if previous else []))
+
+
+@receiver(post_delete, sender=SecurityPrice)
+def revalue_on_price_delete(sender: Any, instance: SecurityPrice, **kwargs: Any) -> None:
+    """
+        Revalue the portfolios that held the security at the deleted price.
+    """
+    RevaluationService.revalue([(instance.security_id, instance.price_date)])
+
+
+def touch_on_save(sender: Any, **kwargs: Any) -> None:
+    """
+        Bump the change counter of a saved row's table.
+    """
+    touch(sender, using=kwargs.get("using"))
+
+
+def touch_on_delete(sender: Any, origin: Any = None, **kwargs: Any) -> None:
+    """
+        Bump the change counter of a deleted row's table; a portfolio delete covers its cascade.
+    """
+    if sender is Portfolio:
+        touch(Portfolio, Holding, ValuationSnapshot, using=kwargs.get("using"))
+    elif not isinstance(origin, Portfolio):
+        touch(sender, using=kwargs.get("using"))
+
+
+for versioned_model in VERSIONED_MODELS:
+    post_save.connect(touch_on_save, sender=versioned_model, dispatch_uid=f"touch_on_save_{versioned_model.__name__}")
+    post_delete.connect(
+        touch_on_delete, sender=versioned_model, dispatch_uid=f"touch_on_delete_{versioned_model.__name__}"
+    )
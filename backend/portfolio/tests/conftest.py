@@ -2,6 +2,7 @@
 Pytest configuration and fixtures for portfolio tests.
 """
 import pytest
+from django.core.cache import caches
 from rest_framework.test import APIClient
 
 
@@ -10,3 +11,10 @@ def api_client():
     """Fixture for API client."""
     return APIClient()
 
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches."""
+    for cache in caches.all():
+        cache.clear()
@@ -0,0 +1,83 @@
+"""
+Tests for the benchmark data builder and suite.
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from portfolio.benchmarks.data import build_dataset, clear_dataset
+from django.db import connection
+
+from portfolio.benchmarks.suite import CASE_NAMES, POSTGRESQL_CASES, compare, run_suite
+from portfolio.models import Holding, HoldingAggregate, Portfolio, ValuationSnapshot
+from portfolio.services import HoldingAggregateService, ValuationService
+from portfolio.tests.factories import HoldingFactory, PortfolioFactory
+
+
+@pytest.mark.django_db
+class TestBenchmarks:
+    """Test cases for the benchmark suite."""
+
+    def test_build_and_clear_dataset(self):
+        """Test the builder creates consistent portfolios, holdings, aggregates and snapshots."""
+        dataset = build_dataset(portfolios=3, holdings=4, dates=2, seed=1)
+        assert Portfolio.objects.count() == 3
+        assert Holding.objects.count() == 24
+        assert ValuationSnapshot.objects.count() == 6
+        assert HoldingAggregateService.verify() == []
+
+        portfolio = Portfolio.objects.get(pk=dataset["portfolio_ids"][0])
+        valuation_date = dataset["valuation_dates"][0]
+        snapshot = ValuationSnapshot.objects.get(portfolio=portfolio, snapshot_date=valuation_date)
+        assert snapshot.total_aum == ValuationService.calculate_portfolio_aum(portfolio, valuation_date)
+        assert snapshot.total_aum > Decimal("0")
+
+        assert clear_dataset() == 3
+        assert not Holding.objects.exists()
+        assert not HoldingAggregate.objects.exists()
+
+    def test_clear_dataset_spares_other_portfolios(self):
+        """Test only tagged dataset portfolios, limited to the given ids, are deleted."""
+        real = PortfolioFactory(name="bench-client")
+        HoldingFactory(portfolio=real)
+        kept = build_dataset(portfolios=1, holdings=2, dates=1)
+        built = build_dataset(portfolios=2, holdings=2, dates=1, seed=1, start_date=date(2024, 2, 1))
+
+        assert clear_dataset(built["portfolio_ids"]) == 2
+        assert set(Portfolio.objects.values_list("pk", flat=True)) == {real.pk, *kept["portfolio_ids"]}
+        assert clear_dataset() == 1
+        assert list(Portfolio.objects.values_list("pk", flat=True)) == [real.pk]
+        assert Holding.objects.filter(portfolio=real).count() == 1
+
+    def test_run_suite_and_compare(self):
+        """Test every case is measured and regressions are reported."""
+        dataset = build_dataset(portfolios=1, holdings=5, dates=1)
+        portfolio = Portfolio.objects.get(pk=dataset["portfolio_ids"][0])
+        results = run_suite(portfolio, dataset["valuation_dates"][0], repeat=1)
+
+        assert tuple(results["results"]) + tuple(results["meta"]["skipped"]) == CASE_NAMES
+        assert results["results"]["portfolio.get_portfolio_statistics.cold"]["queries"] == 3
+        assert results["results"]["portfolio.get_portfolio_statistics.cached"]["queries"] == 0
+        assert compare(results, results) == []
+
+        slower = {"results": {name: dict(result) for name, result in results["results"].items()}}
+        slower["results"]["serializer.holding_list"]["queries"] += 1
+        assert compare(slower, results) == [
+            {
+                "case": "serializer.holding_list",
+                "metric": "queries",
+                "baseline": results["results"]["serializer.holding_list"]["queries"],
+                "current": results["results"]["serializer.holding_list"]["queries"] + 1,
+            }
+        ]
+
+    def test_connection_cases_need_postgresql(self, monkeypatch):
+        """Test the connection cases are skipped, not run, on other databases."""
+        dataset = build_dataset(portfolios=1, holdings=2, dates=1)
+        portfolio = Portfolio.objects.get(pk=dataset["portfolio_ids"][0])
+        monkeypatch.setattr(connection, "vendor", "sqlite")
+        only = ["valuation.calculate_portfolio_aum", *POSTGRESQL_CASES]
+        results = run_suite(portfolio, dataset["valuation_dates"][0], repeat=1, only=only)
+
+        assert list(results["results"]) == ["valuation.calculate_portfolio_aum"]
+        assert results["meta"]["skipped"] == list(POSTGRESQL_CASES)
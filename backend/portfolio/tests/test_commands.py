@@ -0,0 +1,131 @@
+"""
+Tests for Portfolio management commands.
+"""
+import json
+import pytest
+from io import StringIO
+from decimal import Decimal
+from datetime import date
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from portfolio.models import Holding, ValuationSnapshot
+from portfolio.partitions import add_periods, create_partition, list_partitions, partition_name, period_start
+from portfolio.tests.factories import PortfolioFactory, HoldingFactory
+
+
+@pytest.mark.django_db
+class TestSnapshotAllCommand:
+    """Test cases for the snapshot_all command."""
+
+    def test_snapshot_all(self):
+        """Test snapshotting every portfolio for a date."""
+        portfolio = PortfolioFactory()
+        PortfolioFactory()
+        HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("100"),
+            unit_price=Decimal("150.50"),
+            valuation_date=date(2024, 1, 31),
+        )
+        out = StringIO()
+        call_command("snapshot_all", "--date", "2024-01-31", stdout=out)
+        assert "2 portfolios, 2 created, 0 updated" in out.getvalue()
+        snapshot = ValuationSnapshot.objects.get(portfolio=portfolio, snapshot_date=date(2024, 1, 31))
+        assert snapshot.total_aum == Decimal("15050.00")
+
+    def test_snapshot_all_invalid_date(self):
+        """Test an invalid date is rejected."""
+        with pytest.raises(CommandError):
+            call_command("snapshot_all", "--date", "31/01/2024", stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestRebuildHoldingAggregatesCommand:
+    """Test cases for the rebuild_holding_aggregates command."""
+
+    def test_verify_only_reports_drift(self):
+        """Test verification fails on drift and a rebuild fixes it."""
+        holding = HoldingFactory(quantity=Decimal("1"), unit_price=Decimal("10"))
+        Holding.objects.filter(pk=holding.pk).update(unit_price=Decimal("11"))
+
+        with pytest.raises(CommandError):
+            call_command("rebuild_holding_aggregates", "--verify-only", stdout=StringIO())
+
+        out = StringIO()
+        call_command("rebuild_holding_aggregates", stdout=out)
+        assert "1 were out of date" in out.getvalue()
+        call_command("rebuild_holding_aggregates", "--verify-only", stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRunRecalculationWorkerCommand:
+    """Test cases for the run_recalculation_worker command."""
+
+    def test_worker_drains_queue(self):
+        """Test the worker runs every queued job with --once."""
+        from portfolio.jobs import RecalculationJobService
+
+        portfolio = PortfolioFactory()
+        HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("4"),
+            unit_price=Decimal("2.50"),
+            valuation_date=date(2024, 1, 31),
+        )
+        snapshot = ValuationSnapshot.objects.create(
+            portfolio=portfolio, snapshot_date=date(2024, 1, 31), total_aum=Decimal("0.00")
+        )
+        job = RecalculationJobService.submit(date(2024, 1, 1), date(2024, 1, 31))
+        out = StringIO()
+        call_command("run_recalculation_worker", "--once", "--worker-id", "test", stdout=out)
+        assert f"Job {job.pk}: completed, 1 snapshots" in out.getvalue()
+        snapshot.refresh_from_db()
+        assert snapshot.total_aum == Decimal("10.00")
+
+
+
+@pytest.mark.django_db
+class TestManageHoldingPartitionsCommand:
+    """Test cases for the manage_holding_partitions command."""
+
+    def test_creates_and_retires_partitions(self):
+        """Test upcoming partitions are created and old ones detached."""
+        create_partition(connection, date(2021, 3, 1), "month")
+        HoldingFactory(valuation_date=date(2021, 3, 15))
+
+        out = StringIO()
+        call_command("manage_holding_partitions", "--ahead", "6", "--retain", "12", stdout=out)
+
+        names = [partition.name for partition in list_partitions(connection)]
+        assert "portfolio_holding_p2021_03" not in names
+        assert partition_name(add_periods(period_start(date.today(), "month"), "month", 6), "month") in names
+        assert "Detached portfolio_holding_p2021_03" in out.getvalue()
+        assert not Holding.objects.exists()
+
+    def test_drop_requires_retain(self):
+        """Test --drop without --retain is rejected."""
+        with pytest.raises(CommandError):
+            call_command("manage_holding_partitions", "--drop", stdout=StringIO())
+
+
+class TestGenerateOpenapiSchemaCommand:
+    """Test cases for the generate_openapi_schema command."""
+
+    def test_writes_schema_files(self, tmp_path):
+        """Test every format is written to the output directory."""
+        out = StringIO()
+        call_command("generate_openapi_schema", "--output-dir", str(tmp_path), stdout=out)
+
+        schema = json.loads((tmp_path / "swagger.json").read_text())
+        assert schema["info"]["title"] == "Portfolio Valuation API"
+        assert (tmp_path / "swagger.yaml").read_text().startswith("swagger:")
+        assert "swagger.json" in out.getvalue()
+
+    def test_requires_directory(self, settings):
+        """Test a missing output directory is rejected."""
+        settings.OPENAPI_SCHEMA_DIR = ""
+        with pytest.raises(CommandError):
+            call_command("generate_openapi_schema", stdout=StringIO())
@@ -0,0 +1,85 @@
+"""
+Tests for the recalculation job queue.
+"""
+import pytest
+from decimal import Decimal
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from portfolio.jobs import MAX_ATTEMPTS, LeaseLost, RecalculationJobService
+from portfolio.models import RecalculationJob, ValuationSnapshot
+from portfolio.tests.factories import PortfolioFactory, HoldingFactory, ValuationSnapshotFactory
+
+
+def stale_snapshots(count, snapshot_date=date(2024, 1, 1)):
+    portfolios = [PortfolioFactory() for _ in range(count)]
+    for portfolio in portfolios:
+        HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("10"),
+            unit_price=Decimal("2.50"),
+            valuation_date=snapshot_date,
+        )
+        ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=snapshot_date, total_aum=Decimal("1.00"))
+    return portfolios
+
+
+@pytest.mark.django_db
+class TestRecalculationJobService:
+    """Test cases for RecalculationJobService."""
+
+    def test_submit_claim_and_run(self):
+        """Test a job recalculates every snapshot in scope."""
+        portfolios = stale_snapshots(3)
+        job = RecalculationJobService.submit(
+            date(2024, 1, 1), date(2024, 1, 31), portfolio_ids=[portfolios[0].pk, portfolios[1].pk]
+        )
+        assert job.total == 2
+
+        claimed = RecalculationJobService.claim("worker-a")
+        assert claimed.pk == job.pk
+        assert claimed.status == "RUNNING"
+        assert RecalculationJobService.claim("worker-b") is None
+
+        job = RecalculationJobService.run(claimed, "worker-a")
+        assert job.status == "COMPLETED"
+        assert RecalculationJobService.progress(job) == {"processed": 2, "total": 2, "percent": 100.0}
+        assert list(
+            ValuationSnapshot.objects.order_by("portfolio_id").values_list("total_aum", flat=True)
+        ) == [Decimal("25.00"), Decimal("25.00"), Decimal("1.00")]
+
+    def test_resume_after_expired_lease(self):
+        """Test another worker resumes a job from its last committed chunk."""
+        stale_snapshots(5)
+        job = RecalculationJobService.submit(date(2024, 1, 1), date(2024, 1, 1), chunk_size=2)
+        job = RecalculationJobService.claim("worker-a")
+        assert RecalculationJobService.run_chunk(job, "worker-a") is True
+        assert RecalculationJobService.progress(job)["processed"] == 2
+
+        RecalculationJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        resumed = RecalculationJobService.claim("worker-b", lease_seconds=60)
+        assert resumed.pk == job.pk
+        assert resumed.attempts == 2
+        assert resumed.last_processed_id == job.last_processed_id
+
+        with pytest.raises(LeaseLost):
+            RecalculationJobService.run_chunk(job, "worker-a")
+
+        resumed = RecalculationJobService.run(resumed, "worker-b")
+        assert resumed.status == "COMPLETED"
+        assert resumed.processed == 5
+        assert not ValuationSnapshot.objects.filter(total_aum=Decimal("1.00")).exists()
+
+    def test_expired_job_fails_after_max_attempts(self):
+        """Test a job whose lease keeps expiring is failed instead of reclaimed."""
+        job = RecalculationJobService.submit(date(2024, 1, 1), date(2024, 1, 1))
+        RecalculationJob.objects.filter(pk=job.pk).update(
+            status="RUNNING",
+            worker="worker-a",
+            attempts=MAX_ATTEMPTS,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        assert RecalculationJobService.claim("worker-b", lease_seconds=60) is None
+        job.refresh_from_db()
+        assert job.status == "FAILED"
@@ -0,0 +1,63 @@
+"""
+Tests for the pooled PostgreSQL backend.
+"""
+import pytest
+from django.db import OperationalError, connection
+from django.db.utils import load_backend
+
+from portfolio.pooling import close_pools, pool_stats, render_pool_metrics
+
+ALIAS = "pool_test"
+
+
+def pooled_wrapper(**pool_options):
+    settings_dict = {
+        **connection.settings_dict,
+        "ENGINE": "portfolio.pooling",
+        "OPTIONS": {"pool": pool_options},
+        "CONN_MAX_AGE": 0,
+    }
+    return load_backend("portfolio.pooling").DatabaseWrapper(settings_dict, ALIAS)
+
+
+def backend_pid(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestConnectionPool:
+    """Test cases for the connection pool."""
+
+    def teardown_method(self):
+        close_pools(alias=ALIAS)
+
+    def test_connections_are_reused_and_bounded(self):
+        """Test a closed connection is reused and a full pool times out."""
+        first, second = pooled_wrapper(max_size=1, timeout=0.05), pooled_wrapper(max_size=1, timeout=0.05)
+        pid = backend_pid(first)
+        first.close()
+        assert backend_pid(second) == pid
+
+        with pytest.raises(OperationalError):
+            first.ensure_connection()
+        second.close()
+
+        [stats] = [stats for stats in pool_stats() if stats["alias"] == ALIAS]
+        assert (stats["created"], stats["checkouts"], stats["timeouts"], stats["in_use"]) == (1, 2, 1, 0)
+        assert f'portfolio_db_pool_idle{{alias="{ALIAS}"' in render_pool_metrics()
+
+    def test_broken_connection_is_replaced(self):
+        """Test a connection failing the checkout health check is replaced."""
+        wrapper = pooled_wrapper(max_size=1, check_after=0)
+        pid = backend_pid(wrapper)
+        raw = wrapper.connection
+        wrapper.close()
+        raw.close()
+
+        assert backend_pid(wrapper) != pid
+        wrapper.close()
+        [stats] = [stats for stats in pool_stats() if stats["alias"] == ALIAS]
+        assert stats["failed_checks"] == 1
+        assert stats["size"] == 1
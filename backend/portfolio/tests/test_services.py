@@ -3,10 +3,19 @@ Tests for Portfolio services.
 """
 import pytest
 from decimal import Decimal
-from datetime import date
+from datetime import date, timedelta
 
-from portfolio.models import Portfolio, Holding, ValuationSnapshot
-from portfolio.services import ValuationService, PortfolioService
+from django.db import connection
+
+from portfolio.models import Portfolio, Holding, ValuationSnapshot, HoldingAggregate, Security, SecurityPrice
+from portfolio.partitions import DEFAULT_PARTITION, create_partition, retire_partitions
+from portfolio.services import (
+    ValuationService,
+    PortfolioService,
+    HoldingAggregateService,
+    HoldingService,
+    RevaluationService,
+)
 from portfolio.tests.factories import (
     PortfolioFactory,
     HoldingFactory,
@@ -92,6 +101,59 @@ class TestValuationService:
         assert aum_today == quantity1 * unit_price1
         assert aum_yesterday == quantity2 * unit_price2
 
+    def test_calculate_portfolio_aum_rounds_to_cents(self):
+        """Test AUM is summed exactly and rounded once to cents."""
+        portfolio = PortfolioFactory()
+        valuation_date = date.today()
+        HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("0.33333333"),
+            unit_price=Decimal("3.0015"),
+            valuation_date=valuation_date,
+        )
+        HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("1.5"),
+            unit_price=Decimal("0.0033"),
+            valuation_date=valuation_date,
+        )
+        expected = (
+            Decimal("0.33333333") * Decimal("3.0015") + Decimal("1.5") * Decimal("0.0033")
+        ).quantize(Decimal("0.01"))
+        aum = ValuationService.calculate_portfolio_aum(portfolio, valuation_date)
+        assert aum == expected
+        assert aum.as_tuple().exponent == -2
+
+    def test_calculate_portfolio_aum_by_dates(self):
+        """Test multi-date AUM calculation in one grouped query."""
+        from datetime import timedelta
+
+        portfolio = PortfolioFactory()
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        empty_day = today - timedelta(days=2)
+        HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("100"),
+            unit_price=Decimal("150.50"),
+            valuation_date=today,
+        )
+        HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("50"),
+            unit_price=Decimal("200.75"),
+            valuation_date=yesterday,
+        )
+        HoldingFactory(quantity=Decimal("10"), unit_price=Decimal("10"), valuation_date=today)
+        results = ValuationService.calculate_portfolio_aum_by_dates(
+            portfolio, [today, yesterday, empty_day]
+        )
+        assert results == {
+            today: ValuationService.calculate_portfolio_aum(portfolio, today),
+            yesterday: ValuationService.calculate_portfolio_aum(portfolio, yesterday),
+            empty_day: Decimal("0.00"),
+        }
+
     def test_create_valuation_snapshot(self):
         """Test creating a valuation snapshot."""
         portfolio = PortfolioFactory()
@@ -114,6 +176,62 @@ class TestValuationService:
         assert snapshot.status == "DRAFT"
         assert snapshot.total_aum == quantity * unit_price
 
+    def test_create_snapshots_bulk(self):
+        """Test bulk snapshot creation for every portfolio on a date."""
+        valuation_date = date.today()
+        with_holdings = PortfolioFactory()
+        without_holdings = PortfolioFactory()
+        already_confirmed = PortfolioFactory()
+        HoldingFactory(
+            portfolio=with_holdings,
+            quantity=Decimal("100"),
+            unit_price=Decimal("150.50"),
+            valuation_date=valuation_date,
+        )
+        HoldingFactory(
+            portfolio=already_confirmed,
+            quantity=Decimal("10"),
+            unit_price=Decimal("2.5"),
+            valuation_date=valuation_date,
+        )
+        ValuationSnapshotFactory(
+            portfolio=already_confirmed,
+            snapshot_date=valuation_date,
+            status="CONFIRMED",
+            total_aum=Decimal("0.00"),
+        )
+
+        result = ValuationService.create_snapshots_bulk(valuation_date, batch_size=2)
+
+        assert result["portfolios"] == 3
+        assert result["created"] == 2
+        assert result["updated"] == 1
+        assert result["portfolios_without_holdings"] == 1
+        snapshots = {
+            snapshot.portfolio_id: snapshot
+            for snapshot in ValuationSnapshot.objects.filter(snapshot_date=valuation_date)
+        }
+        assert snapshots[with_holdings.id].total_aum == Decimal("15050.00")
+        assert snapshots[with_holdings.id].status == "DRAFT"
+        assert snapshots[without_holdings.id].total_aum == Decimal("0.00")
+        assert snapshots[already_confirmed.id].total_aum == Decimal("25.00")
+        assert snapshots[already_confirmed.id].status == "CONFIRMED"
+        assert snapshots[without_holdings.id].aum_breakdown["STOCK"] == "0.00"
+        assert sum(Decimal(value) for value in snapshots[with_holdings.id].aum_breakdown.values()) == Decimal(
+            "15050.00"
+        )
+
+    def test_create_snapshots_bulk_limited_to_portfolios(self):
+        """Test bulk snapshot creation restricted to given portfolios."""
+        valuation_date = date.today()
+        selected = PortfolioFactory()
+        PortfolioFactory()
+        result = ValuationService.create_snapshots_bulk(valuation_date, portfolio_ids=[selected.id])
+        assert result["portfolios"] == 1
+        assert list(
+            ValuationSnapshot.objects.filter(snapshot_date=valuation_date).values_list("portfolio_id", flat=True)
+        ) == [selected.id]
+
     def test_recalculate_snapshot_aum(self):
         """Test recalculating snapshot AUM."""
         portfolio = PortfolioFactory()
@@ -135,6 +253,83 @@ class TestValuationService:
         updated_snapshot = ValuationService.recalculate_snapshot_aum(snapshot)
         assert updated_snapshot.total_aum == quantity * unit_price
 
+    def test_aum_breakdown_by_asset_type(self, django_assert_num_queries):
+        """Test snapshots store a per-asset-type breakdown read back without the holdings table."""
+        portfolio = PortfolioFactory()
+        valuation_date = date.today()
+        HoldingFactory(
+            portfolio=portfolio, asset_type="STOCK", quantity=Decimal("3"), unit_price=Decimal("0.3333"),
+            valuation_date=valuation_date,
+        )
+        HoldingFactory(
+            portfolio=portfolio, asset_type="BOND", quantity=Decimal("3"), unit_price=Decimal("0.3334"),
+            valuation_date=valuation_date,
+        )
+        snapshot = ValuationService.create_valuation_snapshot(portfolio=portfolio, snapshot_date=valuation_date)
+
+        assert snapshot.total_aum == Decimal("2.00")
+        assert snapshot.aum_breakdown == {
+            "STOCK": "1.00",
+            "BOND": "1.00",
+            "CASH": "0.00",
+            "ETF": "0.00",
+            "MUTUAL_FUND": "0.00",
+            "OTHER": "0.00",
+        }
+
+        HoldingFactory(
+            portfolio=portfolio, asset_type="CASH", quantity=Decimal("2"), unit_price=Decimal("1"),
+            valuation_date=valuation_date,
+        )
+        ValuationService.recalculate_snapshots_aum([snapshot])
+        snapshot.refresh_from_db()
+        assert snapshot.total_aum == Decimal("4.00")
+        assert snapshot.aum_breakdown["CASH"] == "2.00"
+
+        with django_assert_num_queries(1) as captured:
+            [allocation] = ValuationService.get_snapshot_allocations(ValuationSnapshot.objects.filter(pk=snapshot.pk))
+        assert "portfolio_holding" not in captured.captured_queries[0]["sql"]
+        weights = {row["asset_type"]: row["weight"] for row in allocation["allocation"]}
+        assert weights["CASH"] == "0.5000"
+        assert weights["STOCK"] == "0.2500"
+        assert allocation["total_aum"] == "4.00"
+
+    def test_get_portfolio_valuation_series(self):
+        """Test monthly downsampling with last and average values."""
+        portfolio = PortfolioFactory()
+        for snapshot_date, total_aum, status in [
+            (date(2024, 1, 10), Decimal("100.00"), "CONFIRMED"),
+            (date(2024, 1, 31), Decimal("200.00"), "DRAFT"),
+            (date(2024, 2, 15), Decimal("300.00"), "CONFIRMED"),
+            (date(2024, 4, 1), Decimal("401.00"), "CONFIRMED"),
+        ]:
+            ValuationSnapshotFactory(
+                portfolio=portfolio, snapshot_date=snapshot_date, total_aum=total_aum, status=status
+            )
+        ValuationSnapshotFactory(snapshot_date=date(2024, 1, 15), total_aum=Decimal("999.00"))
+
+        last = ValuationService.get_portfolio_valuation_series(portfolio, interval="month")
+        assert last == [
+            {"date": date(2024, 1, 1), "total_aum": Decimal("200.00")},
+            {"date": date(2024, 2, 1), "total_aum": Decimal("300.00")},
+            {"date": date(2024, 4, 1), "total_aum": Decimal("401.00")},
+        ]
+
+        average = ValuationService.get_portfolio_valuation_series(
+            portfolio, date_to=date(2024, 3, 31), interval="quarter", method="average"
+        )
+        assert average == [{"date": date(2024, 1, 1), "total_aum": Decimal("200.00")}]
+
+        confirmed = ValuationService.get_portfolio_valuation_series(
+            portfolio, date_from=date(2024, 1, 1), interval="month", status="CONFIRMED"
+        )
+        assert confirmed[0] == {"date": date(2024, 1, 1), "total_aum": Decimal("100.00")}
+
+    def test_get_portfolio_valuation_series_invalid_interval(self):
+        """Test unknown intervals are rejected."""
+        with pytest.raises(ValueError):
+            ValuationService.get_portfolio_valuation_series(PortfolioFactory(), interval="hour")
+
     def test_update_snapshot_status(self):
         """Test updating snapshot status."""
         portfolio = PortfolioFactory()
@@ -157,6 +352,197 @@ class TestValuationService:
         with pytest.raises(ValueError):
             ValuationService.update_snapshot_status(snapshot, "INVALID_STATUS")
 
+    def test_update_snapshot_status_illegal_transition(self):
+        """Test a snapshot cannot skip or go back a status."""
+        snapshot = ValuationSnapshotFactory(snapshot_date=date.today(), status="DRAFT")
+        with pytest.raises(ValueError):
+            ValuationService.update_snapshot_status(snapshot, "ARCHIVED")
+        snapshot = ValuationSnapshotFactory(snapshot_date=date.today(), status="CONFIRMED")
+        with pytest.raises(ValueError):
+            ValuationService.update_snapshot_status(snapshot, "DRAFT")
+
+    def test_bulk_update_status(self, django_assert_max_num_queries):
+        """Test legal snapshots move with one UPDATE and the rest are counted."""
+        portfolio = PortfolioFactory()
+        for day, snapshot_status in [(1, "DRAFT"), (2, "DRAFT"), (3, "CONFIRMED"), (4, "ARCHIVED")]:
+            ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date(2024, 1, day), status=snapshot_status)
+
+        with django_assert_max_num_queries(4):
+            result = ValuationService.bulk_update_status(
+                ValuationSnapshot.objects.filter(portfolio=portfolio), "CONFIRMED"
+            )
+
+        assert result == {"status": "CONFIRMED", "matched": 4, "updated": 2, "unchanged": 1, "rejected": 1}
+        assert list(
+            ValuationSnapshot.objects.filter(portfolio=portfolio).order_by("snapshot_date").values_list("status", flat=True)
+        ) == ["CONFIRMED", "CONFIRMED", "CONFIRMED", "ARCHIVED"]
+
+
+@pytest.mark.django_db
+class TestHoldingAggregateService:
+    """Test cases for the maintained holding aggregates."""
+
+    def test_aggregate_follows_holding_writes(self):
+        """Test create, update, move and delete keep the aggregate exact."""
+        from datetime import timedelta
+
+        portfolio = PortfolioFactory()
+        other_portfolio = PortfolioFactory()
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        stock = HoldingFactory(
+            portfolio=portfolio,
+            asset_type="STOCK",
+            quantity=Decimal("100"),
+            unit_price=Decimal("150.50"),
+            valuation_date=today,
+        )
+        cash = HoldingFactory(
+            portfolio=portfolio,
+            asset_type="CASH",
+            quantity=Decimal("2500"),
+            unit_price=Decimal("1"),
+            valuation_date=today,
+        )
+        assert HoldingAggregateService.get_aum(portfolio, today) == Decimal("17550.00")
+
+        stock.unit_price = Decimal("151.0000")
+        stock.save()
+        assert HoldingAggregateService.get_aum(portfolio, today) == Decimal("17600.00")
+
+        cash.valuation_date = yesterday
+        cash.save()
+        assert HoldingAggregateService.get_aum(portfolio, today) == Decimal("15100.00")
+        assert HoldingAggregateService.get_aum(portfolio, yesterday) == Decimal("2500.00")
+
+        stock.portfolio = other_portfolio
+        stock.save()
+        assert HoldingAggregateService.get_aum(portfolio, today) == Decimal("0.00")
+        assert HoldingAggregateService.get_aum(other_portfolio, today) == Decimal("15100.00")
+
+        Holding.objects.filter(pk=cash.pk).delete()
+        assert HoldingAggregateService.get_aum(portfolio, yesterday) == Decimal("0.00")
+        assert not HoldingAggregate.objects.filter(portfolio=portfolio).exists()
+        assert HoldingAggregateService.verify() == []
+
+    def test_aggregate_removed_with_portfolio(self):
+        """Test deleting a portfolio cascades its aggregates cleanly."""
+        portfolio = PortfolioFactory()
+        HoldingFactory.create_batch(3, portfolio=portfolio, valuation_date=date.today())
+        portfolio.delete()
+        assert not HoldingAggregate.objects.exists()
+
+    def test_verify_and_rebuild(self):
+        """Test verify reports drift and rebuild repairs it."""
+        portfolio = PortfolioFactory()
+        valuation_date = date.today()
+        HoldingFactory(
+            portfolio=portfolio,
+            asset_type="BOND",
+            quantity=Decimal("10"),
+            unit_price=Decimal("99.5"),
+            valuation_date=valuation_date,
+        )
+        Holding.objects.filter(portfolio=portfolio).update(quantity=Decimal("20"))
+
+        mismatches = HoldingAggregateService.verify(portfolio_ids=[portfolio.id])
+        assert len(mismatches) == 1
+        assert mismatches[0]["expected_value"] == Decimal("1990")
+
+        HoldingAggregateService.rebuild(portfolio_ids=[portfolio.id])
+        assert HoldingAggregateService.verify() == []
+        assert HoldingAggregateService.get_aum(portfolio, valuation_date) == (
+            ValuationService.calculate_portfolio_aum(portfolio, valuation_date)
+        )
+
+@pytest.mark.django_db
+class TestHoldingService:
+    """Test cases for HoldingService."""
+
+    def test_roll_forward(self):
+        """Test holdings are copied with new prices, aggregates and snapshots, and only once."""
+        portfolio = PortfolioFactory()
+        other = PortfolioFactory()
+        source, target = date(2024, 1, 31), date(2024, 2, 29)
+        HoldingFactory(
+            portfolio=portfolio, asset_name="Apple", asset_type="STOCK",
+            quantity=Decimal("10"), unit_price=Decimal("150"), valuation_date=source,
+        )
+        HoldingFactory(
+            portfolio=portfolio, asset_name="Cash", asset_type="CASH",
+            quantity=Decimal("500"), unit_price=Decimal("1"), valuation_date=source,
+        )
+        HoldingFactory(portfolio=other, valuation_date=source)
+        HoldingFactory(portfolio=other, valuation_date=target)
+
+        result = HoldingService.roll_forward(
+            source, target, prices={"Apple": Decimal("160.5")}, create_snapshots=True
+        )
+
+        assert result["portfolios"] == 1
+        assert result["holdings"] == 2
+        assert result["skipped_portfolios"] == [other.pk]
+        rolled = Holding.objects.filter(portfolio=portfolio, valuation_date=target)
+        assert sorted(rolled.values_list("asset_name", "unit_price")) == [
+            ("Apple", Decimal("160.5000")),
+            ("Cash", Decimal("1.0000")),
+        ]
+        assert all(holding.created_at and holding.updated_at for holding in rolled)
+        assert HoldingAggregateService.verify([portfolio.pk], [target]) == []
+        snapshot = ValuationSnapshot.objects.get(portfolio=portfolio, snapshot_date=target)
+        assert snapshot.total_aum == Decimal("2105.00")
+        assert not ValuationSnapshot.objects.filter(portfolio=other).exists()
+
+        assert HoldingService.roll_forward(source, target, portfolio_ids=[portfolio.pk])["holdings"] == 0
+
+
+@pytest.mark.django_db
+class TestRevaluationService:
+    """Test cases for security prices and revaluation."""
+
+    def test_upload_prices_revalues_affected_snapshots(self):
+        """Test a price upload reprices only the holdings and snapshots of its security and date."""
+        portfolio = PortfolioFactory()
+        day, next_day = date(2024, 1, 31), date(2024, 2, 1)
+        apple = HoldingFactory(
+            portfolio=portfolio, asset_name="Apple", asset_type="STOCK",
+            quantity=Decimal("10"), unit_price=Decimal("150"), valuation_date=day,
+        )
+        HoldingFactory(
+            portfolio=portfolio, asset_name="Apple", asset_type="STOCK",
+            quantity=Decimal("10"), unit_price=Decimal("150"), valuation_date=next_day,
+        )
+        snapshot = ValuationService.create_valuation_snapshot(portfolio, day)
+        other_snapshot = ValuationService.create_valuation_snapshot(portfolio, next_day)
+
+        result = RevaluationService.upload_prices(
+            [{"asset_name": "Apple", "asset_type": "STOCK", "price_date": day, "unit_price": Decimal("160")}]
+        )
+
+        # Saving the holdings already added Apple to the security master.
+        assert result["securities_created"] == 0
+        assert result["dates"] == [day]
+        assert result["snapshots"] == 1
+        snapshot.refresh_from_db()
+        other_snapshot.refresh_from_db()
+        assert snapshot.total_aum == Decimal("1600.00")
+        assert snapshot.aum_breakdown["STOCK"] == "1600.00"
+        assert other_snapshot.total_aum == Decimal("1500.00")
+        apple = Holding.objects.get(pk=apple.pk)
+        assert apple.unit_price == Decimal("150.0000")
+        assert apple.security == Security.objects.get(asset_name="Apple", asset_type="STOCK")
+        assert apple.total_value == Decimal("1600")
+        assert ValuationService.calculate_portfolio_aum(portfolio, day) == Decimal("1600.00")
+
+        apple.quantity = Decimal("20")
+        apple.save()
+        assert HoldingAggregateService.get_aum(portfolio, day) == Decimal("3200.00")
+        assert HoldingAggregateService.verify([portfolio.pk]) == []
+
+        SecurityPrice.objects.get().delete()
+        assert HoldingAggregateService.get_aum(portfolio, day) == Decimal("3000.00")
+        assert HoldingAggregateService.verify([portfolio.pk]) == []
+
 
 @pytest.mark.django_db
 class TestPortfolioService:
@@ -185,3 +571,89 @@ class TestPortfolioService:
         assert stats["total_snapshots"] == 1
         assert stats["latest_aum"] == total_aum
 
+
+    def test_get_portfolio_statistics_cached(self, django_assert_num_queries):
+        """Test statistics are served from cache until a write invalidates them."""
+        from portfolio.cache import statistics_cache_counters
+
+        portfolio = PortfolioFactory()
+        HoldingFactory(portfolio=portfolio, valuation_date=date.today())
+        first = PortfolioService.get_portfolio_statistics(portfolio)
+        with django_assert_num_queries(0):
+            assert PortfolioService.get_portfolio_statistics(portfolio) == first
+
+        holding = HoldingFactory(portfolio=portfolio, valuation_date=date.today())
+        assert PortfolioService.get_portfolio_statistics(portfolio)["total_holdings"] == 2
+
+        snapshot = ValuationSnapshotFactory(portfolio=portfolio, total_aum=Decimal("10.00"))
+        assert PortfolioService.get_portfolio_statistics(portfolio)["total_snapshots"] == 1
+
+        other = PortfolioFactory()
+        PortfolioService.get_portfolio_statistics(other)
+        snapshot = ValuationSnapshot.objects.get(pk=snapshot.pk)
+        snapshot.portfolio = other
+        snapshot.save()
+        holding.delete()
+        assert PortfolioService.get_portfolio_statistics(portfolio)["total_snapshots"] == 0
+        assert PortfolioService.get_portfolio_statistics(portfolio)["total_holdings"] == 1
+        assert PortfolioService.get_portfolio_statistics(other)["total_snapshots"] == 1
+
+        counters = statistics_cache_counters()
+        assert counters["hits"] >= 2
+        assert counters["misses"] >= 5
+        assert counters["invalidations"] >= 5
+
+
+    def test_get_portfolio_statistics_bulk(self, django_assert_num_queries):
+        """Test batch statistics match the per-portfolio statistics in one query."""
+        portfolios = [PortfolioFactory() for _ in range(3)]
+        HoldingFactory.create_batch(2, portfolio=portfolios[0], valuation_date=date.today())
+        HoldingFactory(portfolio=portfolios[1], valuation_date=date.today())
+        ValuationSnapshotFactory(
+            portfolio=portfolios[0], snapshot_date=date.today() - timedelta(days=1), total_aum=Decimal("5.00")
+        )
+        ValuationSnapshotFactory(portfolio=portfolios[0], snapshot_date=date.today(), total_aum=Decimal("7.50"))
+
+        with django_assert_num_queries(1):
+            stats = PortfolioService.get_portfolio_statistics_bulk(
+                Portfolio.objects.filter(pk__in=[portfolio.pk for portfolio in portfolios]).order_by("pk")
+            )
+
+        assert [row.pop("portfolio") for row in stats] == [portfolio.pk for portfolio in portfolios]
+        assert stats == [PortfolioService.compute_portfolio_statistics(portfolio) for portfolio in portfolios]
+
+
+@pytest.mark.django_db
+class TestHoldingPartitions:
+    """Test cases for the holdings table partitions."""
+
+    def test_create_partition_moves_rows_and_prunes(self):
+        """Test a new partition takes its rows from the default partition and date filters scan only it."""
+        holding = HoldingFactory(valuation_date=date(2021, 3, 15))
+        HoldingFactory(portfolio=holding.portfolio, valuation_date=date(2021, 4, 2))
+
+        partition = create_partition(connection, date(2021, 3, 1), "month")
+
+        assert partition.name == "portfolio_holding_p2021_03"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {partition.name}")
+            assert [row[0] for row in cursor.fetchall()] == [holding.pk]
+        assert Holding.objects.count() == 2
+        assert create_partition(connection, date(2021, 1, 1), "year") is None
+
+        plan = Holding.objects.filter(portfolio=holding.portfolio, valuation_date=date(2021, 3, 15)).explain()
+        assert partition.name in plan
+        assert DEFAULT_PARTITION not in plan
+
+    def test_retire_partitions_removes_aggregates(self):
+        """Test retiring a partition removes its holdings and their aggregates."""
+        create_partition(connection, date(2021, 3, 1), "month")
+        old = HoldingFactory(valuation_date=date(2021, 3, 15))
+        kept = HoldingFactory(portfolio=old.portfolio, valuation_date=date(2021, 4, 2))
+
+        retired = retire_partitions(connection, date(2021, 4, 1), drop=True)
+
+        assert [partition.name for partition in retired] == ["portfolio_holding_p2021_03"]
+        assert list(Holding.objects.values_list("pk", flat=True)) == [kept.pk]
+        assert not HoldingAggregate.objects.filter(valuation_date=old.valuation_date).exists()
+        assert HoldingAggregate.objects.filter(valuation_date=kept.valuation_date).exists()
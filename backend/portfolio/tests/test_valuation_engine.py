@@ -0,0 +1,99 @@
+"""
+Tests for the columnar holdings valuation engine.
+"""
+import pytest
+from decimal import Decimal
+from datetime import date, timedelta
+
+from portfolio.models import Holding
+from portfolio.services import RevaluationService, ValuationService
+from portfolio.valuation_engine import HoldingValuationEngine
+from portfolio.tests.factories import PortfolioFactory, HoldingFactory
+
+
+@pytest.mark.django_db
+class TestHoldingValuationEngine:
+    """Test cases for HoldingValuationEngine."""
+
+    def test_totals_match_calculate_portfolio_aum(self):
+        """Test per-portfolio/date totals match the SQL AUM to the cent."""
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        portfolios = [PortfolioFactory() for _ in range(3)]
+        for portfolio in portfolios:
+            for valuation_date in (today, yesterday):
+                HoldingFactory.create_batch(4, portfolio=portfolio, valuation_date=valuation_date)
+        HoldingFactory(
+            portfolio=portfolios[0],
+            quantity=Decimal("0.33333333"),
+            unit_price=Decimal("3.0015"),
+            valuation_date=today,
+        )
+
+        totals = HoldingValuationEngine(chunk_size=5).totals(["portfolio_id", "valuation_date"])
+
+        assert len(totals) == 6
+        for portfolio in portfolios:
+            for valuation_date in (today, yesterday):
+                assert totals[(portfolio.id, valuation_date)] == ValuationService.calculate_portfolio_aum(
+                    portfolio, valuation_date
+                )
+
+    def test_totals_by_asset_type(self):
+        """Test grouping by a single field returns plain keys."""
+        valuation_date = date.today()
+        HoldingFactory(
+            asset_type="STOCK", quantity=Decimal("100"), unit_price=Decimal("150.50"), valuation_date=valuation_date
+        )
+        HoldingFactory(
+            asset_type="STOCK", quantity=Decimal("1"), unit_price=Decimal("0.005"), valuation_date=valuation_date
+        )
+        HoldingFactory(
+            asset_type="CASH", quantity=Decimal("2500"), unit_price=Decimal("1"), valuation_date=valuation_date
+        )
+        engine = HoldingValuationEngine(Holding.objects.filter(valuation_date=valuation_date))
+        assert engine.totals_by_asset_type() == {
+            "STOCK": Decimal("15050.00"),
+            "CASH": Decimal("2500.00"),
+        }
+        assert engine.totals_by_date() == {valuation_date: Decimal("17550.00")}
+
+    def test_values_beyond_int64(self):
+        """Test quantities too large for int64 fixed point stay exact."""
+        portfolio = PortfolioFactory()
+        valuation_date = date.today()
+        HoldingFactory(
+            portfolio=portfolio,
+            asset_type="BOND",
+            quantity=Decimal("99999999999.12345678"),
+            unit_price=Decimal("1234.5678"),
+            valuation_date=valuation_date,
+        )
+        HoldingFactory(
+            portfolio=portfolio,
+            asset_type="BOND",
+            quantity=Decimal("3.5"),
+            unit_price=Decimal("0.0001"),
+            valuation_date=valuation_date,
+        )
+        totals = HoldingValuationEngine().totals_by_portfolio()
+        assert totals[portfolio.id] == ValuationService.calculate_portfolio_aum(portfolio, valuation_date)
+        grouped = HoldingValuationEngine().totals(["portfolio_id", "valuation_date", "asset_type"])
+        assert grouped == {(portfolio.id, valuation_date, "BOND"): totals[portfolio.id]}
+
+    def test_totals_use_security_prices(self):
+        """Test a stored security price overrides the holding's own price."""
+        valuation_date = date.today()
+        holding = HoldingFactory(
+            asset_name="Apple", asset_type="STOCK", quantity=Decimal("10"), unit_price=Decimal("150"),
+            valuation_date=valuation_date,
+        )
+        RevaluationService.upload_prices(
+            [{"asset_name": "Apple", "asset_type": "STOCK", "price_date": valuation_date, "unit_price": Decimal("160")}]
+        )
+        assert HoldingValuationEngine().totals_by_portfolio() == {holding.portfolio_id: Decimal("1600.00")}
+
+    def test_invalid_group_by(self):
+        """Test unknown grouping fields are rejected."""
+        with pytest.raises(ValueError):
+            HoldingValuationEngine().totals(["asset_name"])
@@ -8,6 +8,7 @@ from datetime import date, timedelta
 from django.urls import reverse
 
 from portfolio.models import Portfolio, Holding, ValuationSnapshot
+from portfolio.services import HoldingAggregateService, RevaluationService, ValuationService
 from portfolio.tests.factories import (
     PortfolioFactory,
     HoldingFactory,
@@ -67,6 +68,57 @@ class TestPortfolioGenericAPIView:
         assert response.data["current_page"] == 1
         assert response.data["last_page"] == 3
 
+    def test_cursor_pagination(self, api_client):
+        """Test walking portfolios forwards and backwards with cursors."""
+        for _ in range(5):
+            PortfolioFactory()
+        url = reverse("portfolio-list")
+        expected = list(Portfolio.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+        first = api_client.get(url, {"pagination": "cursor", "rows": 2, "count": "exact"})
+        assert first.status_code == 200
+        assert [p["id"] for p in first.data["portfolios"]] == expected[:2]
+        assert first.data["total"] == 5
+        assert first.data["prev_cursor"] is None
+
+        second = api_client.get(url, {"cursor": first.data["next_cursor"], "rows": 2})
+        assert [p["id"] for p in second.data["portfolios"]] == expected[2:4]
+        assert second.data["total"] is None
+
+        last = api_client.get(url, {"cursor": second.data["next_cursor"], "rows": 2})
+        assert [p["id"] for p in last.data["portfolios"]] == expected[4:]
+        assert last.data["next_cursor"] is None
+
+        back = api_client.get(url, {"cursor": last.data["prev_cursor"], "rows": 2})
+        assert [p["id"] for p in back.data["portfolios"]] == expected[2:4]
+
+    def test_cursor_pagination_invalid_cursor(self, api_client):
+        """Test an undecodable cursor is rejected."""
+        url = reverse("portfolio-list")
+        response = api_client.get(url, {"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+
+    def test_list_portfolios_fulltext_search(self, api_client):
+        """Test ranked prefix search over name, client name and email."""
+        best = PortfolioFactory(name="Growth Growth Fund", client_name="Ann Lee", client_email="ann@acme.io")
+        other = PortfolioFactory(name="Income Fund", client_name="Growthy Partners", client_email="ops@firm.io")
+        PortfolioFactory(name="Bond Ladder", client_name="Ken Ito", client_email="ken@bonds.io")
+        url = reverse("portfolio-list")
+
+        response = api_client.get(url, {"search": "grow", "search_mode": "fulltext"})
+        assert response.status_code == 200
+        assert [row["id"] for row in response.data["portfolios"]] == [best.id, other.id]
+        assert response.data["total"] == 2
+
+        response = api_client.get(url, {"search": "acme", "search_mode": "fulltext"})
+        assert [row["id"] for row in response.data["portfolios"]] == [best.id]
+
+        response = api_client.get(url, {"search": "grow ops", "search_mode": "fulltext"})
+        assert [row["id"] for row in response.data["portfolios"]] == [other.id]
+
+        response = api_client.get(url, {"search": "grow", "search_mode": "fuzzy"})
+        assert response.status_code == 400
 
 @pytest.mark.django_db
 class TestPortfolioDetailGenericAPIView:
@@ -81,6 +133,55 @@ class TestPortfolioDetailGenericAPIView:
         assert response.data["message"] == "Portfolio fetched successfully"
         assert response.data["portfolio"]["name"] == portfolio.name
 
+    def test_retrieve_portfolio_bounded_related_rows(self, api_client, django_assert_num_queries):
+        """Test detail filters and limits related rows with constant queries."""
+        portfolio = PortfolioFactory()
+        today = date.today()
+        HoldingFactory.create_batch(5, portfolio=portfolio, valuation_date=today)
+        HoldingFactory.create_batch(3, portfolio=portfolio, valuation_date=today - timedelta(days=30))
+        for days in range(4):
+            ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=today - timedelta(days=days))
+        url = reverse("portfolio-detail")
+        # Validator query, portfolio, holdings, snapshots.
+        with django_assert_num_queries(4):
+            response = api_client.get(
+                url,
+                {"id": portfolio.id, "holdings_date": str(today), "holdings_limit": 4, "snapshots_limit": 2},
+            )
+        assert response.status_code == 200
+        holdings = response.data["portfolio"]["holdings"]
+        assert len(holdings) == 4
+        assert all(h["valuation_date"] == str(today) for h in holdings)
+        assert all(h["portfolio_name"] == portfolio.name for h in holdings)
+        assert len(response.data["portfolio"]["valuation_snapshots"]) == 2
+
+    def test_retrieve_portfolio_include(self, api_client):
+        """Test include selects which related collections are returned."""
+        portfolio = PortfolioFactory()
+        url = reverse("portfolio-detail")
+        response = api_client.get(url, {"id": portfolio.id, "include": "valuation_snapshots"})
+        assert response.status_code == 200
+        assert "holdings" not in response.data["portfolio"]
+        assert "valuation_snapshots" in response.data["portfolio"]
+
+        response = api_client.get(url, {"id": portfolio.id, "include": "transactions"})
+        assert response.status_code == 400
+
+    def test_retrieve_portfolio_inverted_holdings_range(self, api_client):
+        """Test detail rejects a holdings date range that ends before it starts."""
+        portfolio = PortfolioFactory()
+        today = date.today()
+        url = reverse("portfolio-detail")
+        response = api_client.get(
+            url,
+            {
+                "id": portfolio.id,
+                "holdings_date_from": str(today),
+                "holdings_date_to": str(today - timedelta(days=1)),
+            },
+        )
+        assert response.status_code == 400
+
     def test_update_portfolio(self, api_client):
         """Test updating a portfolio."""
         portfolio = PortfolioFactory()
@@ -115,6 +216,33 @@ class TestPortfolioDetailGenericAPIView:
         assert response.data["message"] == "Portfolio statistics fetched successfully"
         assert "statistics" in response.data
 
+    def test_portfolio_statistics_batch(self, api_client):
+        """Test batch statistics by ids and by search."""
+        first = PortfolioFactory(name="Alpha Fund")
+        second = PortfolioFactory(name="Beta Fund")
+        HoldingFactory(portfolio=second, valuation_date=date.today())
+        url = reverse("portfolio-statistics-batch")
+
+        response = api_client.get(url, {"ids": f"{second.id},{first.id}"})
+        assert response.status_code == 200
+        assert [row["portfolio"] for row in response.data["statistics"]] == [second.id, first.id]
+        assert response.data["statistics"][0]["total_holdings"] == 1
+
+        response = api_client.get(url, {"search": "alpha"})
+        assert [row["portfolio"] for row in response.data["statistics"]] == [first.id]
+
+        response = api_client.get(url, {"ids": "1,x"})
+        assert response.status_code == 400
+
+    def test_portfolio_statistics_cache_counters(self, api_client):
+        """Test the statistics cache counters endpoint."""
+        portfolio = PortfolioFactory()
+        api_client.get(reverse("portfolio-statistics"), {"id": portfolio.id})
+        api_client.get(reverse("portfolio-statistics"), {"id": portfolio.id})
+        response = api_client.get(reverse("portfolio-statistics-cache"))
+        assert response.status_code == 200
+        assert response.data["counters"] == {"hits": 1, "misses": 1, "invalidations": 0}
+
 
 @pytest.mark.django_db
 class TestHoldingGenericAPIView:
@@ -154,6 +282,29 @@ class TestHoldingGenericAPIView:
         assert len(response.data["holdings"]) == 1
         assert response.data["holdings"][0]["asset_name"] == holding1.asset_name
 
+    def test_list_holdings_cursor_pagination(self, api_client):
+        """Test holdings cursor pagination keeps the date/name ordering."""
+        portfolio = PortfolioFactory()
+        today = date.today()
+        for name in ["B", "A", "A"]:
+            HoldingFactory(portfolio=portfolio, asset_name=name, valuation_date=today)
+        HoldingFactory(portfolio=portfolio, asset_name="C", valuation_date=today - timedelta(days=1))
+        expected = list(
+            Holding.objects.order_by("-valuation_date", "asset_name", "id").values_list("id", flat=True)
+        )
+        url = reverse("holding-list")
+        seen = []
+        params = {"pagination": "cursor", "rows": 1, "portfolio": portfolio.id, "count": "estimate"}
+        while True:
+            response = api_client.get(url, params)
+            assert response.status_code == 200
+            assert response.data["total_mode"] == "estimate"
+            seen.extend(h["id"] for h in response.data["holdings"])
+            if not response.data["next_cursor"]:
+                break
+            params["cursor"] = response.data["next_cursor"]
+        assert seen == expected
+
     def test_update_holding(self, api_client):
         """Test updating a holding."""
         portfolio = PortfolioFactory()
@@ -184,6 +335,217 @@ class TestHoldingGenericAPIView:
         assert response.data["message"] == "Holding deleted successfully"
         assert not Holding.objects.filter(pk=holding.id).exists()
 
+    def test_export_holdings_csv(self, api_client):
+        """Test streaming a CSV export with the list filters."""
+        import csv
+        import io
+
+        portfolio = PortfolioFactory()
+        holding = HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("100"),
+            unit_price=Decimal("150.50"),
+            valuation_date=date.today(),
+        )
+        HoldingFactory(portfolio=portfolio, valuation_date=date.today() - timedelta(days=10))
+        HoldingFactory(valuation_date=date.today())
+        url = reverse("holding-export")
+        response = api_client.get(
+            url, {"portfolio": portfolio.id, "date_from": str(date.today() - timedelta(days=1))}
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert len(rows) == 1
+        listed = api_client.get(reverse("holding-list"), {"portfolio": portfolio.id}).data["holdings"]
+        expected = next(h for h in listed if h["id"] == holding.id)
+        assert rows[0]["total_value"] == expected["total_value"] == "15050.00"
+        assert rows[0]["quantity"] == expected["quantity"]
+        assert rows[0]["created_at"] == expected["created_at"]
+        assert rows[0]["portfolio_name"] == portfolio.name
+
+    def test_holding_values_use_security_price(self, api_client):
+        """Test listed and exported holding values add up to the AUM at a stored security price."""
+        import csv
+        import io
+
+        portfolio = PortfolioFactory()
+        holding = HoldingFactory(
+            portfolio=portfolio,
+            asset_name="Apple",
+            asset_type="STOCK",
+            quantity=Decimal("100"),
+            unit_price=Decimal("150.50"),
+            valuation_date=date.today(),
+        )
+        RevaluationService.upload_prices(
+            [{"asset_name": "Apple", "asset_type": "STOCK", "price_date": date.today(), "unit_price": Decimal("160")}]
+        )
+
+        listed = api_client.get(reverse("holding-list"), {"portfolio": portfolio.id}).data["holdings"]
+        response = api_client.get(reverse("holding-export"), {"portfolio": portfolio.id})
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        detail = api_client.get(reverse("portfolio-detail"), {"id": portfolio.id}).data["portfolio"]
+        assert listed[0]["unit_price"] == rows[0]["unit_price"] == "150.5000"
+        assert listed[0]["total_value"] == rows[0]["total_value"] == detail["holdings"][0]["total_value"] == "16000.00"
+        assert Holding.objects.get(pk=holding.pk).total_value == Decimal("16000")
+        assert ValuationService.calculate_portfolio_aum(portfolio, date.today()) == Decimal("16000.00")
+
+    def test_update_and_delete_holding_maintain_aggregate(self, api_client):
+        """Test the PUT and DELETE paths keep the holding aggregate in step."""
+        portfolio = PortfolioFactory()
+        holding = HoldingFactory(
+            portfolio=portfolio,
+            quantity=Decimal("100"),
+            unit_price=Decimal("150.50"),
+            valuation_date=date.today(),
+        )
+        url = reverse("holding-list")
+        response = api_client.put(url, {"id": holding.id, "quantity": "200"}, format="json")
+        assert response.status_code == 200
+        assert HoldingAggregateService.get_aum(portfolio, date.today()) == Decimal("30100.00")
+
+        api_client.delete(f"{url}?id={holding.id}")
+        assert HoldingAggregateService.get_aum(portfolio, date.today()) == Decimal("0.00")
+
+
+@pytest.mark.django_db
+class TestHoldingBulkGenericAPIView:
+    """Test cases for HoldingBulkGenericAPIView."""
+
+    def holding_row(self, portfolio_id, **overrides):
+        row = {
+            "portfolio": portfolio_id,
+            "asset_name": "Test Asset",
+            "asset_type": "STOCK",
+            "quantity": "100",
+            "unit_price": "150.50",
+            "valuation_date": str(date.today()),
+        }
+        row.update(overrides)
+        return row
+
+    def test_bulk_create_json(self, api_client, django_assert_max_num_queries):
+        """Test a JSON array is inserted with a bounded number of queries."""
+        portfolio = PortfolioFactory()
+        rows = [self.holding_row(portfolio.id, asset_name=f"Asset {i}") for i in range(50)]
+        url = reverse("holding-bulk")
+        # Three of them look up and add the rows' securities.
+        with django_assert_max_num_queries(12):
+            response = api_client.post(url, rows, format="json")
+        assert response.status_code == 201
+        assert response.data["created"] == 50
+        assert Holding.objects.filter(portfolio=portfolio, security__asset_name="Asset 7").count() == 1
+        assert Holding.objects.filter(portfolio=portfolio).count() == 50
+        assert HoldingAggregateService.get_aum(portfolio, date.today()) == Decimal("752500.00")
+
+    def test_bulk_create_atomic_rejects_all(self, api_client):
+        """Test atomic mode inserts nothing when a row is invalid."""
+        portfolio = PortfolioFactory()
+        rows = [
+            self.holding_row(portfolio.id),
+            self.holding_row(portfolio.id, quantity="0"),
+            self.holding_row(portfolio.id + 1000),
+        ]
+        url = reverse("holding-bulk")
+        response = api_client.post(url, rows, format="json")
+        assert response.status_code == 400
+        assert [error["row"] for error in response.data["errors"]] == [2, 3]
+        assert "Quantity must be greater than zero." in str(response.data["errors"][0]["errors"]["quantity"])
+        assert "portfolio" in response.data["errors"][1]["errors"]
+        assert not Holding.objects.exists()
+
+    def test_bulk_create_best_effort(self, api_client):
+        """Test best-effort mode inserts the valid rows."""
+        portfolio = PortfolioFactory()
+        rows = [self.holding_row(portfolio.id), self.holding_row(portfolio.id, unit_price="-1")]
+        url = reverse("holding-bulk")
+        response = api_client.post(f"{url}?mode=best_effort", rows, format="json")
+        assert response.status_code == 201
+        assert response.data["created"] == 1
+        assert response.data["failed"] == 1
+        assert Holding.objects.count() == 1
+
+    def test_bulk_create_csv(self, api_client):
+        """Test a CSV upload is imported."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        portfolio = PortfolioFactory()
+        content = (
+            "portfolio,asset_name,asset_type,quantity,unit_price,valuation_date\n"
+            f"{portfolio.id},Bond A,BOND,10,99.5,{date.today()}\n"
+            f"{portfolio.id},Cash,CASH,2500,1,{date.today()}\n"
+        )
+        upload = SimpleUploadedFile("positions.csv", content.encode(), content_type="text/csv")
+        url = reverse("holding-bulk")
+        response = api_client.post(url, {"file": upload}, format="multipart")
+        assert response.status_code == 201
+        assert response.data["created"] == 2
+
+
+@pytest.mark.django_db
+class TestHoldingRollForwardGenericAPIView:
+    """Test cases for HoldingRollForwardGenericAPIView."""
+
+    def test_roll_forward(self, api_client, django_assert_max_num_queries):
+        """Test a portfolio's holdings are copied with a bounded number of queries."""
+        portfolio = PortfolioFactory()
+        for i in range(20):
+            HoldingFactory(portfolio=portfolio, asset_name=f"Asset {i}", valuation_date=date(2024, 1, 31))
+        url = reverse("holding-roll-forward")
+        payload = {
+            "from_date": "2024-01-31",
+            "to_date": "2024-02-01",
+            "portfolio_ids": [portfolio.id],
+            "prices": {"Asset 0": "12.5"},
+        }
+        with django_assert_max_num_queries(10):
+            response = api_client.post(url, payload, format="json")
+        assert response.status_code == 201
+        assert response.data["roll_forward"]["holdings"] == 20
+        assert Holding.objects.get(valuation_date=date(2024, 2, 1), asset_name="Asset 0").unit_price == Decimal("12.5")
+
+    def test_roll_forward_invalid(self, api_client):
+        """Test the same date and non-positive prices are rejected."""
+        url = reverse("holding-roll-forward")
+        payload = {"from_date": "2024-01-31", "to_date": "2024-01-31", "prices": {"Asset": "0"}}
+        response = api_client.post(url, payload, format="json")
+        assert response.status_code == 400
+        assert "prices" in response.data["errors"]
+        assert "non_field_errors" not in response.data["errors"]
+
+
+@pytest.mark.django_db
+class TestSecurityPriceGenericAPIView:
+    """Test cases for SecurityPriceGenericAPIView."""
+
+    def test_upload_prices(self, api_client):
+        """Test an upload stores prices and revalues the snapshot of the priced date."""
+        portfolio = PortfolioFactory()
+        HoldingFactory(
+            portfolio=portfolio, asset_name="Bond A", asset_type="BOND",
+            quantity=Decimal("10"), unit_price=Decimal("99"), valuation_date=date(2024, 1, 31),
+        )
+        snapshot = ValuationService.create_valuation_snapshot(portfolio, date(2024, 1, 31))
+        url = reverse("security-price")
+        rows = [{"asset_name": "Bond A", "asset_type": "BOND", "price_date": "2024-01-31", "unit_price": "101.25"}]
+        response = api_client.post(url, rows, format="json")
+        assert response.status_code == 201
+        assert response.data["revaluation"]["snapshots"] == 1
+        snapshot.refresh_from_db()
+        assert snapshot.total_aum == Decimal("1012.50")
+
+    def test_upload_prices_invalid(self, api_client):
+        """Test an upload with an invalid row stores nothing."""
+        url = reverse("security-price")
+        rows = [
+            {"asset_name": "Bond A", "asset_type": "BOND", "price_date": "2024-01-31", "unit_price": "101"},
+            {"asset_name": "Bond B", "asset_type": "BOND", "price_date": "2024-01-31", "unit_price": "0"},
+        ]
+        response = api_client.post(url, rows, format="json")
+        assert response.status_code == 400
+        assert [error["row"] for error in response.data["errors"]] == [2]
+
 
 @pytest.mark.django_db
 class TestValuationSnapshotGenericAPIView:
@@ -211,6 +573,32 @@ class TestValuationSnapshotGenericAPIView:
         assert response.status_code == 201
         assert response.data["message"] == "Valuation snapshot created successfully"
         assert Decimal(response.data["valuation"]["total_aum"]) == quantity * unit_price
+        assert "aum_breakdown" not in response.data["valuation"]
+
+    def test_allocation(self, api_client):
+        """Test allocations by snapshot ids and by portfolio."""
+        portfolio = PortfolioFactory()
+        valuation_date = date.today()
+        HoldingFactory(
+            portfolio=portfolio, asset_type="ETF", quantity=Decimal("4"), unit_price=Decimal("25"),
+            valuation_date=valuation_date,
+        )
+        snapshot = ValuationService.create_valuation_snapshot(portfolio=portfolio, snapshot_date=valuation_date)
+        legacy = ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=valuation_date - timedelta(days=1))
+        url = reverse("valuation-allocation")
+
+        response = api_client.get(url, {"ids": f"{legacy.id},{snapshot.id}"})
+        assert response.status_code == 200
+        allocations = response.data["allocations"]
+        assert [row["snapshot"] for row in allocations] == [legacy.id, snapshot.id]
+        assert allocations[0]["allocation"] is None
+        assert {"asset_type": "ETF", "value": "100.00", "weight": "1.0000"} in allocations[1]["allocation"]
+
+        response = api_client.get(url, {"portfolio": portfolio.id, "date_from": str(valuation_date)})
+        assert [row["snapshot"] for row in response.data["allocations"]] == [snapshot.id]
+
+        assert api_client.get(url).status_code == 400
+        assert api_client.get(url, {"ids": "1", "portfolio": portfolio.id}).status_code == 400
 
     def test_list_valuations_filtered_by_status(self, api_client):
         """Test listing valuations filtered by status."""
@@ -234,6 +622,45 @@ class TestValuationSnapshotGenericAPIView:
         assert len(response.data["valuations"]) == 1
         assert response.data["valuations"][0]["status"] == "DRAFT"
 
+    def test_list_valuations_cursor_invalid_count(self, api_client):
+        """Test an unknown count mode is rejected."""
+        url = reverse("valuation-list")
+        response = api_client.get(url, {"pagination": "cursor", "count": "approximate"})
+        assert response.status_code == 400
+
+    def test_export_valuations_ndjson(self, api_client):
+        """Test streaming an NDJSON export of valuation snapshots."""
+        import json
+
+        portfolio = PortfolioFactory()
+        ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date.today(), status="DRAFT", notes=None)
+        ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date.today() - timedelta(days=1), status="CONFIRMED")
+        url = reverse("valuation-export")
+        response = api_client.get(url, {"status": "DRAFT", "export_format": "ndjson"})
+        assert response.status_code == 200
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 1
+        row = json.loads(lines[0])
+        assert row["status"] == "DRAFT"
+        assert row["notes"] is None
+        assert row["portfolio_name"] == portfolio.name
+
+        response = api_client.get(url, {"export_format": "xlsx"})
+        assert response.status_code == 400
+
+    def test_valuation_history(self, api_client):
+        """Test the downsampled valuation history endpoint."""
+        portfolio = PortfolioFactory()
+        ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date(2024, 1, 2), total_aum=Decimal("10.00"))
+        ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date(2024, 1, 3), total_aum=Decimal("20.00"))
+        url = reverse("valuation-history")
+        response = api_client.get(url, {"portfolio": portfolio.id, "interval": "week", "method": "average"})
+        assert response.status_code == 200
+        assert response.data["series"] == [{"date": "2024-01-01", "total_aum": "15.00"}]
+
+        response = api_client.get(url, {"portfolio": portfolio.id, "interval": "decade"})
+        assert response.status_code == 400
+
     def test_recalculate_snapshot(self, api_client):
         """Test recalculating snapshot AUM."""
         portfolio = PortfolioFactory()
@@ -272,6 +699,49 @@ class TestValuationSnapshotGenericAPIView:
         assert response.data["message"] == "Valuation status updated successfully"
         assert response.data["valuation"]["status"] == "CONFIRMED"
 
+    def test_bulk_update_status(self, api_client):
+        """Test archiving by filter and rejecting illegal moves by ids."""
+        portfolio = PortfolioFactory()
+        confirmed = ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date(2024, 1, 31), status="CONFIRMED")
+        draft = ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date(2024, 2, 29), status="DRAFT")
+        url = reverse("valuation-update-status-bulk")
+
+        payload = {"status": "ARCHIVED", "filter": {"portfolio": portfolio.id, "date_to": "2024-02-29"}}
+        response = api_client.post(url, payload, format="json")
+        assert response.status_code == 200
+        assert response.data["result"]["updated"] == 1
+        assert response.data["result"]["rejected"] == 1
+
+        response = api_client.post(url, {"status": "DRAFT", "ids": [confirmed.id, draft.id]}, format="json")
+        assert response.data["result"]["updated"] == 0
+        assert response.data["result"]["unchanged"] == 1
+        assert response.data["result"]["rejected"] == 1
+        confirmed.refresh_from_db()
+        assert confirmed.status == "ARCHIVED"
+
+        response = api_client.post(url, {"status": "ARCHIVED", "filter": {}}, format="json")
+        assert response.status_code == 400
+
+    def test_illegal_status_transition_rejected(self, api_client):
+        """Test PUT and POST on an existing snapshot cannot move it back to DRAFT."""
+        portfolio = PortfolioFactory()
+        snapshot = ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date.today(), status="ARCHIVED")
+        url = reverse("valuation-list")
+
+        response = api_client.put(url, {"id": snapshot.id, "status": "DRAFT"}, format="json")
+        assert response.status_code == 400
+        assert "status" in response.data["errors"]
+
+        payload = {"portfolio": portfolio.id, "snapshot_date": str(date.today()), "status": "DRAFT"}
+        response = api_client.post(url, payload, format="json")
+        assert response.status_code == 400
+        snapshot.refresh_from_db()
+        assert snapshot.status == "ARCHIVED"
+
+        response = api_client.put(url, {"id": snapshot.id, "notes": "kept"}, format="json")
+        assert response.status_code == 200
+        assert response.data["valuation"]["status"] == "ARCHIVED"
+
     def test_update_valuation(self, api_client):
         """Test updating a valuation snapshot."""
         portfolio = PortfolioFactory()
@@ -307,3 +777,288 @@ class TestValuationSnapshotGenericAPIView:
         assert response.status_code == 200
         assert response.data["message"] == "Valuation snapshot deleted successfully"
         assert not ValuationSnapshot.objects.filter(pk=snapshot.id).exists()
+
+
+    def test_recalculation_job_submit_and_poll(self, api_client):
+        """Test submitting a recalculation job and polling its progress."""
+        portfolio = PortfolioFactory()
+        ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date(2024, 1, 15))
+        url = reverse("valuation-recalculate-job")
+        response = api_client.post(
+            url,
+            {"portfolio_ids": [portfolio.id], "date_from": "2024-01-01", "date_to": "2024-01-31"},
+            format="json",
+        )
+        assert response.status_code == 202
+        job = response.data["job"]
+        assert job["status"] == "PENDING"
+        assert job["progress"] == {"processed": 0, "total": 1, "percent": 0.0}
+
+        response = api_client.get(url, {"id": job["id"]})
+        assert response.status_code == 200
+        assert response.data["job"]["id"] == job["id"]
+
+        response = api_client.post(
+            url, {"portfolio_ids": [0], "date_from": "2024-02-01", "date_to": "2024-01-01"}, format="json"
+        )
+        assert response.status_code == 400
+        assert set(response.data["errors"]) == {"portfolio_ids"}
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReadViews:
+    """Test the async read endpoints answer exactly like the sync ones."""
+
+    def test_async_views_match_sync_views(self, api_client):
+        """Test every async endpoint returns the sync body."""
+        portfolio = PortfolioFactory(name="Alpha Fund")
+        PortfolioFactory(name="Beta Fund")
+        HoldingFactory.create_batch(3, portfolio=portfolio, valuation_date=date.today())
+        ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date.today(), total_aum=Decimal("12.50"))
+
+        cases = [
+            ("portfolio-list", {}),
+            ("portfolio-list", {"search": "alpha", "rows": 1, "page": 5}),
+            ("portfolio-list", {"pagination": "cursor", "rows": 1, "count": "exact"}),
+            ("portfolio-detail", {"id": portfolio.id}),
+            ("portfolio-detail", {"id": portfolio.id, "include": "holdings", "holdings_limit": 2}),
+            ("portfolio-statistics", {"id": portfolio.id}),
+            ("holding-list", {"portfolio": portfolio.id, "rows": 2}),
+            ("valuation-list", {"portfolio": portfolio.id}),
+        ]
+        for name, params in cases:
+            sync_response = api_client.get(reverse(name), params)
+            async_response = api_client.get(reverse(f"async-{name}"), params)
+            assert async_response.status_code == sync_response.status_code == 200
+            assert async_response.json() == sync_response.json(), name
+
+    def test_async_views_errors(self, api_client):
+        """Test the async endpoints reject bad parameters and unknown ids."""
+        assert api_client.get(reverse("async-portfolio-detail"), {"id": 0}).status_code == 404
+        assert api_client.get(reverse("async-portfolio-statistics"), {"id": 0}).status_code == 404
+        response = api_client.get(reverse("async-holding-list"), {"cursor": "bad"})
+        assert response.status_code == 400
+        response = api_client.get(reverse("async-portfolio-detail"), {"id": 1, "holdings_limit": -1})
+        assert response.json()["message"] == "Validation error"
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+    """Test the request metrics middleware and the metrics endpoint."""
+
+    def test_server_timing_and_metrics(self, client):
+        """Test per-request figures are sent back and aggregated per route."""
+        from portfolio.metrics import registry
+
+        registry.reset()
+        portfolio = PortfolioFactory()
+        HoldingFactory.create_batch(2, portfolio=portfolio)
+
+        response = client.get(reverse("portfolio-detail"), {"id": portfolio.id})
+        assert response.status_code == 200
+        timing = dict(part.strip().split(";", 1) for part in response["Server-Timing"].split(","))
+        assert timing["db"].endswith('desc="4 queries"')
+        assert set(timing) == {"db", "ser", "total", "size"}
+        assert timing["size"] == f'desc="{len(response.content)} bytes"'
+
+        metrics = client.get(reverse("metrics"))
+        assert metrics["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = metrics.content.decode()
+        assert 'portfolio_request_db_queries_count{route="portfolio-detail",method="GET"} 1' in body
+        assert 'portfolio_request_db_queries_bucket{route="portfolio-detail",method="GET",le="5"} 1' in body
+        assert 'portfolio_request_db_queries_bucket{route="portfolio-detail",method="GET",le="3"} 0' in body
+        assert 'portfolio_request_duration_seconds_count{route="holding-bulk",method="GET"} 0' in body
+        assert "Server-Timing" not in metrics
+
+
+@pytest.mark.django_db
+class TestFastListRendering:
+    """Test the values-based list rendering and the orjson renderer."""
+
+    def test_list_rows_match_serializers(self):
+        """Test values rows render exactly like the model serializers."""
+        from rest_framework.renderers import JSONRenderer
+
+        from portfolio.renderers import FastJSONRenderer
+        from portfolio.serializers import HoldingSerializer, PortfolioSerializer, ValuationSnapshotSerializer
+        from portfolio.serializers.holding import HOLDING_VALUES
+        from portfolio.serializers.portfolio import PORTFOLIO_VALUES
+        from portfolio.serializers.valuation import VALUATION_SNAPSHOT_VALUES
+
+        portfolio = PortfolioFactory(description=None, name="Line break")
+        HoldingFactory(portfolio=portfolio, quantity=Decimal("3.33333333"), unit_price=Decimal("0.0150"))
+        HoldingFactory(portfolio=portfolio, quantity=Decimal("123456789012.12345678"), unit_price=Decimal("9999.9999"))
+        ValuationSnapshotFactory(portfolio=portfolio, notes=None)
+
+        for serializer_class, values, queryset in (
+            (HoldingSerializer, HOLDING_VALUES, Holding.objects.select_related("portfolio").order_by("id")),
+            (PortfolioSerializer, PORTFOLIO_VALUES, Portfolio.objects.order_by("id")),
+            (
+                ValuationSnapshotSerializer,
+                VALUATION_SNAPSHOT_VALUES,
+                ValuationSnapshot.objects.select_related("portfolio").order_by("id"),
+            ),
+        ):
+            expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+            rows = values.render(values.queryset(queryset))
+            assert FastJSONRenderer().render(rows) == expected
+            assert JSONRenderer().render(rows) == expected
+
+    def test_renderer_falls_back_to_drf_encoder(self):
+        """Test payloads orjson would encode differently go through DRF's encoder."""
+        from rest_framework.renderers import JSONRenderer
+
+        from portfolio.renderers import FastJSONRenderer
+
+        data = {"amount": Decimal("1.50"), "day": date(2024, 1, 31), 1: "key", "text": "a b"}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+        assert FastJSONRenderer().render(data, "application/json; indent=2") == JSONRenderer().render(
+            data, "application/json; indent=2"
+        )
+
+    def test_holding_cursor_pages(self, client):
+        """Test cursor pages built from values rows walk the whole list."""
+        HoldingFactory.create_batch(5)
+        url = reverse("holding-list")
+
+        seen = []
+        params = {"pagination": "cursor", "rows": 2}
+        while True:
+            response = client.get(url, params)
+            assert response.status_code == 200
+            seen.extend(row["id"] for row in response.json()["holdings"])
+            if not response.json()["next_cursor"]:
+                break
+            params = {"cursor": response.json()["next_cursor"], "rows": 2}
+
+        assert sorted(seen) == sorted(Holding.objects.values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    """Test ETag validators and 304 responses of the read endpoints."""
+
+    def test_list_etag(self, client, django_assert_max_num_queries, django_capture_on_commit_callbacks):
+        """Test a matching If-None-Match gets a 304 until a committed write to the listed tables."""
+        portfolio = PortfolioFactory()
+        holdings = HoldingFactory.create_batch(3, portfolio=portfolio)
+        url = reverse("holding-list")
+
+        response = client.get(url, {"portfolio": portfolio.id})
+        assert response.status_code == 200
+        etag = response["ETag"]
+        assert "no-cache" in response["Cache-Control"]
+        assert not response.has_header("Last-Modified")
+
+        with django_assert_max_num_queries(1):
+            response = client.get(url, {"portfolio": portfolio.id}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response["ETag"] == etag
+
+        other = client.get(url, {"portfolio": portfolio.id, "rows": 1}, HTTP_IF_NONE_MATCH=etag)
+        assert other.status_code == 200
+        browsable = client.get(url, {"portfolio": portfolio.id}, HTTP_ACCEPT="text/html", HTTP_IF_NONE_MATCH=etag)
+        assert browsable.status_code == 200
+        assert browsable["ETag"] != etag
+
+        with django_capture_on_commit_callbacks(execute=True):
+            holdings[0].delete()
+        response = client.get(url, {"portfolio": portfolio.id}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        etag = response["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            portfolio.name = "Renamed"
+            portfolio.save()
+        response = client.get(url, {"portfolio": portfolio.id}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["holdings"][0]["portfolio_name"] == "Renamed"
+
+    def test_counters_follow_bulk_writes(self, client, django_capture_on_commit_callbacks):
+        """Test bulk writes that bypass the signals still move the validators, once committed."""
+        from portfolio.models import TableVersion
+
+        portfolio = PortfolioFactory()
+        snapshot = ValuationSnapshotFactory(portfolio=portfolio, snapshot_date=date(2024, 1, 31), status="DRAFT")
+        url = reverse("valuation-list")
+        etag = client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            ValuationService.bulk_update_status(ValuationSnapshot.objects.filter(pk=snapshot.pk), "CONFIRMED")
+        # Not moved before the commit, so no response pairs old rows with a new validator.
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        for callback in callbacks:
+            callback()
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        assert TableVersion.objects.get(table_name=ValuationSnapshot._meta.db_table).version >= 1
+
+    def test_detail_and_statistics(self, client, django_capture_on_commit_callbacks):
+        """Test the detail and statistics validators follow holdings, and 404s carry none."""
+        portfolio = PortfolioFactory()
+        HoldingFactory(portfolio=portfolio)
+
+        for name in ("portfolio-detail", "portfolio-statistics"):
+            url = reverse(name)
+            etag = client.get(url, {"id": portfolio.id})["ETag"]
+            assert client.get(url, {"id": portfolio.id}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+            with django_capture_on_commit_callbacks(execute=True):
+                HoldingFactory(portfolio=portfolio)
+            assert client.get(url, {"id": portfolio.id}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+            missing = client.get(url, {"id": portfolio.id + 1000})
+            assert missing.status_code == 404
+            assert not missing.has_header("ETag")
+
+
+@pytest.mark.django_db
+class TestSchemaViews:
+    """Test the cached OpenAPI schema and documentation pages."""
+
+    def test_schema_generated_once(self, client, settings):
+        """Test the schema is generated on the first request and then served from memory."""
+        from unittest import mock
+
+        from portfolio import openapi
+
+        settings.OPENAPI_SCHEMA_DIR = ""
+        openapi.clear_schema_cache()
+        with mock.patch("portfolio.openapi.generate_schema", wraps=openapi.generate_schema) as generate:
+            first = client.get(reverse("schema-json", kwargs={"format": ".json"}))
+            second = client.get(reverse("schema-json", kwargs={"format": ".json"}))
+
+        assert generate.call_count == 1
+        assert first.status_code == 200
+        assert first["Content-Type"].startswith("application/json")
+        assert first.json()["info"]["title"] == "Portfolio Valuation API"
+        assert "/portfolios/" in first.json()["paths"]
+        assert second.content == first.content
+        response = client.get(reverse("schema-json", kwargs={"format": ".json"}), HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == 304
+        openapi.clear_schema_cache()
+
+    def test_schema_served_from_file(self, client, settings, tmp_path):
+        """Test a pre-generated schema file is served without generating."""
+        from unittest import mock
+
+        from portfolio import openapi
+
+        settings.OPENAPI_SCHEMA_DIR = str(tmp_path)
+        (tmp_path / "swagger.yaml").write_bytes(b"swagger: '2.0'\n")
+        openapi.clear_schema_cache()
+        with mock.patch("portfolio.openapi.generate_schema") as generate:
+            response = client.get(reverse("schema-json", kwargs={"format": ".yaml"}))
+        openapi.clear_schema_cache()
+
+        generate.assert_not_called()
+        assert response.content == b"swagger: '2.0'\n"
+        assert response["Content-Type"].startswith("application/yaml")
+
+    def test_ui_pages_load_cached_schema(self, client):
+        """Test the Swagger UI and ReDoc pages point at the schema endpoint."""
+        for name in ("schema-swagger-ui", "schema-redoc"):
+            response = client.get(reverse(name))
+            assert response.status_code == 200
+            assert "<title>Portfolio Valuation API</title>" in response.content.decode()
+            assert '"url": "/swagger.json"' in response.content.decode()
@@ -8,10 +8,26 @@ from portfolio.views import (
     PortfolioGenericAPIView,
     PortfolioDetailGenericAPIView,
     PortfolioStatisticsGenericAPIView,
+    PortfolioStatisticsBatchGenericAPIView,
+    PortfolioStatisticsCacheGenericAPIView,
     HoldingGenericAPIView,
+    HoldingBulkGenericAPIView,
+    HoldingExportGenericAPIView,
+    HoldingRollForwardGenericAPIView,
     ValuationSnapshotGenericAPIView,
     ValuationRecalculateGenericAPIView,
+    ValuationRecalculateJobGenericAPIView,
     ValuationUpdateStatusGenericAPIView,
+    ValuationBulkStatusGenericAPIView,
+    ValuationExportGenericAPIView,
+    ValuationHistoryGenericAPIView,
+    ValuationAllocationGenericAPIView,
+    SecurityPriceGenericAPIView,
+    PortfolioAsyncView,
+    PortfolioDetailAsyncView,
+    PortfolioStatisticsAsyncView,
+    HoldingAsyncView,
+    ValuationSnapshotAsyncView,
 )
 
 urlpatterns: List = [
@@ -19,10 +35,48 @@ urlpatterns: List = [
     path("portfolios/", PortfolioGenericAPIView.as_view(), name="portfolio-list"),
     path("portfolios/detail/", PortfolioDetailGenericAPIView.as_view(), name="portfolio-detail"),
     path("portfolios/statistics/", PortfolioStatisticsGenericAPIView.as_view(), name="portfolio-statistics"),
+    path(
+        "portfolios/statistics/batch/",
+        PortfolioStatisticsBatchGenericAPIView.as_view(),
+        name="portfolio-statistics-batch",
+    ),
+    path(
+        "portfolios/statistics/cache/",
+        PortfolioStatisticsCacheGenericAPIView.as_view(),
+        name="portfolio-statistics-cache",
+    ),
     # Holding endpoints
     path("holdings/", HoldingGenericAPIView.as_view(), name="holding-list"),
+    path("holdings/bulk/", HoldingBulkGenericAPIView.as_view(), name="holding-bulk"),
+    path("holdings/export/", HoldingExportGenericAPIView.as_view(), name="holding-export"),
+    path("holdings/roll-forward/", HoldingRollForwardGenericAPIView.as_view(), name="holding-roll-forward"),
     # Valuation endpoints
     path("valuations/", ValuationSnapshotGenericAPIView.as_view(), name="valuation-list"),
     path("valuations/recalculate/", ValuationRecalculateGenericAPIView.as_view(), name="valuation-recalculate"),
+    path(
+        "valuations/recalculate/jobs/",
+        ValuationRecalculateJobGenericAPIView.as_view(),
+        name="valuation-recalculate-job",
+    ),
     path("valuations/update-status/", ValuationUpdateStatusGenericAPIView.as_view(), name="valuation-update-status"),
+    path(
+        "valuations/update-status/bulk/",
+        ValuationBulkStatusGenericAPIView.as_view(),
+        name="valuation-update-status-bulk",
+    ),
+    path("valuations/export/", ValuationExportGenericAPIView.as_view(), name="valuation-export"),
+    path("valuations/history/", ValuationHistoryGenericAPIView.as_view(), name="valuation-history"),
+    path("valuations/allocation/", ValuationAllocationGenericAPIView.as_view(), name="valuation-allocation"),
+    # Security endpoints
+    path("securities/prices/", SecurityPriceGenericAPIView.as_view(), name="security-price"),
+    # Async read endpoints
+    path("async/portfolios/", PortfolioAsyncView.as_view(), name="async-portfolio-list"),
+    path("async/portfolios/detail/", PortfolioDetailAsyncView.as_view(), name="async-portfolio-detail"),
+    path(
+        "async/portfolios/statistics/",
+        PortfolioStatisticsAsyncView.as_view(),
+        name="async-portfolio-statistics",
+    ),
+    path("async/holdings/", HoldingAsyncView.as_view(), name="async-holding-list"),
+    path("async/valuations/", ValuationSnapshotAsyncView.as_view(), name="async-valuation-list"),
 ]
@@ -0,0 +1,222 @@
+"""
+Columnar valuation engine for holdings.
+
+The database returns each holding's quantity and effective unit price (a
+stored security price overrides the holding's own) already scaled to
+bigints: quantities carry 8 decimal places and prices 4, so every
+``quantity * unit_price`` is an exact integer in units of 1e-12. The rows
+go from the cursor into NumPy arrays, are grouped with ``np.unique`` on
+the key columns and valued on 21-bit limbs, so the limb products and
+their per-group sums stay inside int64; the limb sums are recombined into
+Python integers per group, which keeps the totals exact for any number of
+rows. The rare holdings whose scaled values do not fit in int64 are summed
+exactly by the database instead.
+
+It suits callers that need the per-row values in NumPy anyway; a plain
+per-group total is cheaper as the SQL aggregate of holding_value_sum,
+which ships one row per group instead of one per holding.
+"""
+from datetime import date, timedelta
+from decimal import Decimal, localcontext
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import connections
+from django.db.models import (
+    BigIntegerField,
+    F,
+    Func,
+    IntegerField,
+    Q,
+    QuerySet,
+    Value,
+)
+from django.db.models.functions import Cast
+
+from portfolio.models import Holding
+from portfolio.services import holding_value_sum, quantize_aum, with_effective_price
+
+QUANTITY_PLACES = 8
+PRICE_PLACES = 4
+VALUE_PLACES = QUANTITY_PLACES + PRICE_PLACES
+
+GROUP_FIELDS = ("portfolio_id", "valuation_date", "asset_type")
+
+LIMB_BITS = 21
+LIMB_MASK = (1 << LIMB_BITS) - 1
+LIMB_COUNT = 3
+INT64_MAX = int(np.iinfo(np.int64).max)
+# Largest quantity and price whose scaled integer fits in int64.
+QUANTITY_BOUND = Decimal(INT64_MAX).scaleb(-QUANTITY_PLACES)
+PRICE_BOUND = Decimal(INT64_MAX).scaleb(-PRICE_PLACES)
+EPOCH = date(1970, 1, 1)
+# NumPy dtype of each key column as selected by _chunks.
+KEY_DTYPES = {"portfolio_id": np.int64, "valuation_date": np.int64, "asset_type": str}
+
+# Each row contributes at most LIMB_COUNT limb products (< 2**42 each) to a
+# limb position, so 2**18 rows per chunk keeps every int64 group sum exact.
+DEFAULT_CHUNK_SIZE = 2 ** 18
+
+
+class HoldingValuationEngine:
+    """
+        Batch valuation of holdings grouped by portfolio, date and/or asset type.
+    """
+
+    def __init__(self, queryset: Optional[QuerySet] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        if not 0 < chunk_size <= DEFAULT_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {DEFAULT_CHUNK_SIZE}.")
+        self.queryset = queryset if queryset is not None else Holding.objects.all()
+        self.chunk_size = chunk_size
+
+    def totals(self, group_by: Sequence[str]) -> Dict[Any, Decimal]:
+        """
+        Total holding value per group, rounded to cents like calculate_portfolio_aum.
+
+        With a single grouping field the keys are plain values, otherwise
+        they are tuples in the order of ``group_by``.
+        """
+        group_by = tuple(group_by)
+        if not group_by or any(field not in GROUP_FIELDS for field in group_by):
+            raise ValueError(f"group_by must be a non-empty subset of {GROUP_FIELDS}.")
+
+        holdings = with_effective_price(self.queryset.order_by()).annotate(
+            **{
+                f"key_{field}": EpochDays("valuation_date") if field == "valuation_date" else F(field)
+                for field in group_by
+            }
+        )
+        keys = [f"key_{field}" for field in group_by]
+        in_int64 = Q(
+            quantity__gte=-QUANTITY_BOUND,
+            quantity__lte=QUANTITY_BOUND,
+            effective_unit_price__gte=-PRICE_BOUND,
+            effective_unit_price__lte=PRICE_BOUND,
+        )
+
+        exact_totals: Dict[Tuple, int] = {}
+        for chunk in self._chunks(holdings.filter(in_int64), keys):
+            for key, value in _sum_chunk(chunk, group_by).items():
+                exact_totals[key] = exact_totals.get(key, 0) + value
+        # Values beyond int64 are legal for max_digits=20; the database sums them exactly.
+        for row in holdings.exclude(in_int64).values(*keys).annotate(total=holding_value_sum()):
+            key = tuple(row[name] for name in keys)
+            with localcontext(prec=60):
+                exact_totals[key] = exact_totals.get(key, 0) + int(row["total"].scaleb(VALUE_PLACES))
+
+        date_position = group_by.index("valuation_date") if "valuation_date" in group_by else None
+        results = {}
+        for key, value in exact_totals.items():
+            if date_position is not None:
+                key = (*key[:date_position], EPOCH + timedelta(days=key[date_position]), *key[date_position + 1:])
+            with localcontext() as ctx:
+                ctx.prec = len(str(abs(value))) + VALUE_PLACES
+                amount = Decimal(value).scaleb(-VALUE_PLACES)
+            results[key if len(group_by) > 1 else key[0]] = quantize_aum(amount)
+        return results
+
+    def totals_by_portfolio(self) -> Dict[int, Decimal]:
+        """
+            Total holding value per portfolio id.
+        """
+        return self.totals(["portfolio_id"])
+
+    def totals_by_date(self) -> Dict[date, Decimal]:
+        """
+            Total holding value per valuation date.
+        """
+        return self.totals(["valuation_date"])
+
+    def totals_by_asset_type(self) -> Dict[str, Decimal]:
+        """
+            Total holding value per asset type.
+        """
+        return self.totals(["asset_type"])
+
+    def _chunks(self, holdings: QuerySet, keys: List[str]) -> Iterator[List[Tuple]]:
+        queryset = holdings.annotate(
+            scaled_quantity=Cast(F("quantity") * Value(10 ** QUANTITY_PLACES), BigIntegerField()),
+            scaled_price=Cast(F("effective_unit_price") * Value(10 ** PRICE_PLACES), BigIntegerField()),
+        ).values_list(*keys, "scaled_quantity", "scaled_price")
+        # Rows go straight from the cursor to NumPy, skipping the ORM's per-row converters.
+        sql, params = queryset.query.sql_with_params()
+        connection = connections[queryset.db]
+        server_side = not connection.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS")
+        with connection.chunked_cursor() if server_side else connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+
+class EpochDays(Func):
+    """
+        Days from 1970-01-01 to a date, as an integer.
+    """
+    template = "(%(expressions)s - DATE '1970-01-01')"
+    output_field = IntegerField()
+
+
+def _sum_chunk(rows: List[Tuple], group_by: Tuple[str, ...]) -> Dict[Tuple, int]:
+    """
+    Exact sum of quantity * unit_price (in 1e-12 units) per key for one chunk.
+    """
+    key_width = len(group_by)
+    columns = list(zip(*rows))
+    unique_keys, inverse = _encode_keys(
+        [np.array(column, dtype=KEY_DTYPES[field]) for field, column in zip(group_by, columns)]
+    )
+    group_sums = _grouped_products(
+        np.array(columns[key_width], dtype=np.int64),
+        np.array(columns[key_width + 1], dtype=np.int64),
+        inverse,
+        len(unique_keys),
+    )
+    return dict(zip(unique_keys, group_sums))
+
+
+def _encode_keys(key_columns: List[np.ndarray]) -> Tuple[List[Tuple], np.ndarray]:
+    """
+    Map the rows' key columns to dense group numbers and the key tuple of each group.
+    """
+    codes = np.zeros(len(key_columns[0]), dtype=np.int64)
+    uniques = []
+    for column in key_columns:
+        # At most 2**18 rows per chunk, so the mixed-radix codes of three columns fit in int64.
+        values, column_codes = np.unique(column, return_inverse=True)
+        codes = codes * len(values) + column_codes
+        uniques.append(values)
+    groups, inverse = np.unique(codes, return_inverse=True)
+
+    parts = []
+    for values in reversed(uniques):
+        parts.append(values[groups % len(values)])
+        groups = groups // len(values)
+    return list(zip(*(part.tolist() for part in reversed(parts)))), inverse
+
+
+def _grouped_products(quantities: np.ndarray, prices: np.ndarray, inverse: np.ndarray, groups: int) -> List[int]:
+    """
+    Per-group sum of quantities * prices, computed on 21-bit limbs.
+    """
+    quantity_limbs = _limbs(quantities)
+    price_limbs = _limbs(prices)
+
+    totals = np.zeros(groups, dtype=object)
+    for position in range(2 * LIMB_COUNT - 1):
+        term = np.zeros(len(quantities), dtype=np.int64)
+        for i in range(max(0, position - LIMB_COUNT + 1), min(position, LIMB_COUNT - 1) + 1):
+            term += quantity_limbs[i] * price_limbs[position - i]
+        partial = np.zeros(groups, dtype=np.int64)
+        np.add.at(partial, inverse, term)
+        totals += partial.astype(object) << (LIMB_BITS * position)
+    return [int(value) for value in totals]
+
+
+def _limbs(values: np.ndarray) -> List[np.ndarray]:
+    # The top limb keeps the sign so negative values recombine correctly.
+    limbs = [(values >> (LIMB_BITS * i)) & LIMB_MASK for i in range(LIMB_COUNT - 1)]
+    limbs.append(values >> (LIMB_BITS * (LIMB_COUNT - 1)))
+    return limbs
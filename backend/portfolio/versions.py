@@ -0,0 +1,58 @@
+"""
+Per-table change counters behind the HTTP validators of the read endpoints.
+
+Every write to a versioned table bumps the table's TableVersion row once
+the writing transaction commits: row saves and deletes through the
+signals, bulk paths (bulk_create, queryset updates, raw SQL) by calling
+``touch`` themselves. The counters live in the database, so every process
+derives the same validators, and reading them is one primary-key lookup.
+
+Counters move after commit, so writers never queue on a counter row for
+the length of their transaction. A response built between a commit and
+its bump pairs the new rows with the old counter; its ETag stops matching
+at the bump, so no client keeps a stale copy past that moment.
+"""
+from typing import List, Optional, Type
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Model
+
+from portfolio.models import Holding, Portfolio, SecurityPrice, TableVersion, ValuationSnapshot
+
+VERSIONED_MODELS = (Portfolio, Holding, ValuationSnapshot, SecurityPrice)
+
+
+def touch(*models: Type[Model], using: Optional[str] = None) -> None:
+    """
+        Bump the counters of the models' tables when the current transaction commits, or now outside one.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    tables = sorted({model._meta.db_table for model in models})
+    transaction.on_commit(lambda: _bump(tables, using), using=using)
+
+
+def table_versions(*models: Type[Model], using: Optional[str] = None) -> List[int]:
+    """
+        Current counters of the models' tables, in the given order; 0 for a table never written.
+    """
+    tables = [model._meta.db_table for model in models]
+    versions = dict(
+        TableVersion.objects.using(using or DEFAULT_DB_ALIAS)
+        .filter(table_name__in=tables)
+        .values_list("table_name", "version")
+    )
+    return [versions.get(table, 0) for table in tables]
+
+
+def _bump(tables: List[str], using: str) -> None:
+    # One upsert: a table's first write creates its row at 1. Rows are locked
+    # in sorted order, so concurrent bumps cannot deadlock.
+    connection = connections[using]
+    table = connection.ops.quote_name(TableVersion._meta.db_table)
+    values = ", ".join(["(%s, 1)"] * len(tables))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (table_name, version) VALUES {values} "
+            f"ON CONFLICT (table_name) DO UPDATE SET version = {table}.version + 1",
+            tables,
+        )
@@ -5,21 +5,62 @@ from portfolio.views.portfolio import (
     PortfolioGenericAPIView,
     PortfolioDetailGenericAPIView,
     PortfolioStatisticsGenericAPIView,
+    PortfolioStatisticsBatchGenericAPIView,
+    PortfolioStatisticsCacheGenericAPIView,
+)
+from portfolio.views.holding import (
+    HoldingGenericAPIView,
+    HoldingBulkGenericAPIView,
+    HoldingExportGenericAPIView,
+    HoldingRollForwardGenericAPIView,
 )
-from portfolio.views.holding import HoldingGenericAPIView
 from portfolio.views.valuation import (
     ValuationSnapshotGenericAPIView,
     ValuationRecalculateGenericAPIView,
+    ValuationRecalculateJobGenericAPIView,
     ValuationUpdateStatusGenericAPIView,
+    ValuationBulkStatusGenericAPIView,
+    ValuationExportGenericAPIView,
+    ValuationHistoryGenericAPIView,
+    ValuationAllocationGenericAPIView,
+)
+from portfolio.views.security import SecurityPriceGenericAPIView
+from portfolio.views.async_read import (
+    PortfolioAsyncView,
+    PortfolioDetailAsyncView,
+    PortfolioStatisticsAsyncView,
+    HoldingAsyncView,
+    ValuationSnapshotAsyncView,
 )
+from portfolio.views.metrics import MetricsView
+from portfolio.views.schema import SchemaView, SchemaUIView
 
 __all__ = [
     "PortfolioGenericAPIView",
     "PortfolioDetailGenericAPIView",
     "PortfolioStatisticsGenericAPIView",
+    "PortfolioStatisticsBatchGenericAPIView",
+    "PortfolioStatisticsCacheGenericAPIView",
     "HoldingGenericAPIView",
+    "HoldingBulkGenericAPIView",
+    "HoldingExportGenericAPIView",
+    "HoldingRollForwardGenericAPIView",
     "ValuationSnapshotGenericAPIView",
     "ValuationRecalculateGenericAPIView",
+    "ValuationRecalculateJobGenericAPIView",
     "ValuationUpdateStatusGenericAPIView",
+    "ValuationBulkStatusGenericAPIView",
+    "ValuationExportGenericAPIView",
+    "ValuationHistoryGenericAPIView",
+    "ValuationAllocationGenericAPIView",
+    "SecurityPriceGenericAPIView",
+    "PortfolioAsyncView",
+    "PortfolioDetailAsyncView",
+    "PortfolioStatisticsAsyncView",
+    "HoldingAsyncView",
+    "ValuationSnapshotAsyncView",
+    "MetricsView",
+    "SchemaView",
+    "SchemaUIView",
 ]
 
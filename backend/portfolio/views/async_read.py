@@ -0,0 +1,216 @@
+"""
+Async read views
+
+Async variants of the hot read endpoints, served under ``async/`` with the
+same parameters and response bodies as their synchronous counterparts.
+Independent queries inside a request (page rows and count, the relations
+of the portfolio detail, the statistics queries) run concurrently. List
+querysets come from the synchronous views so both paths filter and order
+alike.
+"""
+from math import ceil
+from typing import Any, Dict, List
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from rest_framework import status
+
+from portfolio.concurrency import run_concurrently
+from portfolio.models import Portfolio
+from portfolio.pagination import KeysetPaginator, akeyset_page_data, is_cursor_request
+from portfolio.renderers import FastJSONRenderer
+from portfolio.search import SEARCH_CONTAINS, SEARCH_MODES
+from portfolio.serializers.holding import HOLDING_VALUES
+from portfolio.serializers.portfolio import (
+    PortfolioDetailQuerySerializer,
+    PortfolioDetailSerializer,
+    PORTFOLIO_VALUES,
+    detail_holdings,
+    detail_snapshots,
+)
+from portfolio.serializers.valuation import VALUATION_SNAPSHOT_VALUES
+from portfolio.serializers.values import ValuesSerializer
+from portfolio.services import PortfolioService
+from portfolio.views.holding import KEYSET_ORDERING as HOLDING_KEYSET_ORDERING, HoldingGenericAPIView
+from portfolio.views.portfolio import KEYSET_ORDERING as PORTFOLIO_KEYSET_ORDERING, portfolio_list_queryset
+from portfolio.views.valuation import KEYSET_ORDERING as VALUATION_KEYSET_ORDERING, ValuationSnapshotGenericAPIView
+
+
+def json_response(data: Dict[str, Any], status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """
+        JSON response encoded the way DRF's JSONRenderer encodes it.
+    """
+    return HttpResponse(FastJSONRenderer().render(data), status=status_code, content_type="application/json")
+
+
+def not_found() -> HttpResponse:
+    """
+        The body DRF returns for get_object_or_404.
+    """
+    return json_response({"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+
+
+async def list_page_data(queryset: QuerySet, page: int, rows: int) -> Dict[str, Any]:
+    """
+    Page rows and totals matching Paginator, with the count and the rows fetched concurrently.
+
+    Out of range pages fall back to the last page, as the sync views do.
+    """
+    offset = (page - 1) * rows
+    total, page_rows = await run_concurrently(
+        queryset.count,
+        lambda: list(queryset[max(offset, 0) : max(offset, 0) + rows]),
+    )
+    last_page = max(ceil(total / rows), 1)
+    if page < 1 or page > last_page:
+        offset = (last_page - 1) * rows
+        (page_rows,) = await run_concurrently(lambda: list(queryset[offset : offset + rows]))
+    return {"rows": page_rows, "current_page": page, "last_page": last_page, "total": total}
+
+
+async def list_response(
+    request: HttpRequest,
+    queryset: QuerySet,
+    ordering: List[str],
+    key: str,
+    message: str,
+    values: ValuesSerializer,
+) -> HttpResponse:
+    """
+        Page or cursor list response shaped like the sync list views.
+    """
+    try:
+        rows = int(request.GET.get("rows", 25))
+        page = int(request.GET.get("page", 1))
+    except ValueError as e:
+        return json_response({"message": str(e)}, status.HTTP_400_BAD_REQUEST)
+
+    queryset = values.queryset(queryset)
+    if is_cursor_request(request.GET):
+        try:
+            page_data = await akeyset_page_data(KeysetPaginator(queryset, ordering, rows), request.GET)
+        except ValueError as e:
+            return json_response({"message": str(e)}, status.HTTP_400_BAD_REQUEST)
+        return json_response(
+            {"message": message, key: values.render(page_data.pop("rows")), **page_data}
+        )
+
+    page_data = await list_page_data(queryset, page, rows)
+    return json_response(
+        {
+            "message": message,
+            key: values.render(page_data.pop("rows")),
+            **page_data,
+        }
+    )
+
+
+class PortfolioAsyncView(View):
+    """
+        Async list of portfolios with search and pagination.
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        search_mode = request.GET.get("search_mode", SEARCH_CONTAINS)
+        if search_mode not in SEARCH_MODES:
+            return json_response(
+                {"message": f"search_mode must be one of {list(SEARCH_MODES)}"},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        return await list_response(
+            request,
+            await sync_to_async(portfolio_list_queryset)(request.GET),
+            PORTFOLIO_KEYSET_ORDERING,
+            "portfolios",
+            "Portfolios fetched successfully",
+            PORTFOLIO_VALUES,
+        )
+
+
+class PortfolioDetailAsyncView(View):
+    """
+        Async portfolio detail; holdings and valuation snapshots are fetched concurrently.
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        query_serializer = PortfolioDetailQuerySerializer(data=request.GET)
+        if not query_serializer.is_valid():
+            return json_response(
+                {"message": "Validation error", "errors": query_serializer.errors},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        params = dict(query_serializer.validated_data)
+
+        try:
+            instance = await Portfolio.objects.aget(pk=request.GET.get("id"))
+        except (Portfolio.DoesNotExist, ValueError, TypeError):
+            return not_found()
+
+        include = params.get("include")
+        calls = {}
+        if include is None or "holdings" in include:
+            calls["holdings_rows"] = lambda: list(detail_holdings(instance, params))
+        if include is None or "valuation_snapshots" in include:
+            calls["snapshots_rows"] = lambda: list(detail_snapshots(instance, params))
+        params.update(zip(calls, await run_concurrently(*calls.values())))
+
+        return json_response(
+            {
+                "message": "Portfolio fetched successfully",
+                "portfolio": PortfolioDetailSerializer(instance, context=params).data,
+            }
+        )
+
+
+class PortfolioStatisticsAsyncView(View):
+    """
+        Async statistics for a portfolio.
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        try:
+            instance = await Portfolio.objects.aget(pk=request.GET.get("id"))
+        except (Portfolio.DoesNotExist, ValueError, TypeError):
+            return not_found()
+
+        return json_response(
+            {
+                "message": "Portfolio statistics fetched successfully",
+                "statistics": await PortfolioService.aget_portfolio_statistics(instance),
+            }
+        )
+
+
+class HoldingAsyncView(View):
+    """
+        Async list of holdings with filtering and pagination.
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        return await list_response(
+            request,
+            await sync_to_async(HoldingGenericAPIView().list_queryset)(request.GET),
+            HOLDING_KEYSET_ORDERING,
+            "holdings",
+            "Holdings fetched successfully",
+            HOLDING_VALUES,
+        )
+
+
+class ValuationSnapshotAsyncView(View):
+    """
+        Async list of valuation snapshots with filtering and pagination.
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        return await list_response(
+            request,
+            await sync_to_async(ValuationSnapshotGenericAPIView().list_queryset)(request.GET),
+            VALUATION_KEYSET_ORDERING,
+            "valuations",
+            "Valuation snapshots fetched successfully",
+            VALUATION_SNAPSHOT_VALUES,
+        )
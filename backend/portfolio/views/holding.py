@@ -1,16 +1,39 @@
 """
 Holding Views
 """
+import csv
+import io
+from typing import Any, Dict, List, Tuple
 from drf_yasg import openapi
 from rest_framework import generics, status
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.request import Request
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 from django.core.paginator import Paginator, EmptyPage
 from django.shortcuts import get_object_or_404
 
+from portfolio.conditional import conditional_get
+from portfolio.exports import EXPORT_FORMATS, HOLDING_EXPORT_FIELDS, holding_export_rows, export_response
+from portfolio.filters import holding_query
+from portfolio.renderers import FastJSONRenderer
+from portfolio.pagination import KeysetPaginator, is_cursor_request, keyset_page_data
 from portfolio.models.holding import Holding
-from portfolio.serializers.holding import HoldingSerializer
+from portfolio.models.portfolio import Portfolio
+from portfolio.models.security import SecurityPrice
+from portfolio.serializers.holding import (
+    HOLDING_VALUES,
+    HoldingSerializer,
+    HoldingBulkRowSerializer,
+    HoldingRollForwardSerializer,
+)
+from portfolio.services import HoldingService
+from portfolio.versions import table_versions
+
+KEYSET_ORDERING = ["-valuation_date", "asset_name", "id"]
+BULK_BATCH_SIZE = 1000
+BULK_MAX_ROWS = 50000
+BULK_MODES = ("atomic", "best_effort")
 
 
 class HoldingGenericAPIView(generics.GenericAPIView):
@@ -18,28 +41,53 @@ class HoldingGenericAPIView(generics.GenericAPIView):
         Generic API View for Holding management.
     """
     serializer_class = HoldingSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list_queryset(self, params: Any) -> QuerySet:
+        """
+            Holdings matching the list filters, in list order.
+        """
+        return Holding.objects.filter(holding_query(params)).select_related("portfolio").order_by(
+            "-valuation_date", "asset_name"
+        )
 
+    def validator_state(self, request: Request) -> List[Any]:
+        """
+            Change counters of the holdings, portfolios and security prices tables.
+        """
+        return table_versions(Holding, Portfolio, SecurityPrice)
+
+    @conditional_get
     def get(self, request: Request) -> Response:
         """
             list of holdings with filtering and pagination.
         """
-        portfolio_id = request.query_params.get("portfolio")
-        valuation_date = request.query_params.get("valuation_date")
         page = int(request.query_params.get("page", 1))
         rows = int(request.query_params.get("rows", 25))
 
-        query = Q(pk__isnull=False)
+        holdings = self.list_queryset(request.query_params)
 
-        if portfolio_id:
-            query &= Q(portfolio_id=portfolio_id)
-        if valuation_date:
-            query &= Q(valuation_date=valuation_date)
-
-        holdings = Holding.objects.filter(query).select_related("portfolio").order_by(
-            "-valuation_date", "asset_name"
-        )
+        if is_cursor_request(request.query_params):
+            try:
+                page_data = keyset_page_data(
+                    KeysetPaginator(HOLDING_VALUES.queryset(holdings), KEYSET_ORDERING, rows),
+                    request.query_params,
+                )
+            except ValueError as e:
+                return Response(
+                    {"message": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                {
+                    "message": "Holdings fetched successfully",
+                    "holdings": HOLDING_VALUES.render(page_data.pop("rows")),
+                    **page_data,
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        paginator = Paginator(holdings, rows)
+        paginator = Paginator(HOLDING_VALUES.queryset(holdings), rows)
         try:
             holdings_page = paginator.page(page)
         except EmptyPage:
@@ -48,7 +96,7 @@ class HoldingGenericAPIView(generics.GenericAPIView):
         return Response(
             {
                 "message": "Holdings fetched successfully",
-                "holdings": self.serializer_class(holdings_page, many=True).data,
+                "holdings": HOLDING_VALUES.render(holdings_page),
                 "current_page": page,
                 "last_page": paginator.num_pages,
                 "total": paginator.count,
@@ -120,3 +168,177 @@ class HoldingGenericAPIView(generics.GenericAPIView):
             status=status.HTTP_200_OK,
         )
 
+
+
+class HoldingBulkGenericAPIView(generics.GenericAPIView):
+    """
+        View for bulk holding ingestion from a JSON array or CSV upload.
+    """
+    serializer_class = HoldingBulkRowSerializer
+
+    def post(self, request: Request) -> Response:
+        """
+            Validate and insert many holdings.
+
+            mode=atomic (default) inserts nothing if any row is invalid;
+            mode=best_effort inserts the valid rows and reports the rest.
+        """
+        mode = request.query_params.get("mode") or (
+            request.data.get("mode") if isinstance(request.data, dict) else None
+        ) or "atomic"
+        if mode not in BULK_MODES:
+            return Response(
+                {"message": f"Mode must be one of {list(BULK_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            rows = self.get_rows(request)
+        except ValueError as e:
+            return Response(
+                {"message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        holdings: List[Holding] = []
+        errors: List[Dict[str, Any]] = []
+        for offset in range(0, len(rows), BULK_BATCH_SIZE):
+            batch_holdings, batch_errors = self.validate_batch(rows[offset:offset + BULK_BATCH_SIZE], offset)
+            holdings.extend(batch_holdings)
+            errors.extend(batch_errors)
+
+        if errors and mode == "atomic":
+            return Response(
+                {
+                    "message": "Validation error",
+                    "created": 0,
+                    "failed": len(errors),
+                    "errors": errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created = HoldingService.bulk_insert(holdings, batch_size=BULK_BATCH_SIZE) if holdings else []
+        return Response(
+            {
+                "message": "Holdings imported successfully" if not errors else "Holdings imported with errors",
+                "created": len(created),
+                "failed": len(errors),
+                "errors": errors,
+            },
+            status=status.HTTP_201_CREATED if created or not errors else status.HTTP_400_BAD_REQUEST,
+        )
+
+    def get_rows(self, request: Request) -> List[Dict[str, Any]]:
+        """
+            Read the uploaded rows from a CSV file or a JSON body.
+        """
+        upload = request.FILES.get("file")
+        if upload is not None:
+            try:
+                text = io.TextIOWrapper(upload.file, encoding="utf-8-sig")
+                rows = [dict(row) for row in csv.DictReader(text)]
+            except (UnicodeDecodeError, csv.Error) as e:
+                raise ValueError(f"Invalid CSV file: {e}")
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            rows = request.data.get("holdings")
+
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("Provide a non-empty JSON array of holdings or a CSV file")
+        if len(rows) > BULK_MAX_ROWS:
+            raise ValueError(f"A bulk upload is limited to {BULK_MAX_ROWS} rows")
+        if not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Each holding must be an object")
+        return rows
+
+    def validate_batch(self, rows: List[Dict[str, Any]], offset: int) -> Tuple[List[Holding], List[Dict[str, Any]]]:
+        """
+            Validate one batch of rows, checking referenced portfolios with a single query.
+        """
+        valid: List[Tuple[int, Dict[str, Any]]] = []
+        errors: List[Dict[str, Any]] = []
+        for index, row in enumerate(rows, start=offset + 1):
+            serializer = self.serializer_class(data=row)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                errors.append({"row": index, "errors": serializer.errors})
+
+        portfolio_ids = {data["portfolio"] for _, data in valid}
+        existing = set(Portfolio.objects.filter(pk__in=portfolio_ids).values_list("pk", flat=True))
+
+        holdings = []
+        for index, data in valid:
+            if data["portfolio"] not in existing:
+                errors.append(
+                    {"row": index, "errors": {"portfolio": [f"Portfolio {data['portfolio']} does not exist."]}}
+                )
+                continue
+            holdings.append(
+                Holding(
+                    portfolio_id=data["portfolio"],
+                    asset_name=data["asset_name"],
+                    asset_type=data["asset_type"],
+                    quantity=data["quantity"],
+                    unit_price=data["unit_price"],
+                    valuation_date=data["valuation_date"],
+                )
+            )
+        errors.sort(key=lambda error: error["row"])
+        return holdings, errors
+
+
+class HoldingRollForwardGenericAPIView(generics.GenericAPIView):
+    """
+        View for copying holdings to a new valuation date.
+    """
+    serializer_class = HoldingRollForwardSerializer
+
+    def post(self, request: Request) -> Response:
+        """
+            copy the holdings of from_date to to_date, optionally repricing assets and creating snapshots.
+        """
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"message": "Validation error", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = serializer.validated_data
+        result = HoldingService.roll_forward(
+            from_date=data["from_date"],
+            to_date=data["to_date"],
+            portfolio_ids=data.get("portfolio_ids"),
+            prices=data["prices"],
+            create_snapshots=data["create_snapshots"],
+        )
+        return Response(
+            {
+                "message": "Holdings rolled forward successfully",
+                "roll_forward": result,
+            },
+            status=status.HTTP_201_CREATED if result["holdings"] else status.HTTP_200_OK,
+        )
+
+
+class HoldingExportGenericAPIView(generics.GenericAPIView):
+    """
+        View for streaming holding exports.
+    """
+
+    def get(self, request: Request) -> Any:
+        """
+            stream holdings as CSV or NDJSON, with the same filters as the list endpoint.
+        """
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"message": f"Export format must be one of {list(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = Holding.objects.filter(holding_query(request.query_params)).order_by("-valuation_date", "asset_name", "id")
+        return export_response(holding_export_rows(queryset), HOLDING_EXPORT_FIELDS, export_format, "holdings")
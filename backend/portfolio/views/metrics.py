@@ -0,0 +1,21 @@
+"""
+Metrics Views
+"""
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+
+from portfolio.metrics import registry
+from portfolio.middleware import portfolio_routes
+from portfolio.pooling import render_pool_metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsView(View):
+    """
+        Prometheus text exposition of the per-route request histograms and connection pools of this process.
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        body = registry.render(portfolio_routes()) + render_pool_metrics()
+        return HttpResponse(body, content_type=PROMETHEUS_CONTENT_TYPE)
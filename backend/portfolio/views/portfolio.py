@@ -1,18 +1,46 @@
 """
 Portfolio Views
 """
-from typing import Any
+from typing import Any, List, Optional
 from drf_yasg import openapi
 from rest_framework import generics, status
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.request import Request
-from django.db.models import Q
 from django.core.paginator import Paginator, EmptyPage
+from django.db.models import QuerySet
 from django.shortcuts import get_object_or_404
 
-from portfolio.models.portfolio import Portfolio
-from portfolio.serializers.portfolio import PortfolioSerializer, PortfolioDetailSerializer
+from portfolio.conditional import conditional_get
+from portfolio.filters import portfolio_query
+from portfolio.search import SEARCH_CONTAINS, SEARCH_FULLTEXT, SEARCH_MODES, search_portfolios
+from portfolio.renderers import FastJSONRenderer
+from portfolio.pagination import KeysetPaginator, is_cursor_request, keyset_page_data
+from portfolio.models import Holding, Portfolio, SecurityPrice, ValuationSnapshot
+from portfolio.serializers.portfolio import (
+    PORTFOLIO_VALUES,
+    PortfolioSerializer,
+    PortfolioDetailSerializer,
+    PortfolioDetailQuerySerializer,
+    PortfolioStatisticsBatchQuerySerializer,
+)
 from portfolio.services import PortfolioService
+from portfolio.cache import statistics_cache_counters
+from portfolio.versions import table_versions
+
+KEYSET_ORDERING = ["-created_at", "-id"]
+
+
+def portfolio_list_queryset(params: Any) -> QuerySet:
+    """
+        Portfolios matching the search, in list order.
+    """
+    portfolios = Portfolio.objects.filter(portfolio_query(params)).order_by("-created_at")
+    search = params.get("search")
+    if search and params.get("search_mode", SEARCH_CONTAINS) == SEARCH_FULLTEXT:
+        # Cursor pages keep the keyset ordering; only page mode is ranked.
+        portfolios = search_portfolios(portfolios, search).order_by("-search_rank", "-created_at", "-id")
+    return portfolios
 
 
 class PortfolioGenericAPIView(generics.GenericAPIView):
@@ -20,27 +48,54 @@ class PortfolioGenericAPIView(generics.GenericAPIView):
         View for Portfolio management.
     """
     serializer_class = PortfolioSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def validator_state(self, request: Request) -> Optional[List[Any]]:
+        """
+            Change counters of the portfolios table.
+        """
+        if request.query_params.get("search_mode", SEARCH_CONTAINS) not in SEARCH_MODES:
+            return None
+        return table_versions(Portfolio)
 
+    @conditional_get
     def get(self, request: Request) -> Response:
         """
             list of portfolios with search and pagination.
         """
-        search = request.query_params.get("search")
+        search_mode = request.query_params.get("search_mode", SEARCH_CONTAINS)
         page = int(request.query_params.get("page", 1))
         rows = int(request.query_params.get("rows", 25))
 
-        query = Q(pk__isnull=False)
-
-        if search:
-            query &= Q(
-                Q(name__icontains=search)
-                | Q(client_name__icontains=search)
-                | Q(client_email__icontains=search)
+        if search_mode not in SEARCH_MODES:
+            return Response(
+                {"message": f"search_mode must be one of {list(SEARCH_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        portfolios = Portfolio.objects.filter(query).order_by("-created_at")
+        portfolios = portfolio_list_queryset(request.query_params)
+
+        if is_cursor_request(request.query_params):
+            try:
+                page_data = keyset_page_data(
+                    KeysetPaginator(PORTFOLIO_VALUES.queryset(portfolios), KEYSET_ORDERING, rows),
+                    request.query_params,
+                )
+            except ValueError as e:
+                return Response(
+                    {"message": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                {
+                    "message": "Portfolios fetched successfully",
+                    "portfolios": PORTFOLIO_VALUES.render(page_data.pop("rows")),
+                    **page_data,
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        paginator = Paginator(portfolios, rows)
+        paginator = Paginator(PORTFOLIO_VALUES.queryset(portfolios), rows)
         try:
             portfolios_page = paginator.page(page)
         except EmptyPage:
@@ -49,7 +104,7 @@ class PortfolioGenericAPIView(generics.GenericAPIView):
         return Response(
             {
                 "message": "Portfolios fetched successfully",
-                "portfolios": self.serializer_class(portfolios_page, many=True).data,
+                "portfolios": PORTFOLIO_VALUES.render(portfolios_page),
                 "current_page": page,
                 "last_page": paginator.num_pages,
                 "total": paginator.count,
@@ -90,17 +145,32 @@ class PortfolioDetailGenericAPIView(generics.GenericAPIView):
     """
     serializer_class = PortfolioDetailSerializer
 
+    def validator_state(self, request: Request) -> Optional[List[Any]]:
+        """
+            Change counters of the portfolios, holdings, snapshots and security prices tables.
+        """
+        if not PortfolioDetailQuerySerializer(data=request.query_params).is_valid():
+            return None
+        return table_versions(Portfolio, Holding, ValuationSnapshot, SecurityPrice)
+
+    @conditional_get
     def get(self, request: Request) -> Response:
         """
             get portfolio details with holdings and valuations.
         """
         portfolio_id = request.query_params.get("id")
-   
+        query_serializer = PortfolioDetailQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response(
+                {"message": "Validation error", "errors": query_serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         portfolio = get_object_or_404(Portfolio, pk=portfolio_id)
         return Response(
             {
                 "message": "Portfolio fetched successfully",
-                "portfolio": self.serializer_class(portfolio).data,
+                "portfolio": self.serializer_class(portfolio, context=query_serializer.validated_data).data,
             },
             status=status.HTTP_200_OK,
         )
@@ -155,6 +225,13 @@ class PortfolioDetailGenericAPIView(generics.GenericAPIView):
 class PortfolioStatisticsGenericAPIView(generics.GenericAPIView):
     """Generic API View for Portfolio statistics."""
 
+    def validator_state(self, request: Request) -> Optional[List[Any]]:
+        """
+            Change counters of the portfolios, holdings and snapshots tables.
+        """
+        return table_versions(Portfolio, Holding, ValuationSnapshot)
+
+    @conditional_get
     def get(self, request: Request) -> Response:
         """
             get statistics for a portfolio.
@@ -171,3 +248,61 @@ class PortfolioStatisticsGenericAPIView(generics.GenericAPIView):
             status=status.HTTP_200_OK,
         )
 
+
+class PortfolioStatisticsBatchGenericAPIView(generics.GenericAPIView):
+    """Generic API View for statistics of many portfolios at once."""
+
+    def validator_state(self, request: Request) -> Optional[List[Any]]:
+        """
+            Change counters of the portfolios, holdings and snapshots tables.
+        """
+        if not PortfolioStatisticsBatchQuerySerializer(data=request.query_params).is_valid():
+            return None
+        return table_versions(Portfolio, Holding, ValuationSnapshot)
+
+    @conditional_get
+    def get(self, request: Request) -> Response:
+        """
+            get statistics for a list of portfolio ids, or for a page of the portfolio search.
+        """
+        query_serializer = PortfolioStatisticsBatchQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response(
+                {"message": "Validation error", "errors": query_serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        params = query_serializer.validated_data
+
+        if "ids" in params:
+            portfolios = Portfolio.objects.filter(pk__in=params["ids"])
+            stats = PortfolioService.get_portfolio_statistics_bulk(portfolios)
+            stats_by_id = {row["portfolio"]: row for row in stats}
+            stats = [stats_by_id[pk] for pk in params["ids"] if pk in stats_by_id]
+        else:
+            offset = (params["page"] - 1) * params["rows"]
+            portfolios = portfolio_list_queryset(params)
+            stats = PortfolioService.get_portfolio_statistics_bulk(portfolios[offset : offset + params["rows"]])
+
+        return Response(
+            {
+                "message": "Portfolio statistics fetched successfully",
+                "statistics": stats,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PortfolioStatisticsCacheGenericAPIView(generics.GenericAPIView):
+    """Generic API View for the portfolio statistics cache counters."""
+
+    def get(self, request: Request) -> Response:
+        """
+            get hit, miss and invalidation counts of the statistics cache.
+        """
+        return Response(
+            {
+                "message": "Statistics cache counters fetched successfully",
+                "counters": statistics_cache_counters(),
+            },
+            status=status.HTTP_200_OK,
+        )
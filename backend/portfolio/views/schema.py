@@ -0,0 +1,45 @@
+"""
+OpenAPI Schema Views
+"""
+import hashlib
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views import View
+
+from portfolio.openapi import SCHEMA_FORMATS, get_schema, schema_info
+
+
+class SchemaView(View):
+    """
+        The cached OpenAPI schema as ``.json`` or ``.yaml``.
+    """
+
+    def get(self, request: HttpRequest, format: str) -> HttpResponse:
+        schema = get_schema(format)
+        etag = f'"{hashlib.md5(schema).hexdigest()}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(schema, content_type=SCHEMA_FORMATS[format])
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+class SchemaUIView(View):
+    """
+        Swagger UI or ReDoc page loading the cached schema from ``schema-json``.
+    """
+
+    ui = "swagger"
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        # The pages only need the schema's title and version; the spec itself
+        # is fetched by the browser from SPEC_URL.
+        from drf_yasg import openapi
+        from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+
+        renderer = ReDocRenderer() if self.ui == "redoc" else SwaggerUIRenderer()
+        swagger = openapi.Swagger(info=schema_info(), _prefix="/", paths=openapi.Paths({}))
+        html = renderer.render(swagger, renderer.media_type, {"request": request})
+        return HttpResponse(html, content_type=f"{renderer.media_type}; charset={renderer.charset}")
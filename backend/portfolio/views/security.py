@@ -0,0 +1,59 @@
+"""
+Security Views
+"""
+from typing import Any, Dict, List
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.request import Request
+
+from portfolio.serializers.security import SecurityPriceRowSerializer
+from portfolio.services import RevaluationService
+
+PRICE_UPLOAD_MAX_ROWS = 50000
+
+
+class SecurityPriceGenericAPIView(generics.GenericAPIView):
+    """
+        View for security price uploads.
+    """
+    serializer_class = SecurityPriceRowSerializer
+
+    def post(self, request: Request) -> Response:
+        """
+            store a batch of security prices and revalue the affected portfolios.
+
+            The upload is all or nothing: if any row is invalid no price is stored.
+        """
+        rows = request.data if isinstance(request.data, list) else request.data.get("prices")
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {"message": "Provide a non-empty JSON array of prices"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > PRICE_UPLOAD_MAX_ROWS:
+            return Response(
+                {"message": f"A price upload is limited to {PRICE_UPLOAD_MAX_ROWS} rows"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        prices: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        for index, row in enumerate(rows, start=1):
+            serializer = self.serializer_class(data=row)
+            if serializer.is_valid():
+                prices.append(serializer.validated_data)
+            else:
+                errors.append({"row": index, "errors": serializer.errors})
+        if errors:
+            return Response(
+                {"message": "Validation error", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {
+                "message": "Security prices uploaded successfully",
+                "revaluation": RevaluationService.upload_prices(prices),
+            },
+            status=status.HTTP_201_CREATED,
+        )
@@ -1,56 +1,95 @@
 """
 Valuation Views
 """
+from typing import Any, List
 from drf_yasg import openapi
 from rest_framework import generics, status
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.request import Request
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 from django.core.paginator import Paginator, EmptyPage
 from django.shortcuts import get_object_or_404
 
+from portfolio.conditional import conditional_get
+from portfolio.exports import EXPORT_FORMATS, VALUATION_EXPORT_FIELDS, valuation_export_rows, export_response
+from portfolio.filters import valuation_query
+from portfolio.renderers import FastJSONRenderer
+from portfolio.pagination import KeysetPaginator, is_cursor_request, keyset_page_data
+from portfolio.models.job import RecalculationJob
 from portfolio.models.valuation import ValuationSnapshot
 from portfolio.serializers.valuation import (
+    VALUATION_SNAPSHOT_VALUES,
     ValuationSnapshotSerializer,
     ValuationSnapshotCreateSerializer,
+    ValuationHistoryQuerySerializer,
+    ValuationAllocationQuerySerializer,
+    ValuationBulkStatusSerializer,
 )
-from portfolio.services import ValuationService
+from portfolio.serializers.job import RecalculationJobSerializer, RecalculationJobCreateSerializer
+from portfolio.services import ValuationService, HoldingAggregateService
+from portfolio.versions import table_versions
 
 from portfolio.models.portfolio import Portfolio
 from datetime import date
 
+KEYSET_ORDERING = ["-snapshot_date", "-created_at", "-id"]
+
+
 class ValuationSnapshotGenericAPIView(generics.GenericAPIView):
     """
         View for Valuation Snapshot management.
     """
     serializer_class = ValuationSnapshotSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list_queryset(self, params: Any) -> QuerySet:
+        """
+            Valuation snapshots matching the list filters, in list order.
+        """
+        return (
+            ValuationSnapshot.objects.filter(valuation_query(params))
+            .select_related("portfolio")
+            .order_by("-snapshot_date", "-created_at")
+        )
 
+    def validator_state(self, request: Request) -> List[Any]:
+        """
+            Change counters of the snapshots and portfolios tables.
+        """
+        return table_versions(ValuationSnapshot, Portfolio)
+
+    @conditional_get
     def get(self, request: Request) -> Response:
         """
             list of valuation snapshots with filtering and pagination.
         """
-        portfolio_id = request.query_params.get("portfolio")
-        status_filter = request.query_params.get("status")
-        snapshot_date = request.query_params.get("snapshot_date")
         page = int(request.query_params.get("page", 1))
         rows = int(request.query_params.get("rows", 25))
 
-        query = Q(pk__isnull=False)
-
-        if portfolio_id:
-            query &= Q(portfolio_id=portfolio_id)
-        if status_filter:
-            query &= Q(status=status_filter)
-        if snapshot_date:
-            query &= Q(snapshot_date=snapshot_date)
+        snapshots = self.list_queryset(request.query_params)
 
-        snapshots = (
-            ValuationSnapshot.objects.filter(query)
-            .select_related("portfolio")
-            .order_by("-snapshot_date", "-created_at")
-        )
+        if is_cursor_request(request.query_params):
+            try:
+                page_data = keyset_page_data(
+                    KeysetPaginator(VALUATION_SNAPSHOT_VALUES.queryset(snapshots), KEYSET_ORDERING, rows),
+                    request.query_params,
+                )
+            except ValueError as e:
+                return Response(
+                    {"message": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                {
+                    "message": "Valuation snapshots fetched successfully",
+                    "valuations": VALUATION_SNAPSHOT_VALUES.render(page_data.pop("rows")),
+                    **page_data,
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        paginator = Paginator(snapshots, rows)
+        paginator = Paginator(VALUATION_SNAPSHOT_VALUES.queryset(snapshots), rows)
         try:
             snapshots_page = paginator.page(page)
         except EmptyPage:
@@ -59,7 +98,7 @@ class ValuationSnapshotGenericAPIView(generics.GenericAPIView):
         return Response(
             {
                 "message": "Valuation snapshots fetched successfully",
-                "valuations": self.serializer_class(snapshots_page, many=True).data,
+                "valuations": VALUATION_SNAPSHOT_VALUES.render(snapshots_page),
                 "current_page": page,
                 "last_page": paginator.num_pages,
                 "total": paginator.count,
@@ -78,7 +117,6 @@ class ValuationSnapshotGenericAPIView(generics.GenericAPIView):
             portfolio = get_object_or_404(Portfolio, pk=portfolio_id)
             snapshot_date_str = request.data.get("snapshot_date")
             snapshot_date = date.fromisoformat(snapshot_date_str) if snapshot_date_str else date.today()
-            status_value = request.data.get("status", "DRAFT")
             notes = request.data.get("notes", "")
             
             # Check if snapshot already exists for this portfolio and date
@@ -87,6 +125,16 @@ class ValuationSnapshotGenericAPIView(generics.GenericAPIView):
                 snapshot_date=snapshot_date,
                 defaults={}
             )
+            # An existing snapshot keeps its status unless a legal transition is requested
+            status_value = request.data.get("status") or snapshot.status
+            if not created:
+                try:
+                    ValuationService.check_status_transition(snapshot.status, status_value)
+                except ValueError as e:
+                    return Response(
+                        {"message": "Validation error", "errors": {"status": [str(e)]}},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
             
             # Set fields one by one
             snapshot.portfolio = portfolio
@@ -94,9 +142,10 @@ class ValuationSnapshotGenericAPIView(generics.GenericAPIView):
             snapshot.status = status_value
             snapshot.notes = notes if notes else None
             
-            # Calculate AUM using service
-            total_aum = ValuationService.calculate_portfolio_aum(portfolio, snapshot_date)
-            snapshot.total_aum = total_aum
+            # Calculate AUM and its asset type breakdown using service
+            snapshot.total_aum, snapshot.aum_breakdown = HoldingAggregateService.get_aum_breakdown(
+                portfolio, snapshot_date
+            )
             
             snapshot.save()
             
@@ -194,6 +243,52 @@ class ValuationRecalculateGenericAPIView(generics.GenericAPIView):
         )
 
 
+class ValuationRecalculateJobGenericAPIView(generics.GenericAPIView):
+    """
+        View for background recalculation jobs over a date range.
+    """
+    serializer_class = RecalculationJobSerializer
+
+    def get(self, request: Request) -> Response:
+        """
+            get the status and progress of a recalculation job.
+        """
+        job_id = request.query_params.get("id")
+        if not job_id:
+            return Response(
+                {"message": "Recalculation job ID is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        job = get_object_or_404(RecalculationJob, pk=job_id)
+        return Response(
+            {
+                "message": "Recalculation job fetched successfully",
+                "job": self.serializer_class(job).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def post(self, request: Request) -> Response:
+        """
+            submit a recalculation of all snapshots in a date range, optionally limited to portfolios.
+        """
+        serializer = RecalculationJobCreateSerializer(data=request.data)
+        if serializer.is_valid():
+            job = serializer.save()
+            return Response(
+                {
+                    "message": "Recalculation job submitted successfully",
+                    "job": self.serializer_class(job).data,
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+        return Response(
+            {"message": "Validation error", "errors": serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+
 class ValuationUpdateStatusGenericAPIView(generics.GenericAPIView):
     """
         View for updating valuation snapshot status.
@@ -235,3 +330,142 @@ class ValuationUpdateStatusGenericAPIView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+
+class ValuationBulkStatusGenericAPIView(generics.GenericAPIView):
+    """
+        View for moving many valuation snapshots to a new status.
+    """
+    serializer_class = ValuationBulkStatusSerializer
+
+    def post(self, request: Request) -> Response:
+        """
+            update the status of the snapshots selected by ids or by a filter.
+
+            Snapshots whose status may not move to the new one are left as
+            they are and reported as rejected.
+        """
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"message": "Validation error", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = serializer.validated_data
+        if "ids" in data:
+            snapshots = ValuationSnapshot.objects.filter(pk__in=data["ids"])
+        else:
+            snapshots = ValuationSnapshot.objects.filter(valuation_query(data["filter"]))
+        result = ValuationService.bulk_update_status(snapshots, data["status"])
+        return Response(
+            {
+                "message": "Valuation statuses updated successfully",
+                "result": result,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ValuationExportGenericAPIView(generics.GenericAPIView):
+    """
+        View for streaming valuation snapshot exports.
+    """
+
+    def get(self, request: Request) -> Any:
+        """
+            stream valuation snapshots as CSV or NDJSON, with the same filters as the list endpoint.
+        """
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"message": f"Export format must be one of {list(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = ValuationSnapshot.objects.filter(valuation_query(request.query_params)).order_by("-snapshot_date", "-created_at", "-id")
+        return export_response(valuation_export_rows(queryset), VALUATION_EXPORT_FIELDS, export_format, "valuations")
+
+
+class ValuationHistoryGenericAPIView(generics.GenericAPIView):
+    """
+        View for a portfolio's downsampled AUM history.
+    """
+    serializer_class = ValuationHistoryQuerySerializer
+
+    def get(self, request: Request) -> Response:
+        """
+            get (date, total_aum) pairs bucketed by day, week, month or quarter.
+        """
+        serializer = self.serializer_class(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                {"message": "Validation error", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = serializer.validated_data
+        portfolio = get_object_or_404(Portfolio, pk=params["portfolio"])
+        series = ValuationService.get_portfolio_valuation_series(
+            portfolio,
+            date_from=params.get("date_from"),
+            date_to=params.get("date_to"),
+            interval=params["interval"],
+            method=params["method"],
+            status=params.get("status"),
+        )
+        return Response(
+            {
+                "message": "Valuation history fetched successfully",
+                "portfolio": portfolio.id,
+                "interval": params["interval"],
+                "method": params["method"],
+                "series": [
+                    {"date": point["date"].isoformat(), "total_aum": "{:f}".format(point["total_aum"])}
+                    for point in series
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ValuationAllocationGenericAPIView(generics.GenericAPIView):
+    """
+        View for the asset type allocation stored with valuation snapshots.
+    """
+    serializer_class = ValuationAllocationQuerySerializer
+
+    def get(self, request: Request) -> Response:
+        """
+            get the allocation of snapshots by ids, or of a portfolio's snapshots in a date range.
+        """
+        serializer = self.serializer_class(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                {"message": "Validation error", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = serializer.validated_data
+        if "ids" in params:
+            snapshots = ValuationSnapshot.objects.filter(pk__in=params["ids"])
+            allocations = {
+                row["snapshot"]: row for row in ValuationService.get_snapshot_allocations(snapshots)
+            }
+            allocations = [allocations[pk] for pk in params["ids"] if pk in allocations]
+        else:
+            snapshots = ValuationSnapshot.objects.filter(portfolio_id=params["portfolio"])
+            if params.get("date_from"):
+                snapshots = snapshots.filter(snapshot_date__gte=params["date_from"])
+            if params.get("date_to"):
+                snapshots = snapshots.filter(snapshot_date__lte=params["date_to"])
+            allocations = ValuationService.get_snapshot_allocations(
+                snapshots.order_by("-snapshot_date")[: params["rows"]]
+            )
+
+        return Response(
+            {
+                "message": "Valuation allocations fetched successfully",
+                "allocations": allocations,
+            },
+            status=status.HTTP_200_OK,
+        )